@@ -0,0 +1,3 @@
+"""
+Benchmarks da camada de dados (executar com python -m benchmarks.<modulo>)
+"""
@@ -0,0 +1,249 @@
+"""
+Mede as operações da camada de dados em bancos de tamanhos realistas
+
+Cada tamanho ganha um banco novo, semeado de forma reproduzível (mesma
+semente, mesmas tarefas). Cada operação é medida isoladamente e o resultado
+traz percentis de latência e vazão. O JSON gravado pode ser comparado com o
+de uma execução anterior para apontar regressões.
+
+As operações são as que App delega ao Repositorio; o benchmark chama o
+Repositorio diretamente para rodar sem display.
+
+Uso:
+    python -m benchmarks.camada_dados --tamanhos 10000 100000 --saida atual.json
+    python -m benchmarks.camada_dados --tamanhos 10000 --comparar anterior.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from src.banco import PERFIS_PRAGMA
+from src.consultas import FiltroTarefas
+from src.limitador import LimitadorLogin
+from src.repositorio import STATUS_TAREFAS, Repositorio
+from src.senhas import MotorSenhas
+
+SENHA = "senha-benchmark"
+PALAVRAS = ("relatório", "reunião", "cliente", "projeto", "revisar", "enviar", "orçamento",
+            "planejar", "corrigir", "contrato", "entrega", "suporte", "treinamento", "backup")
+
+
+def percentil(ordenados, fracao):
+    """Percentil por posição mais próxima de uma lista já ordenada"""
+    indice = max(0, min(len(ordenados) - 1, int(round(fracao * len(ordenados) + 0.5)) - 1))
+    return ordenados[indice]
+
+
+def resumir(latencias, duracao):
+    """Resume as latências (em segundos) de uma operação"""
+    ordenados = sorted(latencias)
+    return {
+        "n": len(ordenados),
+        "media_ms": sum(ordenados) * 1000 / len(ordenados),
+        "p50_ms": percentil(ordenados, 0.50) * 1000,
+        "p90_ms": percentil(ordenados, 0.90) * 1000,
+        "p99_ms": percentil(ordenados, 0.99) * 1000,
+        "max_ms": ordenados[-1] * 1000,
+        "ops_por_s": len(ordenados) / duracao if duracao > 0 else None,
+    }
+
+
+def medir(funcao, argumentos):
+    """Chama funcao(*args) para cada item de argumentos e resume as latências"""
+    latencias = []
+    inicio = time.perf_counter()
+    for args in argumentos:
+        antes = time.perf_counter()
+        funcao(*args)
+        latencias.append(time.perf_counter() - antes)
+    return resumir(latencias, time.perf_counter() - inicio)
+
+
+def semear(repositorio, total, usuarios, semente, tamanho_lote=10000):
+    """Cria usuários e total tarefas pseudoaleatórias (reproduzíveis pela semente)
+
+    Retorna os emails e a latência de cada chamada de inserção em lote (sem o
+    hash das senhas dos usuários nem a geração dos dados).
+    """
+    aleatorio = random.Random(semente)
+    emails = [f"usuario{i}@bench.com" for i in range(usuarios)]
+    for i, email in enumerate(emails):
+        repositorio.cadastrar_usuario(f"Usuário {i}", email, SENHA)
+
+    base = datetime(2024, 1, 1)
+    intervalo = max(1, 365 * 24 * 3600 // max(total, 1))
+    criadas = 0
+    latencias = []
+    while criadas < total:
+        lote = []
+        for i in range(criadas, min(total, criadas + tamanho_lote)):
+            titulo = " ".join(aleatorio.choice(PALAVRAS) for _ in range(3))
+            data = base + timedelta(seconds=i * intervalo)
+            lote.append((
+                aleatorio.choice(emails), f"{titulo} {i}", f"Descrição da tarefa {i}",
+                aleatorio.choice(STATUS_TAREFAS), int(aleatorio.random() < 0.1),
+                data.strftime("%Y-%m-%d %H:%M:%S"),
+            ))
+        inicio = time.perf_counter()
+        repositorio.adicionar_tarefas_em_lote(lote)
+        latencias.append(time.perf_counter() - inicio)
+        criadas += len(lote)
+    return emails, latencias
+
+
+def medir_tamanho(total, args):
+    """Semeia um banco com total tarefas e mede cada operação; retorna os resumos"""
+    diretorio = tempfile.mkdtemp()
+    db_file = os.path.join(diretorio, "bench.db")
+    # Limitador permissivo: os logins repetidos do benchmark não devem ser bloqueados
+    limitador = LimitadorLogin(capacidade_conta=float("inf"), capacidade_origem=float("inf"))
+    repositorio = Repositorio(db_file, args.perfil, motor_senhas=MotorSenhas(processos=0),
+                              limitador=limitador)
+    aleatorio = random.Random(args.semente + 1)
+    resultados = {}
+
+    try:
+        repositorio.init_database()
+        inicio = time.perf_counter()
+        emails, latencias_lote = semear(repositorio, total, args.usuarios, args.semente)
+        resultados["semear"] = {"segundos": time.perf_counter() - inicio, "tarefas": total}
+        # Cada chamada insere até 10 mil tarefas (índice de busca e contagens incluídos)
+        resultados["adicionar_tarefas_em_lote"] = resumir(latencias_lote, sum(latencias_lote))
+        resultados["adicionar_tarefas_em_lote"]["tarefas_por_s"] = total / sum(latencias_lote) if total else None
+
+        def sortear(n):
+            return [aleatorio.choice(emails) for _ in range(n)]
+
+        n = args.repeticoes
+        # Tarefas alteradas mais adiante, com os donos (a alteração verifica a propriedade)
+        with repositorio.conexao() as conn:
+            maior_id = conn.execute("SELECT MAX(id) FROM tarefas").fetchone()[0] or 0
+            ids = [aleatorio.randint(1, maior_id) for _ in range(n)] if maior_id else []
+            donos = dict(conn.execute(
+                "SELECT id, usuario_email FROM tarefas WHERE id IN (SELECT value FROM json_each(?))",
+                (json.dumps(ids),)
+            ))
+        resultados["verificar_usuario"] = medir(
+            repositorio.verificar_usuario,
+            [(email, SENHA) for email in sortear(args.repeticoes_login)]
+        )
+        resultados["listar_tarefas"] = medir(
+            repositorio.listar_tarefas, [(email,) for email in sortear(n)]
+        )
+        resultados["listar_tarefas_pagina"] = medir(
+            repositorio.listar_tarefas_pagina, [(email, 100) for email in sortear(n)]
+        )
+        resultados["carregar_quadro"] = medir(
+            repositorio.carregar_quadro, [(email, 2000) for email in sortear(n)]
+        )
+        resultados["buscar_tarefas"] = medir(
+            repositorio.buscar_tarefas, [(aleatorio.choice(PALAVRAS)[:5], email) for email in sortear(n)]
+        )
+        resultados["consultar_tarefas"] = medir(
+            repositorio.consultar_tarefas,
+            [(FiltroTarefas(status=aleatorio.choice(STATUS_TAREFAS), prioridade=1), 50) for _ in range(n)]
+        )
+        resultados["adicionar_tarefa"] = medir(
+            repositorio.adicionar_tarefa,
+            [(email, f"Nova tarefa {i}", "Criada no benchmark") for i, email in enumerate(sortear(n))]
+        )
+        if ids:
+            resultados["atualizar_status_tarefa"] = medir(
+                repositorio.atualizar_status_tarefa,
+                [(tarefa_id, aleatorio.choice(STATUS_TAREFAS), donos[tarefa_id]) for tarefa_id in ids]
+            )
+        # Por último: cada exclusão leva junto as tarefas do usuário
+        resultados["excluir_usuario"] = medir(
+            repositorio.excluir_usuario, [(email,) for email in emails[:min(n, len(emails))]]
+        )
+    finally:
+        repositorio.fechar()
+        for sufixo in ("", "-wal", "-shm"):
+            if os.path.exists(db_file + sufixo):
+                os.unlink(db_file + sufixo)
+        os.rmdir(diretorio)
+
+    return resultados
+
+
+def comparar(anterior, atual, tolerancia):
+    """Lista as operações cujo p50 piorou mais que a tolerância (fração) entre duas execuções"""
+    regressoes = []
+    for tamanho, operacoes in atual["resultados"].items():
+        for operacao, resumo in operacoes.items():
+            antes = anterior.get("resultados", {}).get(tamanho, {}).get(operacao)
+            if not antes or "p50_ms" not in resumo or not antes.get("p50_ms"):
+                continue
+            variacao = resumo["p50_ms"] / antes["p50_ms"] - 1
+            if variacao > tolerancia:
+                regressoes.append((tamanho, operacao, antes["p50_ms"], resumo["p50_ms"], variacao))
+    return regressoes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark da camada de dados em vários tamanhos de banco")
+    parser.add_argument("--tamanhos", nargs="+", type=int, default=[10000, 100000],
+                        help="quantidades de tarefas semeadas (um banco por tamanho)")
+    parser.add_argument("--usuarios", type=int, default=100, help="usuários entre os quais as tarefas se dividem")
+    parser.add_argument("--repeticoes", type=int, default=200, help="chamadas medidas por operação")
+    parser.add_argument("--repeticoes-login", type=int, default=20,
+                        help="logins medidos (cada um calcula o hash da senha)")
+    parser.add_argument("--semente", type=int, default=42, help="semente dos dados e das escolhas")
+    parser.add_argument("--perfil", default="balanced", choices=sorted(PERFIS_PRAGMA))
+    parser.add_argument("--saida", help="arquivo JSON onde gravar os resultados")
+    parser.add_argument("--comparar", help="JSON de uma execução anterior para detectar regressões")
+    parser.add_argument("--tolerancia", type=float, default=0.25,
+                        help="piora relativa do p50 aceita antes de acusar regressão")
+    args = parser.parse_args(argv)
+
+    execucao = {
+        "ambiente": {
+            "data": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "plataforma": platform.platform(),
+            "processador": platform.processor() or platform.machine(),
+        },
+        "parametros": {chave: valor for chave, valor in vars(args).items()
+                       if chave not in ("saida", "comparar", "tolerancia")},
+        "resultados": {},
+    }
+
+    for total in args.tamanhos:
+        print(f"\n{total} tarefas")
+        resultados = medir_tamanho(total, args)
+        execucao["resultados"][str(total)] = resultados
+        print(f"  semeado em {resultados['semear']['segundos']:.1f}s "
+              f"(inserção em lote: {resultados['adicionar_tarefas_em_lote']['tarefas_por_s'] or 0:.0f} tarefas/s)")
+        print(f"  {'operação':<26}{'p50 (ms)':>10}{'p90 (ms)':>10}{'p99 (ms)':>10}{'ops/s':>10}")
+        for operacao, resumo in resultados.items():
+            if "p50_ms" in resumo:
+                print(f"  {operacao:<26}{resumo['p50_ms']:>10.2f}{resumo['p90_ms']:>10.2f}"
+                      f"{resumo['p99_ms']:>10.2f}{resumo['ops_por_s']:>10.0f}")
+
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as arquivo:
+            json.dump(execucao, arquivo, indent=2, ensure_ascii=False)
+        print(f"\nResultados gravados em {args.saida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as arquivo:
+            regressoes = comparar(json.load(arquivo), execucao, args.tolerancia)
+        for tamanho, operacao, antes, depois, variacao in regressoes:
+            print(f"REGRESSÃO {tamanho} {operacao}: p50 {antes:.2f}ms -> {depois:.2f}ms (+{variacao:.0%})")
+        if regressoes:
+            return 1
+        print("Nenhuma regressão acima da tolerância")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
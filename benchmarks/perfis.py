@@ -0,0 +1,75 @@
+"""
+Compara os perfis de PRAGMA do banco com uma carga parecida com a do Kanban
+
+Uso:
+    python -m benchmarks.perfis --operacoes 2000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from src.banco import PERFIS_PRAGMA
+from src.repositorio import Repositorio
+
+
+def medir_perfil(nome_perfil, operacoes):
+    """Executa a carga em um banco novo e retorna operações por segundo"""
+    diretorio = tempfile.mkdtemp()
+    db_file = os.path.join(diretorio, "bench.db")
+    repositorio = Repositorio(db_file, nome_perfil)
+
+    try:
+        repositorio.init_database()
+
+        # Escritas com um commit por operação
+        inicio = time.perf_counter()
+        for i in range(operacoes):
+            repositorio.adicionar_tarefa(f"user{i % 50}@teste.com", f"Tarefa {i}", "Descrição",
+                                         "A Fazer", i % 2)
+        escrita = time.perf_counter() - inicio
+
+        # Movimentos no Kanban (verificação de propriedade + atualização)
+        inicio = time.perf_counter()
+        for i in range(operacoes):
+            repositorio.atualizar_status_tarefa(i + 1, "Em Progresso", f"user{i % 50}@teste.com")
+        atualizacao = time.perf_counter() - inicio
+
+        # Leituras do quadro de um usuário
+        inicio = time.perf_counter()
+        for i in range(operacoes):
+            repositorio.listar_tarefas(f"user{i % 50}@teste.com")
+        leitura = time.perf_counter() - inicio
+    finally:
+        repositorio.fechar()
+        for sufixo in ("", "-wal", "-shm"):
+            if os.path.exists(db_file + sufixo):
+                os.unlink(db_file + sufixo)
+        os.rmdir(diretorio)
+
+    return {
+        "insercoes_por_s": operacoes / escrita,
+        "atualizacoes_por_s": operacoes / atualizacao,
+        "leituras_por_s": operacoes / leitura,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark dos perfis de PRAGMA")
+    parser.add_argument("--operacoes", type=int, default=2000,
+                        help="número de operações de cada tipo por perfil")
+    parser.add_argument("--perfis", nargs="+", default=sorted(PERFIS_PRAGMA),
+                        choices=sorted(PERFIS_PRAGMA))
+    args = parser.parse_args(argv)
+
+    print(f"{'perfil':<12}{'inserções/s':>14}{'atualizações/s':>17}{'leituras/s':>13}")
+    for nome in args.perfis:
+        resultado = medir_perfil(nome, args.operacoes)
+        print(f"{nome:<12}{resultado['insercoes_por_s']:>14.0f}"
+              f"{resultado['atualizacoes_por_s']:>17.0f}{resultado['leituras_por_s']:>13.0f}")
+
+
+if __name__ == "__main__":
+    main()
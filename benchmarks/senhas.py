@@ -0,0 +1,50 @@
+"""
+Calibra o custo do hash de senhas para uma latência alvo
+
+Uso:
+    python -m benchmarks.senhas --alvo-ms 100
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from src.senhas import PARAMETROS_PADRAO, MotorSenhas, calibrar
+
+
+def medir_motor(algoritmo, parametros, repeticoes):
+    """Mede a latência de ponta a ponta (incluindo o pool de processos) em ms"""
+    motor = MotorSenhas(algoritmo, parametros)
+    try:
+        # A primeira chamada inicia o processo de trabalho
+        motor.gerar_hash("aquecimento")
+        inicio = time.perf_counter()
+        for _ in range(repeticoes):
+            motor.gerar_hash("senha de teste")
+        return (time.perf_counter() - inicio) * 1000 / repeticoes
+    finally:
+        motor.encerrar()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Calibração do custo do hash de senhas")
+    parser.add_argument("--alvo-ms", type=float, default=100,
+                        help="latência desejada por hash, em milissegundos")
+    parser.add_argument("--algoritmos", nargs="+", default=sorted(PARAMETROS_PADRAO),
+                        choices=sorted(PARAMETROS_PADRAO))
+    parser.add_argument("--repeticoes", type=int, default=5,
+                        help="hashes medidos pelo pool de processos")
+    args = parser.parse_args(argv)
+
+    print(f"{'algoritmo':<16}{'parâmetros':<28}{'KDF (ms)':>10}{'pool (ms)':>11}")
+    for algoritmo in args.algoritmos:
+        parametros, tempo = calibrar(args.alvo_ms, algoritmo)
+        no_pool = medir_motor(algoritmo, parametros, args.repeticoes)
+        texto = ", ".join(f"{chave}={valor}" for chave, valor in parametros.items())
+        print(f"{algoritmo:<16}{texto:<28}{tempo:>10.1f}{no_pool:>11.1f}")
+    print(f"padrão atual: {PARAMETROS_PADRAO}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+"""
+Gerenciamento de conexões SQLite reutilizáveis (sem dependência de tkinter)
+"""
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from .consultas_lentas import ConexaoMedida, RegistroConsultasLentas
+
+# Perfis de desempenho aplicados a cada conexão. "durable" faz fsync a cada
+# commit; "balanced" (padrão) só sincroniza nos checkpoints do WAL, o que é
+# seguro contra queda do processo; "throughput" não sincroniza e pode perder
+# as últimas transações numa queda de energia.
+PERFIS_PRAGMA = {
+    "durable": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "cache_size": -2000,
+        "mmap_size": 0,
+        "temp_store": "DEFAULT",
+        "busy_timeout": 5000,
+    },
+    "balanced": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -16000,
+        "mmap_size": 64 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+    "throughput": {
+        "journal_mode": "WAL",
+        "synchronous": "OFF",
+        "cache_size": -64000,
+        "mmap_size": 256 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "busy_timeout": 10000,
+    },
+}
+
+PERFIL_PADRAO = "balanced"
+
+# Variável de ambiente usada quando nenhum perfil é informado explicitamente
+VARIAVEL_PERFIL = "TASKS_DB_PERFIL"
+
+
+def obter_perfil(nome=None):
+    """Retorna o nome e as configurações do perfil de PRAGMAs escolhido"""
+    nome = nome or os.environ.get(VARIAVEL_PERFIL) or PERFIL_PADRAO
+    if nome not in PERFIS_PRAGMA:
+        opcoes = ", ".join(sorted(PERFIS_PRAGMA))
+        raise ValueError(f"Perfil de banco desconhecido: {nome!r} (opções: {opcoes})")
+    return nome, PERFIS_PRAGMA[nome]
+
+
+def aplicar_perfil(conn, perfil):
+    """Aplica os PRAGMAs de escopo de conexão de um perfil"""
+    for pragma in ("synchronous", "cache_size", "mmap_size", "temp_store", "busy_timeout"):
+        conn.execute(f"PRAGMA {pragma} = {perfil[pragma]}")
+
+
+def aplicar_modo_journal(conn, perfil):
+    """Aplica o modo de journal do perfil (persistente no arquivo do banco)"""
+    return conn.execute(f"PRAGMA journal_mode = {perfil['journal_mode']}").fetchone()[0]
+
+
+@contextmanager
+def transacao(conn, nome="aninhada"):
+    """Executa o bloco numa transação explícita da conexão
+
+    Num empréstimo aninhado, com uma transação já aberta pelo chamador, usa
+    um SAVEPOINT: uma falha desfaz só o bloco e o commit fica com quem abriu
+    a transação externa.
+    """
+    if conn.in_transaction:
+        conn.execute(f"SAVEPOINT {nome}")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute(f"ROLLBACK TO {nome}")
+            conn.execute(f"RELEASE {nome}")
+            raise
+        conn.execute(f"RELEASE {nome}")
+        return
+
+    conn.execute("BEGIN")
+    try:
+        yield conn
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
+
+
+class PoolEsgotadoError(sqlite3.OperationalError):
+    """Nenhuma conexão ficou disponível dentro do tempo de espera"""
+
+
+class PoolConexoes:
+    """Pool limitado de conexões SQLite de longa duração.
+
+    Cada thread que adquire uma conexão passa a ser dona dela até devolvê-la;
+    aquisições aninhadas na mesma thread reutilizam a mesma conexão, de modo
+    que uma operação composta (ex.: verificar propriedade e depois atualizar)
+    usa uma única conexão e o mesmo cache de instruções preparadas.
+    """
+
+    def __init__(self, db_file, perfil=None, tamanho_maximo=4, tempo_espera=10.0,
+                 intervalo_verificacao=30.0, cache_instrucoes=128, consultas_lentas=None):
+        self.db_file = db_file
+        self.nome_perfil, self.perfil = obter_perfil(perfil)
+        self.tamanho_maximo = tamanho_maximo
+        self.tempo_espera = tempo_espera
+        self.intervalo_verificacao = intervalo_verificacao
+        self.cache_instrucoes = cache_instrucoes
+        # Registro opcional de instruções lentas (ou TASKS_DB_LENTA_MS); sem ele
+        # as conexões são as comuns do sqlite3, sem custo de medição
+        self.consultas_lentas = consultas_lentas or RegistroConsultasLentas.do_ambiente()
+
+        # Conexões ociosas como (conexao, instante do último uso)
+        self._livres = []
+        self._total = 0
+        self._fechado = False
+        self._condicao = threading.Condition()
+        self._local = threading.local()
+
+    def _criar_conexao(self):
+        """Abre uma nova conexão física com o banco de dados"""
+        # A conexão pode ser devolvida ao pool e usada depois por outra thread,
+        # mas nunca por duas threads ao mesmo tempo
+        conn = sqlite3.connect(
+            self.db_file,
+            check_same_thread=False,
+            cached_statements=self.cache_instrucoes,
+            factory=ConexaoMedida if self.consultas_lentas is not None else sqlite3.Connection
+        )
+        if self.consultas_lentas is not None:
+            conn.registro_lento = self.consultas_lentas
+        try:
+            aplicar_perfil(conn, self.perfil)
+        except sqlite3.Error:
+            conn.close()
+            raise
+        return conn
+
+    def _conexao_saudavel(self, conn):
+        """Verifica se uma conexão ociosa ainda responde"""
+        try:
+            conn.execute('SELECT 1').fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _fechar_conexao(self, conn):
+        """Fecha uma conexão ignorando erros"""
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+    def _adquirir(self):
+        """Retira uma conexão do pool, criando-a se ainda houver vaga"""
+        prazo = time.monotonic() + self.tempo_espera
+        with self._condicao:
+            while True:
+                if self._fechado:
+                    raise sqlite3.ProgrammingError("O pool de conexões já foi fechado")
+                if self._livres:
+                    # LIFO: a conexão usada mais recentemente tem o cache mais quente
+                    conn, ultimo_uso = self._livres.pop()
+                    break
+                if self._total < self.tamanho_maximo:
+                    self._total += 1
+                    conn, ultimo_uso = None, None
+                    break
+                restante = prazo - time.monotonic()
+                if restante <= 0:
+                    raise PoolEsgotadoError(
+                        f"Nenhuma conexão disponível após {self.tempo_espera}s"
+                    )
+                self._condicao.wait(restante)
+
+        try:
+            if conn is None:
+                return self._criar_conexao()
+            if time.monotonic() - ultimo_uso > self.intervalo_verificacao:
+                if not self._conexao_saudavel(conn):
+                    self._fechar_conexao(conn)
+                    return self._criar_conexao()
+            return conn
+        except Exception:
+            # Liberar a vaga reservada para não encolher o pool
+            with self._condicao:
+                self._total -= 1
+                self._condicao.notify()
+            raise
+
+    def _liberar(self, conn):
+        """Devolve uma conexão ao pool descartando transações pendentes"""
+        saudavel = True
+        try:
+            if isinstance(conn, ConexaoMedida):
+                # Ainda na thread dona: outra thread pode receber a conexão logo a seguir
+                conn.concluir_cursores()
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            saudavel = False
+
+        with self._condicao:
+            if self._fechado or not saudavel:
+                self._total -= 1
+                self._fechar_conexao(conn)
+            else:
+                self._livres.append((conn, time.monotonic()))
+            self._condicao.notify()
+
+    @contextmanager
+    def conexao(self):
+        """Empresta uma conexão do pool para a thread atual"""
+        atual = getattr(self._local, 'conexao', None)
+        if atual is not None:
+            # Reentrada na mesma thread: reutilizar a conexão já emprestada
+            self._local.profundidade += 1
+            try:
+                yield atual
+            finally:
+                self._local.profundidade -= 1
+            return
+
+        conn = self._adquirir()
+        self._local.conexao = conn
+        self._local.profundidade = 1
+        try:
+            yield conn
+        finally:
+            self._local.conexao = None
+            self._local.profundidade = 0
+            self._liberar(conn)
+
+    def estatisticas(self):
+        """Retorna o número de conexões abertas e ociosas"""
+        with self._condicao:
+            return {
+                "abertas": self._total,
+                "livres": len(self._livres),
+                "maximo": self.tamanho_maximo
+            }
+
+    def fechar(self):
+        """Fecha as conexões ociosas e impede novos empréstimos"""
+        with self._condicao:
+            self._fechado = True
+            livres, self._livres = self._livres, []
+            self._total -= len(livres)
+            self._condicao.notify_all()
+        # Conexões ainda emprestadas são fechadas quando forem devolvidas
+        for conn, _ in livres:
+            self._fechar_conexao(conn)
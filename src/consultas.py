@@ -0,0 +1,155 @@
+"""
+Montagem de consultas filtradas de tarefas (sem dependência de tkinter)
+"""
+import numbers
+import re
+import time
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+
+# Status possíveis de uma tarefa (colunas do quadro)
+STATUS_TAREFAS = ("A Fazer", "Em Progresso", "Concluído")
+
+# Filtros aceitos pela consulta de tarefas; None em um campo significa "qualquer".
+# status pode ser um status ou uma sequência deles; criado_de e criado_ate
+# (intervalo [criado_de, criado_ate)) aceitam segundos desde a época, date ou
+# datetime; texto busca prefixos de palavras no título e na descrição.
+FiltroTarefas = namedtuple(
+    "FiltroTarefas", "usuario_email status prioridade criado_de criado_ate texto",
+    defaults=(None,) * 6
+)
+
+
+def expressao_busca(texto):
+    """Converte o texto digitado numa consulta FTS5 segura (None se não houver termos)
+
+    Cada palavra vira um prefixo entre aspas, então operadores e aspas do
+    usuário não são interpretados pelo FTS5; todas as palavras precisam aparecer.
+    """
+    termos = re.findall(r"\w+", texto or "")
+    if not termos:
+        return None
+    return " ".join(f'"{termo}"*' for termo in termos)
+
+
+def para_epoca(valor):
+    """Converte um instante (época, date ou datetime local) em segundos desde a época"""
+    if valor is None or isinstance(valor, int) and not isinstance(valor, bool):
+        return valor
+    if isinstance(valor, numbers.Real) and not isinstance(valor, bool):
+        return int(valor)
+    if isinstance(valor, datetime):
+        return int(valor.timestamp())
+    if isinstance(valor, date):
+        return int(datetime(valor.year, valor.month, valor.day).timestamp())
+    raise ValueError(f"Data inválida: {valor!r}")
+
+
+def semana_atual(agora=None):
+    """Retorna (início, fim) da semana corrente, de segunda a segunda, em segundos"""
+    hoje = datetime.fromtimestamp(time.time() if agora is None else agora).date()
+    segunda = hoje - timedelta(days=hoje.weekday())
+    return para_epoca(segunda), para_epoca(segunda + timedelta(days=7))
+
+
+def compilar_filtro(filtro):
+    """Traduz um FiltroTarefas em (origem, condições, parâmetros) SQL, sem concatenar valores
+
+    Com texto, a origem parte do índice de texto e junta as tarefas pela chave
+    primária (o CROSS JOIN fixa essa ordem); sem texto, é a própria tabela.
+    """
+    origem = "tarefas"
+    condicoes = []
+    parametros = []
+
+    if filtro.texto is not None:
+        expressao = expressao_busca(filtro.texto)
+        if expressao is not None:
+            origem = "tarefas_busca CROSS JOIN tarefas ON tarefas.id = tarefas_busca.rowid"
+            condicoes.append("tarefas_busca MATCH ?")
+            parametros.append(expressao)
+        else:
+            # Texto sem palavras não encontra nada, como em buscar_tarefas
+            condicoes.append("0")
+
+    if filtro.usuario_email is not None:
+        condicoes.append("usuario_email = ?")
+        parametros.append(filtro.usuario_email)
+
+    if filtro.status is not None:
+        status = (filtro.status,) if isinstance(filtro.status, str) else tuple(filtro.status)
+        invalidos = [s for s in status if s not in STATUS_TAREFAS]
+        if invalidos or not status:
+            raise ValueError(f"Status inválido: {', '.join(invalidos) or 'nenhum'}")
+        if len(status) == 1:
+            condicoes.append("status = ?")
+        else:
+            condicoes.append(f"status IN ({', '.join('?' * len(status))})")
+        parametros.extend(status)
+
+    if filtro.prioridade is not None:
+        if filtro.prioridade not in (0, 1):
+            raise ValueError(f"Prioridade inválida: {filtro.prioridade}")
+        condicoes.append("prioridade = ?")
+        parametros.append(int(filtro.prioridade))
+
+    if filtro.criado_de is not None:
+        condicoes.append("criado_em >= ?")
+        parametros.append(para_epoca(filtro.criado_de))
+    if filtro.criado_ate is not None:
+        condicoes.append("criado_em < ?")
+        parametros.append(para_epoca(filtro.criado_ate))
+
+    return origem, condicoes, parametros
+
+
+def compilar_pagina(filtro, colunas, limite, apos=None):
+    """Monta o SELECT de uma página na ordem do quadro (prioridade DESC, id DESC)
+
+    colunas é a lista de colunas de tarefas separadas por vírgula. apos é o
+    (prioridade, id) da última tarefa da página anterior; a busca continua
+    logo depois dela pelo índice, sem OFFSET, em duas faixas como em
+    Repositorio.listar_tarefas_pagina: o restante da prioridade atual e as
+    prioridades menores (uma só comparação (prioridade, id) < (?, ?) faria o
+    SQLite percorrer a prioridade atual desde o início).
+    """
+    origem, condicoes, parametros = compilar_filtro(filtro)
+    colunas = ", ".join(f"tarefas.{coluna.strip()}" for coluna in colunas.split(","))
+
+    def faixa(extras):
+        todas = condicoes + extras
+        where = f"WHERE {' AND '.join(todas)}" if todas else ""
+        return f'''
+            SELECT {colunas} FROM {origem}
+            {where}
+            ORDER BY tarefas.prioridade DESC, tarefas.id DESC
+            LIMIT ?
+        '''
+
+    if apos is None:
+        return faixa([]), parametros + [limite]
+    prioridade, tarefa_id = apos
+    sql = f'''
+        SELECT * FROM ({faixa(["tarefas.prioridade = ?", "tarefas.id < ?"])})
+        UNION ALL
+        SELECT * FROM ({faixa(["tarefas.prioridade < ?"])})
+        ORDER BY prioridade DESC, id DESC
+        LIMIT ?
+    '''
+    return sql, (parametros + [prioridade, tarefa_id, limite]
+                 + parametros + [prioridade, limite, limite])
+
+
+def compilar_contagem(filtro):
+    """Monta a contagem total de um filtro
+
+    Filtros só por dono e status são respondidos pela tabela contagem_tarefas,
+    mantida por gatilhos, sem percorrer as tarefas.
+    """
+    so_contadores = (filtro.prioridade is None and filtro.criado_de is None
+                     and filtro.criado_ate is None and filtro.texto is None)
+    origem, condicoes, parametros = compilar_filtro(filtro)
+    where = f"WHERE {' AND '.join(condicoes)}" if condicoes else ""
+    if so_contadores:
+        return f"SELECT COALESCE(SUM(quantidade), 0) FROM contagem_tarefas {where}", parametros
+    return f"SELECT COUNT(*) FROM {origem} {where}", parametros
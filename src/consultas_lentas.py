@@ -0,0 +1,224 @@
+"""
+Registro de consultas lentas com o plano de execução (sem dependência de tkinter)
+"""
+import logging
+import os
+import sqlite3
+import threading
+import time
+import weakref
+from collections import deque, namedtuple
+
+logger = logging.getLogger(__name__)
+
+# Variável de ambiente com o limite, em milissegundos, que liga o registro no pool
+VARIAVEL_LIMITE_LENTA = "TASKS_DB_LENTA_MS"
+
+# Instruções cujo plano pode ser obtido com EXPLAIN QUERY PLAN
+INSTRUCOES_COM_PLANO = ("SELECT", "INSERT", "UPDATE", "DELETE", "REPLACE", "WITH")
+
+# Consulta registrada: SQL, formato dos parâmetros (sem os valores), duração e plano
+ConsultaLenta = namedtuple("ConsultaLenta", "sql parametros duracao_ms plano")
+
+
+def formato_parametros(parametros):
+    """Descreve os parâmetros só pelos tipos, sem expor valores (ex.: senhas)"""
+    if isinstance(parametros, dict):
+        return "{" + ", ".join(f"{chave}: {type(valor).__name__}" for chave, valor in parametros.items()) + "}"
+    return "(" + ", ".join(type(valor).__name__ for valor in parametros) + ")"
+
+
+def normalizar_sql(sql):
+    """Junta as linhas e os espaços do SQL numa só linha"""
+    return " ".join(sql.split())
+
+
+def plano_consulta(conn, sql, parametros=()):
+    """Retorna as linhas do EXPLAIN QUERY PLAN de uma instrução (vazio se não houver)"""
+    if not normalizar_sql(sql).upper().startswith(INSTRUCOES_COM_PLANO):
+        return ()
+    # Cursor comum: o próprio EXPLAIN não deve ser medido nem registrado
+    cursor = conn.cursor(sqlite3.Cursor)
+    try:
+        return tuple(linha[3] for linha in cursor.execute("EXPLAIN QUERY PLAN " + sql, parametros))
+    finally:
+        cursor.close()
+
+
+class RegistroConsultasLentas:
+    """Guarda e registra no log as instruções que passarem de limite_ms.
+
+    Cada instrução é medida do execute até a última linha lida (o SQLite
+    produz as linhas sob demanda), sem contar o tempo gasto pelo chamador
+    entre as leituras. As últimas `maximo` consultas lentas ficam em
+    memória; com limite_ms=0 todas as instruções são registradas.
+    """
+
+    def __init__(self, limite_ms=100.0, maximo=200, explicar=True):
+        self.limite_ms = limite_ms
+        self.explicar = explicar
+        self._consultas = deque(maxlen=maximo)
+        self._trava = threading.Lock()
+
+    @classmethod
+    def do_ambiente(cls):
+        """Cria o registro a partir de TASKS_DB_LENTA_MS (None se a variável não existir)"""
+        valor = os.environ.get(VARIAVEL_LIMITE_LENTA)
+        if not valor:
+            return None
+        try:
+            return cls(float(valor))
+        except ValueError:
+            raise ValueError(f"{VARIAVEL_LIMITE_LENTA} deve ser um número de milissegundos: {valor!r}")
+
+    def avaliar(self, conn, sql, parametros, duracao):
+        """Registra a instrução se ela passou do limite"""
+        duracao_ms = duracao * 1000
+        if duracao_ms < self.limite_ms:
+            return
+        plano = ()
+        if self.explicar:
+            try:
+                plano = plano_consulta(conn, sql, parametros)
+            except sqlite3.Error:
+                pass
+        consulta = ConsultaLenta(normalizar_sql(sql), formato_parametros(parametros), duracao_ms, plano)
+        with self._trava:
+            self._consultas.append(consulta)
+        logger.warning("Consulta lenta (%.1f ms): %s | parâmetros %s | plano: %s",
+                       duracao_ms, consulta.sql, consulta.parametros, "; ".join(plano) or "-")
+
+    def consultas(self):
+        """Retorna as consultas lentas guardadas, da mais antiga para a mais recente"""
+        with self._trava:
+            return list(self._consultas)
+
+    def limpar(self):
+        """Descarta as consultas guardadas"""
+        with self._trava:
+            self._consultas.clear()
+
+
+class CursorMedido(sqlite3.Cursor):
+    """Cursor que mede cada instrução e a repassa ao registro ao terminá-la
+
+    Instruções deixadas pela metade são concluídas pela conexão antes de ela
+    voltar ao pool (ConexaoMedida.concluir_cursores), na thread que a usa.
+    """
+
+    _sql = None
+
+    def _iniciar(self, sql, parametros):
+        self._concluir()
+        self.connection.concluir_abandonadas()
+        self._sql = sql
+        self._parametros = parametros
+        self._gasto = 0.0
+        self.connection.cursores_abertos.add(self)
+
+    def _concluir(self):
+        if self._sql is not None:
+            sql, self._sql = self._sql, None
+            self.connection.cursores_abertos.discard(self)
+            self.connection.registro_lento.avaliar(self.connection, sql, self._parametros, self._gasto)
+
+    def execute(self, sql, parametros=()):
+        self._iniciar(sql, parametros)
+        inicio = time.perf_counter()
+        try:
+            return super().execute(sql, parametros)
+        finally:
+            self._gasto += time.perf_counter() - inicio
+            # Escritas e consultas sem linhas já terminaram no execute
+            if self.description is None:
+                self._concluir()
+
+    def executemany(self, sql, sequencia):
+        # O plano é o da instrução com o primeiro conjunto de parâmetros
+        sequencia = list(sequencia)
+        self._iniciar(sql, sequencia[0] if sequencia else ())
+        inicio = time.perf_counter()
+        try:
+            return super().executemany(sql, sequencia)
+        finally:
+            self._gasto += time.perf_counter() - inicio
+            self._concluir()
+
+    def _ler(self, leitura, *args):
+        inicio = time.perf_counter()
+        try:
+            return leitura(*args)
+        finally:
+            self._gasto += time.perf_counter() - inicio
+
+    def fetchone(self):
+        linha = self._ler(super().fetchone)
+        if linha is None:
+            self._concluir()
+        return linha
+
+    def fetchmany(self, size=None):
+        linhas = self._ler(super().fetchmany, self.arraysize if size is None else size)
+        if not linhas:
+            self._concluir()
+        return linhas
+
+    def fetchall(self):
+        linhas = self._ler(super().fetchall)
+        self._concluir()
+        return linhas
+
+    def __next__(self):
+        try:
+            return self._ler(super().__next__)
+        except StopIteration:
+            self._concluir()
+            raise
+
+    def close(self):
+        self._concluir()
+        super().close()
+
+    def __del__(self):
+        # Instrução abandonada antes da última linha (ex.: fetchone()[0]). O
+        # coletor pode rodar em qualquer thread, até depois de a conexão voltar
+        # ao pool: aqui só se anota a medição, e o plano é obtido pela conexão
+        # no próximo uso ou antes de ser devolvida
+        if self._sql is not None:
+            sql, self._sql = self._sql, None
+            self.connection.abandonadas.append((sql, self._parametros, self._gasto))
+
+
+class ConexaoMedida(sqlite3.Connection):
+    """Conexão cujos cursores (inclusive os de conn.execute) são medidos"""
+
+    registro_lento = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Cursores com instrução ainda não lida até o fim
+        self.cursores_abertos = weakref.WeakSet()
+        # Medições (sql, parâmetros, duração) de cursores descartados no meio da leitura
+        self.abandonadas = deque()
+
+    def concluir_abandonadas(self):
+        """Registra as instruções dos cursores descartados antes da última linha"""
+        while self.abandonadas:
+            sql, parametros, duracao = self.abandonadas.popleft()
+            self.registro_lento.avaliar(self, sql, parametros, duracao)
+
+    def concluir_cursores(self):
+        """Conclui as instruções pendentes; chamado antes de a conexão voltar ao pool"""
+        for cursor in list(self.cursores_abertos):
+            cursor._concluir()
+        self.concluir_abandonadas()
+
+    def cursor(self, factory=CursorMedido):
+        return super().cursor(factory)
+
+    # Os atalhos do sqlite3 criam o cursor internamente, sem passar por cursor()
+    def execute(self, sql, parametros=()):
+        return self.cursor().execute(sql, parametros)
+
+    def executemany(self, sql, sequencia):
+        return self.cursor().executemany(sql, sequencia)
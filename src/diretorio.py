@@ -0,0 +1,95 @@
+"""
+Cache em memória do cadastro de usuários (sem dependência de tkinter)
+"""
+import threading
+from bisect import bisect_left
+
+
+def _chave(usuario):
+    """Ordem da lista de usuários: por nome, como em listar_usuarios"""
+    return usuario[1], usuario[0]
+
+
+class DiretorioUsuarios:
+    """Usuários (id, nome, email) indexados por email e por id.
+
+    Mantém também a lista ordenada por nome exibida ao admin; cadastros e
+    exclusões feitos por esta aplicação atualizam o cache sem recarregá-lo.
+    Enquanto não for carregado, as consultas retornam None e listar()
+    retorna None, indicando que é preciso buscar os usuários no banco.
+    """
+
+    def __init__(self):
+        self._trava = threading.Lock()
+        self.invalidar()
+
+    def invalidar(self):
+        """Descarta o cache; a próxima listagem volta a consultar o banco"""
+        with self._trava:
+            self._por_email = {}
+            self._por_id = {}
+            self._ordenados = []
+            self._chaves = []
+            self.carregado = False
+
+    def carregar(self, usuarios):
+        """Substitui o conteúdo do cache pelas linhas (id, nome, email) informadas"""
+        usuarios = sorted((tuple(u) for u in usuarios), key=_chave)
+        with self._trava:
+            self._por_email = {u[2]: u for u in usuarios}
+            self._por_id = {u[0]: u for u in usuarios}
+            self._ordenados = usuarios
+            self._chaves = [_chave(u) for u in usuarios]
+            self.carregado = True
+
+    def listar(self):
+        """Retorna os usuários ordenados por nome, ou None se o cache não foi carregado"""
+        with self._trava:
+            return list(self._ordenados) if self.carregado else None
+
+    def por_email(self, email):
+        """Retorna o usuário de um email ou None"""
+        with self._trava:
+            return self._por_email.get(email)
+
+    def por_id(self, usuario_id):
+        """Retorna o usuário de um id ou None"""
+        with self._trava:
+            return self._por_id.get(usuario_id)
+
+    def nome(self, email, padrao=None):
+        """Retorna o nome de exibição de um email (ou padrao se desconhecido)"""
+        usuario = self.por_email(email)
+        return usuario[1] if usuario else padrao
+
+    def adicionar(self, usuario):
+        """Inclui um usuário recém-cadastrado mantendo a ordem por nome"""
+        usuario = tuple(usuario)
+        with self._trava:
+            if not self.carregado:
+                return
+            if usuario[2] in self._por_email:
+                self._remover(usuario[2])
+            chave = _chave(usuario)
+            indice = bisect_left(self._chaves, chave)
+            self._chaves.insert(indice, chave)
+            self._ordenados.insert(indice, usuario)
+            self._por_email[usuario[2]] = usuario
+            self._por_id[usuario[0]] = usuario
+
+    def remover(self, email):
+        """Retira um usuário excluído"""
+        with self._trava:
+            if self.carregado and email in self._por_email:
+                self._remover(email)
+
+    def _remover(self, email):
+        usuario = self._por_email.pop(email)
+        del self._por_id[usuario[0]]
+        indice = bisect_left(self._chaves, _chave(usuario))
+        del self._chaves[indice]
+        del self._ordenados[indice]
+
+    def __len__(self):
+        with self._trava:
+            return len(self._ordenados)
@@ -0,0 +1,115 @@
+"""
+Execução de operações do banco fora da thread principal do Tk
+"""
+import logging
+import queue
+import threading
+from contextlib import nullcontext
+
+logger = logging.getLogger(__name__)
+
+# Sinal enviado às threads de trabalho para encerrarem
+_PARAR = object()
+
+
+class ExecutorBanco:
+    """Executa funções de acesso a dados em threads de trabalho.
+
+    Cada thread mantém uma conexão do pool emprestada durante toda a sua vida,
+    então todas as chamadas ao repositório feitas por ela reutilizam essa
+    conexão. Os resultados voltam para a thread do Tk por meio de root.after:
+    a thread principal consulta periodicamente a fila de resultados enquanto
+    houver tarefas pendentes, sem que as threads de trabalho toquem no Tk.
+    """
+
+    def __init__(self, root, pool=None, trabalhadores=1, intervalo_ms=15):
+        self.root = root
+        self.pool = pool
+        self.intervalo_ms = intervalo_ms
+
+        self._tarefas = queue.Queue()
+        self._resultados = queue.Queue()
+        # Contadores manipulados apenas na thread do Tk
+        self._pendentes = 0
+        self._agendado = False
+        self._encerrado = False
+
+        self._threads = []
+        for i in range(trabalhadores):
+            thread = threading.Thread(
+                target=self._trabalhar,
+                name=f"executor-banco-{i}",
+                daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def submeter(self, funcao, *args, ao_concluir=None, ao_falhar=None, **kwargs):
+        """Agenda funcao(*args, **kwargs) e entrega o resultado aos callbacks na thread do Tk"""
+        if self._encerrado:
+            raise RuntimeError("O executor do banco já foi encerrado")
+        self._pendentes += 1
+        self._tarefas.put((funcao, args, kwargs, ao_concluir, ao_falhar))
+        self._agendar_entrega()
+
+    @property
+    def pendentes(self):
+        """Número de operações submetidas cujo resultado ainda não foi entregue"""
+        return self._pendentes
+
+    def _trabalhar(self):
+        """Laço das threads de trabalho"""
+        contexto = self.pool.conexao() if self.pool is not None else nullcontext()
+        with contexto as conn:
+            while True:
+                item = self._tarefas.get()
+                if item is _PARAR:
+                    break
+                funcao, args, kwargs, ao_concluir, ao_falhar = item
+                try:
+                    resultado = funcao(*args, **kwargs)
+                except Exception as e:
+                    self._resultados.put((ao_falhar, e, True))
+                else:
+                    self._resultados.put((ao_concluir, resultado, False))
+                finally:
+                    # Não deixar transação aberta na conexão fixa da thread
+                    if conn is not None and conn.in_transaction:
+                        conn.rollback()
+
+    def _agendar_entrega(self):
+        """Agenda a próxima consulta à fila de resultados"""
+        if not self._agendado:
+            self._agendado = True
+            self.root.after(self.intervalo_ms, self._entregar)
+
+    def _entregar(self):
+        """Chama os callbacks dos resultados prontos (na thread do Tk)"""
+        self._agendado = False
+        while True:
+            try:
+                callback, valor, falhou = self._resultados.get_nowait()
+            except queue.Empty:
+                break
+            self._pendentes -= 1
+            try:
+                if callback is not None:
+                    callback(valor)
+                elif falhou:
+                    logger.error("Erro em operação do banco", exc_info=valor)
+            except Exception:
+                logger.exception("Erro no callback de uma operação do banco")
+
+        if self._pendentes > 0:
+            self._agendar_entrega()
+
+    def encerrar(self, esperar=True):
+        """Encerra as threads de trabalho, devolvendo suas conexões ao pool"""
+        if self._encerrado:
+            return
+        self._encerrado = True
+        for _ in self._threads:
+            self._tarefas.put(_PARAR)
+        if esperar:
+            for thread in self._threads:
+                thread.join()
@@ -0,0 +1,205 @@
+"""
+Medição opcional das operações de dados (sem dependência de tkinter)
+"""
+import functools
+import os
+import tempfile
+import threading
+import time
+import weakref
+from bisect import bisect_left
+
+# Limites superiores (em segundos) das faixas do histograma de latência
+LIMITES_PADRAO = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# Variável de ambiente com o arquivo de métricas; definida, liga a instrumentação no App
+VARIAVEL_METRICAS = "TASKS_METRICAS_ARQUIVO"
+
+# Métodos do Repositorio que acessam o banco e são medidos
+METODOS_DADOS = (
+    "init_database",
+    "verificar_usuario", "autenticar", "usuario_existe", "cadastrar_usuario", "listar_usuarios",
+    "excluir_usuario",
+    "listar_tarefas", "listar_tarefas_pagina", "listar_tarefas_status", "carregar_quadro",
+    "contar_tarefas_por_status", "contar_tarefas_por_usuario", "buscar_tarefas", "consultar_tarefas",
+    "adicionar_tarefa", "adicionar_tarefas_em_lote", "obter_prioridade_tarefa",
+    "verificar_propriedade_tarefa", "atualizar_prioridade_tarefa", "atualizar_status_tarefa",
+    "atualizar_status_tarefas", "atualizar_prioridade_tarefas", "excluir_tarefa",
+)
+
+# Prefixo dos nomes das métricas exportadas
+PREFIXO = "tarefas_db"
+
+
+def gravar_atomicamente(caminho, texto):
+    """Grava o texto num arquivo, substituindo-o de uma só vez
+
+    Um coletor que leia o arquivo (ex.: textfile do node_exporter) nunca
+    vê um arquivo pela metade.
+    """
+    diretorio = os.path.dirname(os.path.abspath(caminho))
+    fd, temporario = tempfile.mkstemp(dir=diretorio, prefix=".metricas-")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as arquivo:
+            arquivo.write(texto)
+        os.replace(temporario, caminho)
+    except BaseException:
+        if os.path.exists(temporario):
+            os.unlink(temporario)
+        raise
+
+
+def contar_linhas(resultado):
+    """Quantidade de linhas num resultado do repositório (0 se não houver lista)
+
+    Aceita uma lista de linhas ou uma tupla com uma lista, como (sucesso,
+    linhas), (tarefas, continuacao) ou (contagens, tarefas).
+    """
+    if isinstance(resultado, list):
+        return len(resultado)
+    if isinstance(resultado, tuple):
+        for item in resultado:
+            if isinstance(item, list):
+                return len(item)
+    return 0
+
+
+def falhou(resultado):
+    """Indica um resultado de falha no formato (False, mensagem) usado pelo repositório"""
+    return isinstance(resultado, tuple) and len(resultado) == 2 and resultado[0] is False
+
+
+class MetricasMetodo:
+    """Contadores e histograma de latência de um método"""
+
+    __slots__ = ("chamadas", "erros", "falhas", "linhas", "soma", "faixas")
+
+    def __init__(self, quantidade_faixas):
+        self.chamadas = 0
+        self.erros = 0
+        self.falhas = 0
+        self.linhas = 0
+        self.soma = 0.0
+        # Uma posição por limite e a última para o que passar de todos (+Inf)
+        self.faixas = [0] * (quantidade_faixas + 1)
+
+
+class Instrumentacao:
+    """Coleta tempo, chamadas, linhas e erros dos métodos de dados.
+
+    É opcional: instrumentar(objeto) troca os métodos do objeto por versões
+    medidas. Sem instrumentar, nada muda e o custo é zero. Os registros
+    podem vir de várias threads (ex.: o executor do banco).
+    """
+
+    def __init__(self, limites=LIMITES_PADRAO, relogio=time.perf_counter, prefixo=PREFIXO,
+                 descricao="Latência das operações de dados"):
+        self.limites = tuple(limites)
+        self.relogio = relogio
+        self.prefixo = prefixo
+        self.descricao = descricao
+        self._metricas = {}
+        # Nomes dos métodos medidos por objeto; as chaves fracas não prendem o objeto
+        # (ex.: um Repositorio trocado ou fechado pelo App, com seu pool e conexões)
+        self._medidos = weakref.WeakKeyDictionary()
+        self._trava = threading.Lock()
+
+    def registrar(self, metodo, duracao, linhas=0, erro=False, falha=False):
+        """Soma uma chamada às métricas de um método"""
+        faixa = bisect_left(self.limites, duracao)
+        with self._trava:
+            metricas = self._metricas.get(metodo)
+            if metricas is None:
+                metricas = self._metricas[metodo] = MetricasMetodo(len(self.limites))
+            metricas.chamadas += 1
+            metricas.soma += duracao
+            metricas.faixas[faixa] += 1
+            metricas.linhas += linhas
+            metricas.erros += erro
+            metricas.falhas += falha
+
+    def medir(self, nome, funcao):
+        """Retorna funcao envolvida pela medição, registrada com o nome informado"""
+        relogio = self.relogio
+
+        @functools.wraps(funcao)
+        def medida(*args, **kwargs):
+            inicio = relogio()
+            try:
+                resultado = funcao(*args, **kwargs)
+            except BaseException:
+                self.registrar(nome, relogio() - inicio, erro=True)
+                raise
+            self.registrar(nome, relogio() - inicio, contar_linhas(resultado), falha=falhou(resultado))
+            return resultado
+
+        return medida
+
+    def instrumentar(self, objeto, metodos=METODOS_DADOS):
+        """Passa a medir os métodos de um objeto (os que ele não tiver são ignorados)"""
+        medidos = self._medidos.setdefault(objeto, set())
+        for nome in metodos:
+            original = getattr(objeto, nome, None)
+            if original is None or nome in medidos:
+                continue
+            medidos.add(nome)
+            # A versão medida fica no próprio objeto e esconde a da classe
+            setattr(objeto, nome, self.medir(nome, original))
+
+    def remover(self, objeto):
+        """Devolve ao objeto os métodos sem medição"""
+        for nome in self._medidos.pop(objeto, ()):
+            delattr(objeto, nome)
+
+    def limpar(self):
+        """Zera as métricas coletadas"""
+        with self._trava:
+            self._metricas = {}
+
+    def resumo(self):
+        """Retorna as métricas por método: chamadas, erros, falhas, linhas, tempos e faixas"""
+        with self._trava:
+            copia = {nome: (m.chamadas, m.erros, m.falhas, m.linhas, m.soma, list(m.faixas))
+                     for nome, m in self._metricas.items()}
+        resultado = {}
+        for nome, (chamadas, erros, falhas, linhas, soma, faixas) in sorted(copia.items()):
+            resultado[nome] = {
+                "chamadas": chamadas,
+                "erros": erros,
+                "falhas": falhas,
+                "linhas": linhas,
+                "segundos": soma,
+                "media_ms": soma * 1000 / chamadas if chamadas else 0.0,
+                "faixas": dict(zip(self.limites + (float("inf"),), faixas)),
+            }
+        return resultado
+
+    def exportar_prometheus(self):
+        """Retorna as métricas no formato de exposição em texto do Prometheus"""
+        resumo = self.resumo()
+        prefixo = self.prefixo
+        linhas = [
+            f"# HELP {prefixo}_duracao_segundos {self.descricao}",
+            f"# TYPE {prefixo}_duracao_segundos histogram",
+        ]
+        for nome, metricas in resumo.items():
+            acumulado = 0
+            for limite, quantidade in metricas["faixas"].items():
+                acumulado += quantidade
+                le = "+Inf" if limite == float("inf") else repr(limite)
+                linhas.append(f'{prefixo}_duracao_segundos_bucket{{metodo="{nome}",le="{le}"}} {acumulado}')
+            linhas.append(f'{prefixo}_duracao_segundos_sum{{metodo="{nome}"}} {metricas["segundos"]!r}')
+            linhas.append(f'{prefixo}_duracao_segundos_count{{metodo="{nome}"}} {metricas["chamadas"]}')
+
+        for campo, descricao in (("erros", "Exceções levantadas"),
+                                 ("falhas", "Resultados (False, mensagem)"),
+                                 ("linhas", "Linhas retornadas")):
+            linhas.append(f"# HELP {prefixo}_{campo}_total {descricao}")
+            linhas.append(f"# TYPE {prefixo}_{campo}_total counter")
+            for nome, metricas in resumo.items():
+                linhas.append(f'{prefixo}_{campo}_total{{metodo="{nome}"}} {metricas[campo]}')
+        return "\n".join(linhas) + "\n"
+
+    def gravar_prometheus(self, caminho):
+        """Grava o texto do Prometheus num arquivo, substituindo-o de uma só vez"""
+        gravar_atomicamente(caminho, self.exportar_prometheus())
@@ -0,0 +1,371 @@
+"""
+Modelo em memória do quadro Kanban (sem dependência de tkinter)
+"""
+import time
+from bisect import bisect_left
+from collections import namedtuple
+from difflib import SequenceMatcher
+from functools import lru_cache
+
+from .repositorio import STATUS_TAREFAS
+
+COLUNAS_KANBAN = STATUS_TAREFAS
+
+# Operações produzidas pelo modelo para sincronizar as listboxes
+REMOVER = "remover"
+INSERIR = "inserir"
+
+# Acima deste número de tarefas o quadro passa a usar colunas virtuais
+LIMITE_QUADRO_COMPLETO = 2000
+
+# Pausa na digitação, em milissegundos, antes de consultar a busca do quadro
+ATRASO_BUSCA_MS = 300
+
+# Registro compacto de uma tarefa exibida (tupla sem __dict__, comparável às
+# linhas retornadas pelo repositório)
+Tarefa = namedtuple("Tarefa", "id titulo descricao status prioridade data_criacao criado_em",
+                    defaults=(None,))
+
+# Quantas tarefas formatadas ficam guardadas para as próximas exibições
+TAMANHO_CACHE_FORMATACAO = 16384
+
+
+def registro_tarefa(linha):
+    """Converte uma linha do repositório (com ou sem colunas extras) em Tarefa"""
+    if type(linha) is Tarefa:
+        return linha
+    return Tarefa(*linha[:len(Tarefa._fields)])
+
+
+def coluna_da_tarefa(tarefa):
+    """Retorna a coluna em que uma linha (id, titulo, descricao, status, ...) é exibida"""
+    status = tarefa[3]
+    return status if status in COLUNAS_KANBAN else "A Fazer"
+
+
+def chave_ordenacao(tarefa):
+    """Chave da ordem do quadro: prioritárias primeiro, depois as mais recentes"""
+    return (-(tarefa[4] or 0), -tarefa[0])
+
+
+def formatar_data(tarefa):
+    """Formata a data de criação como dd/mm/aaaa sem interpretar texto quando possível"""
+    if tarefa.criado_em is not None:
+        return time.strftime('%d/%m/%Y', time.localtime(tarefa.criado_em))
+    # Linhas sem criado_em: recortar 'AAAA-MM-DD HH:MM:SS'
+    data = tarefa.data_criacao
+    if isinstance(data, str) and len(data) >= 10 and data[4] == data[7] == '-':
+        return f"{data[8:10]}/{data[5:7]}/{data[0:4]}"
+    return data
+
+
+@lru_cache(maxsize=TAMANHO_CACHE_FORMATACAO)
+def _formatar_registro(tarefa):
+    # A própria tupla é a versão da tarefa: qualquer campo alterado gera outra chave
+    prioridade = tarefa.prioridade if tarefa.prioridade else 0
+
+    display_text = f"[{tarefa.id}] {tarefa.titulo}"
+    if prioridade == 1:
+        display_text = f"🔴 {display_text}"
+    display_text += f"\n📅 {formatar_data(tarefa)}"
+    if tarefa.descricao:
+        display_text += f"\n  {tarefa.descricao[:25]}..."
+
+    # Destacar tarefas prioritárias em vermelho
+    if prioridade == 1:
+        cores = {'bg': '#ffcccc', 'fg': '#cc0000'}
+    else:
+        cores = {'bg': '#f0f0f0'}
+    return display_text, cores
+
+
+def formatar_tarefa(tarefa):
+    """Retorna o texto exibido e as cores de uma tarefa na listbox (memorizado por tarefa e versão)
+
+    O dicionário de cores é compartilhado entre chamadas e não deve ser alterado.
+    """
+    return _formatar_registro(registro_tarefa(tarefa))
+
+
+class ModeloKanban:
+    """Estado do quadro exibido, indexado pelo id da tarefa.
+
+    Cada método que altera o modelo devolve a lista mínima de operações
+    (REMOVER, coluna, indice) e (INSERIR, coluna, indice, tarefa) que leva
+    as listboxes do estado anterior ao novo. As operações devem ser aplicadas
+    na ordem em que foram geradas.
+    """
+
+    def __init__(self):
+        self.tarefas = {}
+        # Chaves de ordenação de cada coluna, na ordem de exibição
+        self.ordem = {coluna: [] for coluna in COLUNAS_KANBAN}
+
+    def __len__(self):
+        return len(self.tarefas)
+
+    def coluna(self, nome):
+        """Retorna as tarefas de uma coluna na ordem de exibição"""
+        return [self.tarefas[-chave[1]] for chave in self.ordem[nome]]
+
+    def tarefa_em(self, coluna, indice):
+        """Retorna a tarefa exibida numa linha da listbox de uma coluna (ou None)"""
+        chaves = self.ordem[coluna]
+        if not 0 <= indice < len(chaves):
+            return None
+        return self.tarefas[-chaves[indice][1]]
+
+    def posicao(self, tarefa_id):
+        """Retorna (coluna, índice) de uma tarefa exibida ou None"""
+        tarefa = self.tarefas.get(tarefa_id)
+        if tarefa is None:
+            return None
+        coluna = coluna_da_tarefa(tarefa)
+        return coluna, bisect_left(self.ordem[coluna], chave_ordenacao(tarefa))
+
+    def limpar(self):
+        """Esvazia o modelo e retorna as operações que limpam as colunas"""
+        operacoes = []
+        for coluna, chaves in self.ordem.items():
+            for indice in range(len(chaves) - 1, -1, -1):
+                operacoes.append((REMOVER, coluna, indice))
+        self.tarefas = {}
+        self.ordem = {coluna: [] for coluna in COLUNAS_KANBAN}
+        return operacoes
+
+    def substituir(self, tarefas):
+        """Troca todas as tarefas, gerando operações apenas para as linhas diferentes"""
+        novas = {tarefa[0]: registro_tarefa(tarefa) for tarefa in tarefas}
+        nova_ordem = {coluna: [] for coluna in COLUNAS_KANBAN}
+        for tarefa in novas.values():
+            nova_ordem[coluna_da_tarefa(tarefa)].append(chave_ordenacao(tarefa))
+
+        operacoes = []
+        for coluna in COLUNAS_KANBAN:
+            nova_ordem[coluna].sort()
+            antes = [(chave, self.tarefas[-chave[1]]) for chave in self.ordem[coluna]]
+            depois = [(chave, novas[-chave[1]]) for chave in nova_ordem[coluna]]
+            if antes == depois:
+                continue
+
+            comparador = SequenceMatcher(None, antes, depois, autojunk=False)
+            # De trás para frente, para que os índices antigos continuem válidos
+            for tag, i1, i2, j1, j2 in reversed(comparador.get_opcodes()):
+                if tag == "equal":
+                    continue
+                for indice in range(i2 - 1, i1 - 1, -1):
+                    operacoes.append((REMOVER, coluna, indice))
+                for deslocamento, (_, tarefa) in enumerate(depois[j1:j2]):
+                    operacoes.append((INSERIR, coluna, i1 + deslocamento, tarefa))
+
+        self.tarefas = novas
+        self.ordem = nova_ordem
+        return operacoes
+
+    def remover(self, tarefa_id):
+        """Remove uma tarefa do modelo"""
+        posicao = self.posicao(tarefa_id)
+        if posicao is None:
+            return []
+        coluna, indice = posicao
+        del self.ordem[coluna][indice]
+        del self.tarefas[tarefa_id]
+        return [(REMOVER, coluna, indice)]
+
+    def atualizar(self, tarefa):
+        """Insere ou atualiza uma tarefa, tocando só as linhas afetadas"""
+        tarefa = registro_tarefa(tarefa)
+        if self.tarefas.get(tarefa[0]) == tarefa:
+            return []
+
+        operacoes = self.remover(tarefa[0])
+        coluna = coluna_da_tarefa(tarefa)
+        chave = chave_ordenacao(tarefa)
+        indice = bisect_left(self.ordem[coluna], chave)
+        self.ordem[coluna].insert(indice, chave)
+        self.tarefas[tarefa[0]] = tarefa
+        operacoes.append((INSERIR, coluna, indice, tarefa))
+        return operacoes
+
+    def atualizar_varias(self, tarefas):
+        """Insere ou atualiza várias tarefas, retornando as operações de todas"""
+        operacoes = []
+        for tarefa in tarefas:
+            operacoes.extend(self.atualizar(tarefa))
+        return operacoes
+
+
+class JanelaVirtual:
+    """Janela de exibição de uma coluna virtual do Kanban.
+
+    Guarda apenas as páginas de tarefas próximas da área visível; a posição
+    e o tamanho da barra de rolagem são calculados a partir do total de
+    linhas da coluna, não das linhas carregadas. Tarefas inseridas e removidas
+    deslocam as linhas carregadas, como as operações do ModeloKanban, sem
+    descartar o cache; só as linhas de posição incerta voltam a ser pedidas.
+    """
+
+    def __init__(self, tamanho_pagina=100, margem=50, max_paginas=6):
+        self.tamanho_pagina = tamanho_pagina
+        self.margem = margem
+        self.max_paginas = max_paginas
+        self.total = 0
+        self.inicio = 0
+        self.visiveis = 15
+        # Incrementado a cada invalidação para descartar páginas atrasadas
+        self.versao = 0
+        self._paginas = {}
+        self._pedidas = set()
+
+    def definir_total(self, total):
+        """Define o total de linhas e descarta as páginas carregadas"""
+        self.total = total
+        self.invalidar()
+        self.posicionar(self.inicio)
+
+    def invalidar(self):
+        """Descarta as páginas em cache (ex.: após uma alteração no banco)"""
+        self.versao += 1
+        self._paginas = {}
+        self._pedidas = set()
+
+    def definir_visiveis(self, visiveis):
+        """Define quantas linhas cabem na listbox"""
+        self.visiveis = max(1, visiveis)
+        self.posicionar(self.inicio)
+
+    def posicionar(self, inicio):
+        """Move o topo da janela, respeitando os limites da coluna"""
+        self.inicio = max(0, min(int(inicio), self.total - self.visiveis))
+
+    def rolar(self, *args):
+        """Interpreta os argumentos do comando de uma scrollbar do Tk"""
+        if not args:
+            return
+        if args[0] == "moveto":
+            self.posicionar(float(args[1]) * self.total)
+        elif args[0] == "scroll":
+            passos = int(args[1])
+            if len(args) > 2 and args[2] == "pages":
+                passos *= self.visiveis
+            self.posicionar(self.inicio + passos)
+
+    def intervalo(self):
+        """Retorna (início, fim) das linhas visíveis"""
+        return self.inicio, min(self.total, self.inicio + self.visiveis)
+
+    def fracoes(self):
+        """Retorna as frações (primeira, última) para scrollbar.set"""
+        if self.total == 0:
+            return 0.0, 1.0
+        inicio, fim = self.intervalo()
+        return inicio / self.total, fim / self.total
+
+    def _pagina_completa(self, pagina):
+        """Indica se todas as linhas de uma página estão carregadas"""
+        linhas = self._paginas.get(pagina)
+        if linhas is None:
+            return False
+        esperadas = min(self.tamanho_pagina, self.total - pagina * self.tamanho_pagina)
+        return len(linhas) >= esperadas and None not in linhas[:esperadas]
+
+    def paginas_faltando(self):
+        """Retorna as páginas ainda não carregadas em torno da área visível e as marca como pedidas"""
+        inicio, fim = self.intervalo()
+        primeira = max(0, inicio - self.margem) // self.tamanho_pagina
+        ultima = max(0, min(self.total, fim + self.margem) - 1) // self.tamanho_pagina
+        faltando = []
+        for pagina in range(primeira, ultima + 1):
+            if pagina * self.tamanho_pagina >= self.total:
+                break
+            if not self._pagina_completa(pagina) and pagina not in self._pedidas:
+                self._pedidas.add(pagina)
+                faltando.append(pagina)
+        return faltando
+
+    def receber(self, pagina, linhas, versao):
+        """Guarda uma página carregada; retorna False se ela ficou obsoleta"""
+        if versao != self.versao:
+            return False
+        self._pedidas.discard(pagina)
+        self._paginas[pagina] = [registro_tarefa(linha) for linha in linhas]
+        # Manter só as páginas mais próximas da área visível
+        if len(self._paginas) > self.max_paginas:
+            atual = self.inicio // self.tamanho_pagina
+            for distante in sorted(self._paginas, key=lambda p: abs(p - atual))[self.max_paginas:]:
+                del self._paginas[distante]
+        return True
+
+    def _carregadas(self):
+        """Retorna {posição: tarefa} das linhas carregadas"""
+        return {
+            pagina * self.tamanho_pagina + deslocamento: tarefa
+            for pagina, linhas in self._paginas.items()
+            for deslocamento, tarefa in enumerate(linhas) if tarefa is not None
+        }
+
+    def _redistribuir(self, carregadas, total):
+        """Remonta as páginas a partir das novas posições das linhas carregadas
+
+        As páginas pedidas antes da alteração chegariam com as posições antigas:
+        a versão muda para que sejam descartadas.
+        """
+        self.total = total
+        self.versao += 1
+        self._pedidas = set()
+        self._paginas = {}
+        for posicao, tarefa in carregadas.items():
+            if posicao >= total:
+                continue
+            pagina, deslocamento = divmod(posicao, self.tamanho_pagina)
+            linhas = self._paginas.setdefault(pagina, [])
+            linhas.extend([None] * (deslocamento + 1 - len(linhas)))
+            linhas[deslocamento] = tarefa
+        self.posicionar(self.inicio)
+
+    def remover(self, tarefa_id):
+        """Retira uma tarefa carregada da coluna; retorna False se ela não está no cache"""
+        carregadas = self._carregadas()
+        posicao = next((p for p, tarefa in carregadas.items() if tarefa.id == tarefa_id), None)
+        if posicao is None:
+            return False
+        self._redistribuir({
+            p - (p > posicao): tarefa for p, tarefa in carregadas.items() if p != posicao
+        }, self.total - 1)
+        return True
+
+    def inserir(self, tarefa):
+        """Acrescenta uma tarefa à coluna na posição da ordem do quadro
+
+        As linhas carregadas depois dela descem uma posição. A própria tarefa
+        só entra no cache se as vizinhas carregadas fixarem a sua posição.
+        """
+        tarefa = registro_tarefa(tarefa)
+        chave = chave_ordenacao(tarefa)
+        carregadas = self._carregadas()
+        # A posição fica entre a última linha carregada antes dela e a primeira depois
+        antes = [p for p, t in carregadas.items() if chave_ordenacao(t) < chave]
+        depois = [p for p, t in carregadas.items() if chave_ordenacao(t) > chave]
+        minima = max(antes) + 1 if antes else 0
+        maxima = min(depois) if depois else self.total
+
+        novas = {p + (chave_ordenacao(t) > chave): t for p, t in carregadas.items()}
+        if minima == maxima:
+            novas[minima] = tarefa
+        self._redistribuir(novas, self.total + 1)
+
+    def linha(self, indice):
+        """Retorna a tarefa exibida numa linha da listbox (None se ainda estiver carregando)"""
+        posicao = self.inicio + indice
+        if not 0 <= indice < self.visiveis or posicao >= self.total:
+            return None
+        pagina = self._paginas.get(posicao // self.tamanho_pagina)
+        deslocamento = posicao % self.tamanho_pagina
+        if pagina is None or deslocamento >= len(pagina):
+            return None
+        return pagina[deslocamento]
+
+    def linhas(self):
+        """Retorna as tarefas visíveis (None para as que ainda estão carregando)"""
+        inicio, fim = self.intervalo()
+        return [self.linha(indice) for indice in range(fim - inicio)]
@@ -0,0 +1,149 @@
+"""
+Limitação de tentativas de login em memória (sem dependência de tkinter)
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+
+# Maior expoente do bloqueio exponencial; sem o teto, 2 ** excesso em float
+# estoura (OverflowError) depois de cerca de mil falhas seguidas
+EXPOENTE_MAXIMO = 32
+
+
+class LimiteTentativasError(Exception):
+    """Tentativa de login recusada antes de consultar o banco"""
+
+    def __init__(self, espera, motivo):
+        self.espera = espera
+        self.motivo = motivo
+        super().__init__(f"Muitas tentativas de login. Tente novamente em {math.ceil(espera)}s.")
+
+
+class BaldeTokens:
+    """Balde de tokens com reposição contínua e bloqueio exponencial após falhas"""
+
+    __slots__ = ("tokens", "atualizado_em", "falhas", "bloqueado_ate")
+
+    def __init__(self, capacidade, agora):
+        self.tokens = float(capacidade)
+        self.atualizado_em = agora
+        self.falhas = 0
+        self.bloqueado_ate = 0.0
+
+    def repor(self, capacidade, taxa, agora):
+        """Adiciona os tokens acumulados desde a última atualização"""
+        self.tokens = min(capacidade, self.tokens + (agora - self.atualizado_em) * taxa)
+        self.atualizado_em = agora
+
+    def espera_por_token(self, taxa):
+        """Segundos até haver um token inteiro disponível"""
+        return (1 - self.tokens) / taxa if taxa > 0 else float("inf")
+
+
+class LimitadorLogin:
+    """Limita tentativas de login por conta e por origem (ex.: endereço do cliente).
+
+    Cada conta e cada origem tem um balde de tokens: uma tentativa consome um
+    token de cada, e os tokens voltam aos poucos. Depois de falhas_livres
+    senhas erradas seguidas, a conta fica bloqueada por um tempo que dobra a
+    cada nova falha. Os baldes ficam num dicionário LRU limitado a max_baldes
+    por tipo; os ociosos há mais tempo são descartados primeiro.
+    """
+
+    def __init__(self, capacidade_conta=5, taxa_conta=1 / 12, capacidade_origem=30, taxa_origem=1.0,
+                 falhas_livres=3, espera_base=1.0, espera_maxima=300.0, max_baldes=10000,
+                 relogio=time.monotonic):
+        self.capacidade_conta = capacidade_conta
+        self.taxa_conta = taxa_conta
+        self.capacidade_origem = capacidade_origem
+        self.taxa_origem = taxa_origem
+        self.falhas_livres = falhas_livres
+        self.espera_base = espera_base
+        self.espera_maxima = espera_maxima
+        self.max_baldes = max_baldes
+        self.relogio = relogio
+
+        self._contas = OrderedDict()
+        self._origens = OrderedDict()
+        self._trava = threading.Lock()
+        self._contadores = {
+            "tentativas": 0,
+            "permitidas": 0,
+            "rejeitadas_conta": 0,
+            "rejeitadas_origem": 0,
+            "rejeitadas_bloqueio": 0,
+            "falhas": 0,
+            "sucessos": 0,
+            "baldes_descartados": 0,
+        }
+
+    def _balde(self, baldes, chave, capacidade, taxa, agora):
+        """Retorna o balde de uma chave, criando-o e marcando-o como usado recentemente"""
+        balde = baldes.get(chave)
+        if balde is None:
+            balde = baldes[chave] = BaldeTokens(capacidade, agora)
+            if len(baldes) > self.max_baldes:
+                baldes.popitem(last=False)
+                self._contadores["baldes_descartados"] += 1
+        else:
+            baldes.move_to_end(chave)
+            balde.repor(capacidade, taxa, agora)
+        return balde
+
+    def permitir(self, conta, origem=None):
+        """Consome uma tentativa; levanta LimiteTentativasError se ela deve ser recusada"""
+        agora = self.relogio()
+        with self._trava:
+            self._contadores["tentativas"] += 1
+            balde_conta = self._balde(self._contas, conta, self.capacidade_conta, self.taxa_conta, agora)
+
+            if balde_conta.bloqueado_ate > agora:
+                self._contadores["rejeitadas_bloqueio"] += 1
+                raise LimiteTentativasError(balde_conta.bloqueado_ate - agora, "bloqueio")
+
+            balde_origem = None
+            if origem is not None:
+                balde_origem = self._balde(self._origens, origem, self.capacidade_origem,
+                                           self.taxa_origem, agora)
+                if balde_origem.tokens < 1:
+                    self._contadores["rejeitadas_origem"] += 1
+                    raise LimiteTentativasError(balde_origem.espera_por_token(self.taxa_origem), "origem")
+
+            if balde_conta.tokens < 1:
+                self._contadores["rejeitadas_conta"] += 1
+                raise LimiteTentativasError(balde_conta.espera_por_token(self.taxa_conta), "conta")
+
+            balde_conta.tokens -= 1
+            if balde_origem is not None:
+                balde_origem.tokens -= 1
+            self._contadores["permitidas"] += 1
+
+    def registrar_falha(self, conta):
+        """Registra uma senha errada, bloqueando a conta após falhas seguidas"""
+        agora = self.relogio()
+        with self._trava:
+            self._contadores["falhas"] += 1
+            balde = self._balde(self._contas, conta, self.capacidade_conta, self.taxa_conta, agora)
+            balde.falhas += 1
+            excesso = balde.falhas - self.falhas_livres
+            if excesso >= 0:
+                espera = min(self.espera_maxima, self.espera_base * 2 ** min(excesso, EXPOENTE_MAXIMO))
+                balde.bloqueado_ate = agora + espera
+
+    def registrar_sucesso(self, conta):
+        """Zera as falhas seguidas de uma conta após um login correto"""
+        with self._trava:
+            self._contadores["sucessos"] += 1
+            balde = self._contas.get(conta)
+            if balde is not None:
+                balde.falhas = 0
+                balde.bloqueado_ate = 0.0
+
+    def contadores(self):
+        """Retorna uma cópia dos contadores para monitoramento"""
+        with self._trava:
+            resultado = dict(self._contadores)
+            resultado["baldes_conta"] = len(self._contas)
+            resultado["baldes_origem"] = len(self._origens)
+        return resultado
@@ -1,21 +1,56 @@
 import tkinter as tk
 from tkinter import messagebox, ttk
-import sqlite3
+from tkinter import font as tkfont
 import os
 import re
-from datetime import datetime
+
+from .diretorio import DiretorioUsuarios
+from .executor import ExecutorBanco
+from .instrumentacao import VARIAVEL_METRICAS, Instrumentacao, gravar_atomicamente
+from .limitador import LimiteTentativasError
+from .kanban import (
+    ATRASO_BUSCA_MS, COLUNAS_KANBAN, INSERIR, LIMITE_QUADRO_COMPLETO, JanelaVirtual, ModeloKanban,
+    coluna_da_tarefa, formatar_tarefa
+)
+from .monitor_ui import MonitorUI
+from .repositorio import Repositorio
+
+# Intervalo entre as gravações do arquivo de métricas
+INTERVALO_METRICAS_MS = 15000
+
 
 class App:
-    def __init__(self, root):
+    def __init__(self, root, perfil_db=None, instrumentacao=None, monitor_ui=None):
         self.root = root
         self.root.title("Tela de Login")
         self.root.geometry("400x300")
         self.root.resizable(False, False)
         
-        # Inicializar banco de dados
+        # Detector de travamentos da interface: desligado, a menos que seja informado
+        # ou que TASKS_UI_LIMITE_MS defina o limite; inicia antes de criar os widgets
+        # para que os comandos dos botões sejam registrados já medidos
+        if monitor_ui is None:
+            monitor_ui = MonitorUI.do_ambiente(root)
+        self.monitor_ui = monitor_ui
+        if self.monitor_ui is not None:
+            self.monitor_ui.iniciar()
+        
+        # Medição das operações de dados: desligada, a menos que seja informada
+        # ou que TASKS_METRICAS_ARQUIVO aponte o arquivo de métricas do Prometheus
+        self.arquivo_metricas = os.environ.get(VARIAVEL_METRICAS)
+        if instrumentacao is None and self.arquivo_metricas:
+            instrumentacao = Instrumentacao()
+        self.instrumentacao = instrumentacao
+        
+        # Inicializar banco de dados (perfil de PRAGMAs: durable, balanced ou throughput;
+        # se omitido, usa a variável de ambiente TASKS_DB_PERFIL ou "balanced")
+        self.perfil_db = perfil_db
         self.db_file = "users.db"
         self.init_database()
         
+        # Sessão do usuário logado (id, papel e token), mantida em memória
+        self.sessao = None
+        
         # Container principal que vai conter os frames de login, cadastro e página inicial
         self.container = ttk.Frame(root)
         self.container.pack(fill=tk.BOTH, expand=True)
@@ -24,16 +59,17 @@ class App:
         self.login_frame = LoginScreen(self.container, self)
         self.cadastro_frame = CadastroScreen(self.container, self)
         self.pagina_inicial_frame = PaginaInicialScreen(self.container, self)
-        
-        # Variáveis para armazenar informações do usuário logado
-        self.usuario_logado = None
-        self.email_logado = None
+        if self.monitor_ui is not None:
+            self.monitor_ui.instrumentar(self.pagina_inicial_frame)
         
         # Mostrar inicialmente a tela de login
         self.mostrar_login()
         
         # Centralizar janela
         self.center_window()
+        
+        if self.arquivo_metricas and (self.instrumentacao is not None or self.monitor_ui is not None):
+            self.root.after(INTERVALO_METRICAS_MS, self.gravar_metricas_periodicamente)
     
     def center_window(self):
         """Centraliza a janela na tela"""
@@ -51,8 +87,9 @@ class App:
         self.cadastro_frame.esconder()
         self.pagina_inicial_frame.esconder()
         self.login_frame.mostrar()
-        self.usuario_logado = None
-        self.email_logado = None
+        if self.sessao is not None:
+            self.encerrar_sessao(self.sessao.token)
+            self.sessao = None
         self.center_window()
     
     def mostrar_cadastro(self):
@@ -64,18 +101,17 @@ class App:
         self.cadastro_frame.mostrar()
         self.center_window()
     
-    def mostrar_pagina_inicial(self, nome_usuario, email_usuario):
-        """Mostra a página inicial e esconde as outras"""
+    def mostrar_pagina_inicial(self, sessao):
+        """Mostra a página inicial da sessão autenticada e esconde as outras"""
         # Esconder todas as outras telas primeiro
         self.login_frame.esconder()
         self.cadastro_frame.esconder()
         
         # Configurar usuário logado
-        self.usuario_logado = nome_usuario
-        self.email_logado = email_usuario
+        self.sessao = sessao
         
         # Atualizar título e tamanho da janela
-        if email_usuario == "admin":
+        if sessao.eh_admin:
             self.root.title("Página Inicial - Admin")
             self.root.geometry("1200x800")
         else:
@@ -89,282 +125,225 @@ class App:
         self.center_window()
         self.root.update_idletasks()
     
-    def init_database(self):
-        """Inicializa o banco de dados SQLite e cria a tabela se não existir"""
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
-        
-        # Criar tabela de usuários se não existir
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS usuarios (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                nome TEXT NOT NULL,
-                email TEXT UNIQUE NOT NULL,
-                senha TEXT NOT NULL
-            )
-        ''')
-        
-        # Criar tabela de tarefas se não existir
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS tarefas (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                usuario_email TEXT NOT NULL,
-                titulo TEXT NOT NULL,
-                descricao TEXT,
-                status TEXT NOT NULL,
-                prioridade INTEGER DEFAULT 0,
-                data_criacao TEXT NOT NULL,
-                FOREIGN KEY (usuario_email) REFERENCES usuarios(email)
-            )
-        ''')
-        
-        # Migração: adicionar colunas se não existirem
-        cursor.execute("PRAGMA table_info(tarefas)")
-        colunas_existentes = [col[1] for col in cursor.fetchall()]
-        
-        if 'prioridade' not in colunas_existentes:
-            cursor.execute('ALTER TABLE tarefas ADD COLUMN prioridade INTEGER DEFAULT 0')
-        
-        if 'data_criacao' not in colunas_existentes:
-            data_default = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            cursor.execute(f'ALTER TABLE tarefas ADD COLUMN data_criacao TEXT DEFAULT "{data_default}"')
-            # Atualizar tarefas existentes com data atual
-            cursor.execute('UPDATE tarefas SET data_criacao = ? WHERE data_criacao IS NULL OR data_criacao = ""',
-                         (data_default,))
-        
-        conn.commit()
-        
-        # Criar usuário administrador padrão se não existir
-        cursor.execute('SELECT email FROM usuarios WHERE email = ?', ('admin',))
-        if cursor.fetchone() is None:
-            cursor.execute('''
-                INSERT INTO usuarios (nome, email, senha)
-                VALUES (?, ?, ?)
-            ''', ('Administrador', 'admin', 'admin'))
-            conn.commit()
-        
-        conn.close()
+    @property
+    def usuario_logado(self):
+        """Nome do usuário da sessão atual"""
+        return self.sessao.nome if self.sessao else None
+    
+    @property
+    def email_logado(self):
+        """Email do usuário da sessão atual"""
+        return self.sessao.email if self.sessao else None
+    
+    @property
+    def eh_admin(self):
+        """Indica se a sessão atual é do administrador (sem consultar o banco)"""
+        return self.sessao is not None and self.sessao.eh_admin
+    
+    def init_database(self, progresso=None):
+        """Inicializa o banco de dados SQLite aplicando as migrações pendentes"""
+        return self.repositorio.init_database(progresso)
+    
+    @property
+    def db_file(self):
+        """Caminho do arquivo do banco de dados"""
+        return self.repositorio.db_file
+    
+    @db_file.setter
+    def db_file(self, caminho):
+        """Troca o arquivo do banco de dados, recriando o repositório"""
+        if getattr(self, 'repositorio', None) is not None:
+            self.fechar()
+        self.repositorio = Repositorio(caminho, self.perfil_db, instrumentacao=self.instrumentacao)
+        # Cache dos usuários cadastrados (lista do admin e nomes por email)
+        self.diretorio = DiretorioUsuarios()
+        # Consultas disparadas pelas telas rodam fora da thread do Tk
+        self.executor = ExecutorBanco(self.root, self.repositorio.pool)
+    
+    @property
+    def pool(self):
+        """Pool de conexões do repositório"""
+        return self.repositorio.pool
+    
+    def conexao(self):
+        """Empresta uma conexão do pool (usar com 'with')"""
+        return self.repositorio.conexao()
     
     def get_connection(self):
-        """Retorna uma conexão com o banco de dados"""
-        return sqlite3.connect(self.db_file)
+        """Retorna uma conexão avulsa com o banco de dados (fora do pool)"""
+        return self.repositorio.get_connection()
     
-    def verificar_usuario(self, email, senha):
-        """Verifica se o email e senha correspondem a um usuário"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT nome, email, senha FROM usuarios 
-            WHERE email = ? AND senha = ?
-        ''', (email, senha))
-        
-        resultado = cursor.fetchone()
-        conn.close()
-        
-        return resultado
+    def fechar(self):
+        """Encerra o executor em segundo plano e fecha as conexões com o banco de dados"""
+        self.executor.encerrar()
+        self.repositorio.fechar()
+        self.gravar_metricas()
+    
+    def metricas(self):
+        """Retorna as métricas das operações de dados por método (None se desligadas)"""
+        return self.instrumentacao.resumo() if self.instrumentacao is not None else None
+    
+    def metricas_ui(self):
+        """Retorna as métricas dos handlers da interface e do atraso do laço (None se desligadas)"""
+        return self.monitor_ui.resumo() if self.monitor_ui is not None else None
+    
+    def gravar_metricas(self):
+        """Grava as métricas (dados e interface) no arquivo de TASKS_METRICAS_ARQUIVO, se configurado"""
+        if not self.arquivo_metricas:
+            return
+        textos = [fonte.exportar_prometheus() for fonte in (self.instrumentacao, self.monitor_ui)
+                  if fonte is not None]
+        if textos:
+            gravar_atomicamente(self.arquivo_metricas, "".join(textos))
+    
+    def gravar_metricas_periodicamente(self):
+        """Grava as métricas e agenda a próxima gravação"""
+        self.gravar_metricas()
+        self.root.after(INTERVALO_METRICAS_MS, self.gravar_metricas_periodicamente)
+    
+    def verificar_usuario(self, email, senha, origem=None):
+        """Verifica se o email e senha correspondem a um usuário, retornando (nome, email) ou None"""
+        return self.repositorio.verificar_usuario(email, senha, origem)
+    
+    def autenticar(self, email, senha, origem=None):
+        """Verifica as credenciais e abre uma sessão, retornando a Sessao ou None"""
+        return self.repositorio.autenticar(email, senha, origem)
+    
+    def retomar_sessao(self, token):
+        """Retorna a sessão ainda válida de um token, sem consultar o banco nem recalcular o hash"""
+        return self.repositorio.retomar_sessao(token)
+    
+    def encerrar_sessao(self, token):
+        """Encerra uma sessão (logout)"""
+        return self.repositorio.encerrar_sessao(token)
+    
+    def contadores_login(self):
+        """Retorna os contadores do limite de tentativas de login"""
+        return self.repositorio.contadores_login()
     
     def usuario_existe(self, email):
         """Verifica se um email já está cadastrado"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT email FROM usuarios WHERE email = ?', (email,))
-        resultado = cursor.fetchone()
-        conn.close()
-        
-        return resultado is not None
+        return self.repositorio.usuario_existe(email)
     
     def cadastrar_usuario(self, nome, email, senha):
         """Cadastra um novo usuário no banco de dados"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        try:
-            cursor.execute('''
-                INSERT INTO usuarios (nome, email, senha)
-                VALUES (?, ?, ?)
-            ''', (nome, email, senha))
-            
-            conn.commit()
-            conn.close()
-            return True
-        except sqlite3.IntegrityError:
-            conn.close()
+        usuario = self.repositorio.cadastrar_usuario(nome, email, senha, retornar_usuario=True)
+        if usuario is None:
             return False
+        self.diretorio.adicionar(usuario)
+        return True
     
     def listar_usuarios(self):
-        """Lista todos os usuários cadastrados"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT id, nome, email FROM usuarios ORDER BY nome')
-        usuarios = cursor.fetchall()
-        conn.close()
-        
+        """Lista todos os usuários cadastrados (do cache, após a primeira consulta)"""
+        usuarios = self.diretorio.listar()
+        if usuarios is None:
+            usuarios = self.repositorio.listar_usuarios()
+            self.diretorio.carregar(usuarios)
         return usuarios
     
+    def nome_usuario(self, email):
+        """Retorna o nome de exibição de um usuário sem consultar o banco"""
+        return self.diretorio.nome(email, email)
+    
     def excluir_usuario(self, email):
         """Exclui um usuário do banco de dados"""
-        # Não permitir excluir o próprio admin
-        if email == "admin":
-            return False, "Não é possível excluir o usuário administrador!"
-        
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        try:
-            # Excluir tarefas do usuário primeiro
-            cursor.execute('DELETE FROM tarefas WHERE usuario_email = ?', (email,))
-            # Excluir o usuário
-            cursor.execute('DELETE FROM usuarios WHERE email = ?', (email,))
-            if cursor.rowcount > 0:
-                conn.commit()
-                conn.close()
-                return True, "Usuário excluído com sucesso!"
-            else:
-                conn.close()
-                return False, "Usuário não encontrado!"
-        except Exception as e:
-            conn.close()
-            return False, f"Erro ao excluir usuário: {str(e)}"
+        sucesso, mensagem = self.repositorio.excluir_usuario(email)
+        if sucesso:
+            self.diretorio.remover(email)
+        return sucesso, mensagem
     
     def listar_tarefas(self, usuario_email=None):
         """Lista todas as tarefas de um usuário (ou de todos se usuario_email for None)"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        if usuario_email:
-            cursor.execute('''
-                SELECT id, titulo, descricao, status, prioridade, data_criacao FROM tarefas 
-                WHERE usuario_email = ? 
-                ORDER BY prioridade DESC, id DESC
-            ''', (usuario_email,))
-        else:
-            # Se None, retorna todas as tarefas (para admin)
-            cursor.execute('''
-                SELECT id, titulo, descricao, status, prioridade, data_criacao, usuario_email 
-                FROM tarefas 
-                ORDER BY prioridade DESC, id DESC
-            ''')
-        
-        tarefas = cursor.fetchall()
-        conn.close()
-        
-        return tarefas
+        return self.repositorio.listar_tarefas(usuario_email)
     
-    def adicionar_tarefa(self, usuario_email, titulo, descricao, status="A Fazer", prioridade=0):
-        """Adiciona uma nova tarefa"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        try:
-            data_criacao = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            cursor.execute('''
-                INSERT INTO tarefas (usuario_email, titulo, descricao, status, prioridade, data_criacao)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (usuario_email, titulo, descricao, status, prioridade, data_criacao))
-            
-            conn.commit()
-            tarefa_id = cursor.lastrowid
-            conn.close()
-            return True, tarefa_id
-        except Exception as e:
-            conn.close()
-            return False, str(e)
+    def listar_tarefas_pagina(self, usuario_email=None, limite=100, continuacao=None):
+        """Lista uma página de tarefas na ordem do quadro, retornando (tarefas, continuacao)"""
+        return self.repositorio.listar_tarefas_pagina(usuario_email, limite, continuacao)
+    
+    def iterar_tarefas(self, usuario_email=None, tamanho_lote=500):
+        """Percorre as tarefas na ordem do quadro com memória constante"""
+        return self.repositorio.iterar_tarefas(usuario_email, tamanho_lote)
+    
+    def consultar_tarefas(self, filtro=None, limite=100, continuacao=None, contar=True, **filtros):
+        """Consulta tarefas de todos os usuários por dono, status, prioridade, período e texto
+
+        Retorna (tarefas, continuacao, total); ver Repositorio.consultar_tarefas.
+        """
+        return self.repositorio.consultar_tarefas(filtro, limite, continuacao, contar, **filtros)
+    
+    def contar_tarefas_por_status(self, usuario_email):
+        """Conta as tarefas de um usuário em cada status"""
+        return self.repositorio.contar_tarefas_por_status(usuario_email)
+    
+    def contar_tarefas_por_usuario(self):
+        """Conta as tarefas de todos os usuários: {email: {status: quantidade}}"""
+        return self.repositorio.contar_tarefas_por_usuario()
+    
+    def listar_usuarios_com_contagens(self):
+        """Lista os usuários (id, nome, email) seguidos das quantidades de tarefas em cada coluna"""
+        usuarios = self.listar_usuarios()
+        contagens = self.contar_tarefas_por_usuario()
+        return [
+            tuple(usuario) + tuple(contagens.get(usuario[2], {}).get(status, 0) for status in COLUNAS_KANBAN)
+            for usuario in usuarios
+        ]
+    
+    def listar_tarefas_status(self, usuario_email, status, limite, deslocamento=0):
+        """Lista uma faixa das tarefas de um usuário em um status, na ordem do quadro"""
+        return self.repositorio.listar_tarefas_status(usuario_email, status, limite, deslocamento)
+    
+    def buscar_tarefas(self, texto, usuario_email=None, limite=100):
+        """Busca tarefas pelo título e descrição, ordenadas por relevância"""
+        return self.repositorio.buscar_tarefas(texto, usuario_email, limite)
+    
+    def carregar_quadro(self, usuario_email, limite=None):
+        """Retorna as contagens por status e, se o total não passar de limite, as tarefas do quadro"""
+        return self.repositorio.carregar_quadro(usuario_email, limite)
+    
+    def adicionar_tarefa(self, usuario_email, titulo, descricao, status="A Fazer", prioridade=0,
+                         retornar_tarefa=False):
+        """Adiciona uma nova tarefa (retorna o id ou, com retornar_tarefa, a linha criada)"""
+        return self.repositorio.adicionar_tarefa(usuario_email, titulo, descricao, status, prioridade,
+                                                 retornar_tarefa)
+    
+    def adicionar_tarefas_em_lote(self, tarefas, tamanho_lote=1000):
+        """Insere muitas tarefas em uma única transação, retornando (ids, falhas)"""
+        return self.repositorio.adicionar_tarefas_em_lote(tarefas, tamanho_lote)
     
     def obter_prioridade_tarefa(self, tarefa_id):
         """Obtém a prioridade atual de uma tarefa"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        try:
-            cursor.execute('SELECT prioridade FROM tarefas WHERE id = ?', (tarefa_id,))
-            resultado = cursor.fetchone()
-            conn.close()
-            if resultado:
-                return resultado[0] if resultado[0] else 0
-            return 0
-        except Exception as e:
-            conn.close()
-            return 0
-    
-    def atualizar_prioridade_tarefa(self, tarefa_id, prioridade):
-        """Atualiza a prioridade de uma tarefa"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        try:
-            cursor.execute('UPDATE tarefas SET prioridade = ? WHERE id = ?', (prioridade, tarefa_id))
-            conn.commit()
-            conn.close()
-            return True
-        except Exception as e:
-            conn.close()
-            return False
+        return self.repositorio.obter_prioridade_tarefa(tarefa_id)
+    
+    def atualizar_prioridade_tarefa(self, tarefa_id, prioridade, usuario_email=None, *, retornar_tarefa=False):
+        """Atualiza a prioridade de uma tarefa (com retornar_tarefa, retorna a linha alterada ou None)"""
+        return self.repositorio.atualizar_prioridade_tarefa(tarefa_id, prioridade, usuario_email,
+                                                            retornar_tarefa=retornar_tarefa)
+    
+    def definir_prioridade_tarefa(self, tarefa_id, prioridade, usuario_email=None, *, retornar_tarefa=False):
+        """Atualiza a prioridade de uma tarefa, retornando (sucesso, mensagem ou linha alterada)"""
+        return self.repositorio.definir_prioridade_tarefa(tarefa_id, prioridade, usuario_email,
+                                                          retornar_tarefa=retornar_tarefa)
     
     def verificar_propriedade_tarefa(self, tarefa_id, usuario_email):
         """Verifica se uma tarefa pertence a um usuário"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT usuario_email FROM tarefas WHERE id = ?', (tarefa_id,))
-        resultado = cursor.fetchone()
-        conn.close()
-        
-        if resultado and resultado[0] == usuario_email:
-            return True
-        return False
+        return self.repositorio.verificar_propriedade_tarefa(tarefa_id, usuario_email)
     
-    def atualizar_status_tarefa(self, tarefa_id, novo_status, usuario_email=None):
+    def atualizar_status_tarefa(self, tarefa_id, novo_status, usuario_email=None, *, retornar_tarefa=False):
         """Atualiza o status de uma tarefa (apenas se pertencer ao usuário ou for admin)"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        try:
-            # Admin pode modificar qualquer tarefa
-            # Usuários normais só podem modificar suas próprias tarefas
-            if usuario_email and usuario_email != "admin":
-                if not self.verificar_propriedade_tarefa(tarefa_id, usuario_email):
-                    conn.close()
-                    return False, "Você não tem permissão para modificar esta tarefa!"
-            
-            cursor.execute('UPDATE tarefas SET status = ? WHERE id = ?', (novo_status, tarefa_id))
-            if cursor.rowcount > 0:
-                conn.commit()
-                conn.close()
-                return True, "Tarefa atualizada com sucesso!"
-            else:
-                conn.close()
-                return False, "Tarefa não encontrada!"
-        except Exception as e:
-            conn.close()
-            return False, f"Erro ao atualizar tarefa: {str(e)}"
+        return self.repositorio.atualizar_status_tarefa(tarefa_id, novo_status, usuario_email,
+                                                        retornar_tarefa=retornar_tarefa)
+    
+    def atualizar_status_tarefas(self, tarefa_ids, novo_status, usuario_email=None):
+        """Atualiza o status de várias tarefas de uma vez (todas ou nenhuma)"""
+        return self.repositorio.atualizar_status_tarefas(tarefa_ids, novo_status, usuario_email)
+    
+    def atualizar_prioridade_tarefas(self, tarefa_ids, prioridade, usuario_email=None):
+        """Atualiza a prioridade de várias tarefas de uma vez (todas ou nenhuma)"""
+        return self.repositorio.atualizar_prioridade_tarefas(tarefa_ids, prioridade, usuario_email)
     
     def excluir_tarefa(self, tarefa_id, usuario_email=None):
         """Exclui uma tarefa (apenas se pertencer ao usuário ou for admin)"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        try:
-            # Admin pode excluir qualquer tarefa
-            # Usuários normais só podem excluir suas próprias tarefas
-            if usuario_email and usuario_email != "admin":
-                if not self.verificar_propriedade_tarefa(tarefa_id, usuario_email):
-                    conn.close()
-                    return False, "Você não tem permissão para excluir esta tarefa!"
-            
-            cursor.execute('DELETE FROM tarefas WHERE id = ?', (tarefa_id,))
-            if cursor.rowcount > 0:
-                conn.commit()
-                conn.close()
-                return True, "Tarefa excluída com sucesso!"
-            else:
-                conn.close()
-                return False, "Tarefa não encontrada!"
-        except Exception as e:
-            conn.close()
-            return False, f"Erro ao excluir tarefa: {str(e)}"
+        return self.repositorio.excluir_tarefa(tarefa_id, usuario_email)
 
 
 class LoginScreen:
@@ -419,13 +398,13 @@ class LoginScreen:
         button_frame.grid(row=2, column=0)
         
         # Botão Entrar
-        entrar_btn = ttk.Button(
+        self.entrar_btn = ttk.Button(
             button_frame,
             text="Entrar",
             command=self.entrar,
             width=15
         )
-        entrar_btn.grid(row=0, column=0, padx=(0, 5), sticky=tk.EW)
+        self.entrar_btn.grid(row=0, column=0, padx=(0, 5), sticky=tk.EW)
         
         # Botão Cadastrar
         cadastrar_btn = ttk.Button(
@@ -464,18 +443,24 @@ class LoginScreen:
             self.senha_entry.focus()
             return
         
-        # Verificar credenciais no banco de dados
-        resultado = self.app.verificar_usuario(login, senha)
-        
-        if resultado:
-            nome = resultado[0]
-            email = resultado[1]
+        # Verificar credenciais no banco de dados em segundo plano
+        self.entrar_btn.config(state=tk.DISABLED)
+        self.app.executor.submeter(
+            self.app.autenticar, login, senha,
+            ao_concluir=self.concluir_login,
+            ao_falhar=self.falha_login
+        )
+    
+    def concluir_login(self, sessao):
+        """Trata o resultado da verificação de credenciais"""
+        self.entrar_btn.config(state=tk.NORMAL)
+        if sessao:
             # Limpar campos primeiro
             self.clear_fields()
             # Esconder a tela de login imediatamente
             self.esconder()
             # Abrir página inicial substituindo a tela de login
-            self.app.mostrar_pagina_inicial(nome, email)
+            self.app.mostrar_pagina_inicial(sessao)
             # Atualizar a janela para garantir que a troca seja visível
             self.app.root.update_idletasks()
         else:
@@ -483,6 +468,14 @@ class LoginScreen:
             self.senha_entry.delete(0, tk.END)
             self.senha_entry.focus()
     
+    def falha_login(self, erro):
+        """Trata erros de banco durante a verificação de credenciais"""
+        self.entrar_btn.config(state=tk.NORMAL)
+        if isinstance(erro, LimiteTentativasError):
+            messagebox.showwarning("Aviso", str(erro))
+            return
+        messagebox.showerror("Erro", f"Erro ao verificar credenciais: {erro}")
+    
     def abrir_cadastro(self):
         """Troca para a tela de cadastro"""
         self.app.mostrar_cadastro()
@@ -554,13 +547,13 @@ class CadastroScreen:
         button_frame.grid(row=2, column=0)
         
         # Botão Cadastrar
-        cadastrar_btn = ttk.Button(
+        self.cadastrar_btn = ttk.Button(
             button_frame,
             text="Cadastrar",
             command=self.cadastrar,
             width=15
         )
-        cadastrar_btn.grid(row=0, column=0, padx=(0, 5), sticky=tk.EW)
+        self.cadastrar_btn.grid(row=0, column=0, padx=(0, 5), sticky=tk.EW)
         
         # Botão Voltar
         voltar_btn = ttk.Button(
@@ -623,13 +616,28 @@ class CadastroScreen:
             self.email_entry.focus()
             return
         
-        # Cadastrar novo usuário no banco de dados
-        if self.app.cadastrar_usuario(nome, email, senha):
+        # Cadastrar novo usuário em segundo plano (o hash da senha é lento de propósito)
+        self.cadastrar_btn.config(state=tk.DISABLED)
+        self.app.executor.submeter(
+            self.app.cadastrar_usuario, nome, email, senha,
+            ao_concluir=self.concluir_cadastro,
+            ao_falhar=self.falha_cadastro
+        )
+    
+    def concluir_cadastro(self, sucesso):
+        """Trata o resultado do cadastro"""
+        self.cadastrar_btn.config(state=tk.NORMAL)
+        if sucesso:
             messagebox.showinfo("Sucesso", "Usuário cadastrado com sucesso!")
             self.voltar()
         else:
             messagebox.showerror("Erro", "Erro ao cadastrar usuário. Tente novamente.")
     
+    def falha_cadastro(self, erro):
+        """Trata erros durante o cadastro"""
+        self.cadastrar_btn.config(state=tk.NORMAL)
+        messagebox.showerror("Erro", f"Erro ao cadastrar usuário: {erro}")
+    
     def voltar(self):
         """Volta para a tela de login"""
         self.app.mostrar_login()
@@ -683,7 +691,7 @@ class PaginaInicialScreen:
         atualizar_btn = ttk.Button(
             buttons_frame,
             text="Atualizar Lista",
-            command=self.atualizar_lista,
+            command=self.recarregar_lista,
             width=20
         )
         atualizar_btn.pack(side=tk.LEFT)
@@ -702,7 +710,7 @@ class PaginaInicialScreen:
         # Treeview
         self.tree = ttk.Treeview(
             tree_frame,
-            columns=("ID", "Nome", "Email"),
+            columns=("ID", "Nome", "Email") + COLUNAS_KANBAN,
             show="headings",
             yscrollcommand=v_scrollbar.set,
             xscrollcommand=h_scrollbar.set,
@@ -718,6 +726,11 @@ class PaginaInicialScreen:
         self.tree.column("Nome", width=200)
         self.tree.column("Email", width=250)
         
+        # Quantidade de tarefas do usuário em cada coluna do Kanban
+        for coluna in COLUNAS_KANBAN:
+            self.tree.heading(coluna, text=coluna)
+            self.tree.column(coluna, width=90, anchor=tk.CENTER)
+        
         self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         v_scrollbar.config(command=self.tree.yview)
         h_scrollbar.config(command=self.tree.xview)
@@ -781,25 +794,53 @@ class PaginaInicialScreen:
         atualizar_kanban_btn = ttk.Button(
             kanban_buttons_frame,
             text="Atualizar",
-            command=lambda: self.carregar_kanban_admin() if self.app.email_logado == "admin" else self.carregar_kanban(),
+            command=self.recarregar_kanban,
             width=15
         )
         atualizar_kanban_btn.pack(side=tk.LEFT)
         
+        # Busca por título e descrição: o quadro passa a exibir só as tarefas encontradas
+        limpar_busca_btn = ttk.Button(
+            kanban_buttons_frame,
+            text="Limpar",
+            command=self.limpar_busca,
+            width=10
+        )
+        limpar_busca_btn.pack(side=tk.RIGHT)
+        
+        self.busca_entry = ttk.Entry(kanban_buttons_frame, font=("Arial", 10), width=30)
+        self.busca_entry.pack(side=tk.RIGHT, padx=(0, 5))
+        self.busca_entry.bind("<KeyRelease>", lambda e: self.agendar_busca())
+        self.busca_entry.bind("<Return>", lambda e: self.aplicar_busca())
+        
+        ttk.Label(kanban_buttons_frame, text="Buscar:", font=("Arial", 10)).pack(side=tk.RIGHT, padx=(0, 5))
+        
+        # Termo da busca ativa (None exibe o quadro completo) e busca aguardando a digitação parar
+        self.termo_busca = None
+        self.busca_agendada = None
+        
         # Frame para colunas do Kanban
         kanban_columns_frame = ttk.Frame(self.kanban_frame)
         kanban_columns_frame.pack(fill=tk.BOTH, expand=True)
         
-        # Colunas do Kanban
-        self.colunas_kanban = {
-            "A Fazer": [],
-            "Em Progresso": [],
-            "Concluído": []
-        }
+        # Tarefas exibidas no Kanban, usadas para atualizar só as linhas alteradas
+        self.modelo_kanban = ModeloKanban()
+        self.email_kanban = None
+        
+        # Quantidade de tarefas exibida no cabeçalho de cada coluna (None enquanto não carregado)
+        self.contagens_kanban = None
+        
+        # Contador que identifica a consulta mais recente do Kanban
+        self.geracao_kanban = 0
+        
+        # Quadros muito grandes usam colunas virtuais, que só exibem as linhas visíveis
+        self.modo_virtual = False
+        self.janelas_virtuais = {coluna: JanelaVirtual() for coluna in COLUNAS_KANBAN}
+        self.altura_linha = tkfont.Font(font=("Arial", 10)).metrics("linespace")
         
         # Criar colunas
         self.kanban_widgets = {}
-        for i, coluna in enumerate(["A Fazer", "Em Progresso", "Concluído"]):
+        for i, coluna in enumerate(COLUNAS_KANBAN):
             # Frame da coluna
             col_frame = ttk.LabelFrame(
                 kanban_columns_frame,
@@ -809,14 +850,25 @@ class PaginaInicialScreen:
             col_frame.grid(row=0, column=i, padx=5, sticky=tk.NSEW, pady=5)
             kanban_columns_frame.columnconfigure(i, weight=1)
             
-            # Listbox para tarefas da coluna
+            # Listbox para tarefas da coluna, com barra de rolagem
+            lista_frame = ttk.Frame(col_frame)
+            lista_frame.pack(fill=tk.BOTH, expand=True, pady=(5, 0))
+            
+            scrollbar = ttk.Scrollbar(lista_frame, orient=tk.VERTICAL)
+            scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+            
             listbox = tk.Listbox(
-                col_frame,
+                lista_frame,
                 height=15,
                 font=("Arial", 10),
-                selectmode=tk.SINGLE
+                selectmode=tk.EXTENDED
             )
-            listbox.pack(fill=tk.BOTH, expand=True, pady=(5, 0))
+            listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+            
+            # No modo virtual a rolagem move a janela de tarefas carregadas
+            for evento in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+                listbox.bind(evento, lambda e, c=coluna: self.rolar_roda_virtual(e, c))
+            listbox.bind("<Configure>", lambda e, c=coluna: self.redimensionar_coluna_virtual(c))
             
             # Vincular evento de clique direito para mostrar menu de contexto
             # Button-3 funciona no Windows/Linux, Button-2 também pode funcionar no Linux
@@ -864,9 +916,12 @@ class PaginaInicialScreen:
             
             self.kanban_widgets[coluna] = {
                 "frame": col_frame,
-                "listbox": listbox
+                "listbox": listbox,
+                "scrollbar": scrollbar
             }
         
+        self.configurar_modo_virtual(False)
+        
         # Botão Sair
         sair_btn = ttk.Button(
             bottom_frame,
@@ -886,7 +941,7 @@ class PaginaInicialScreen:
             self.welcome_label.config(text=f"Bem-vindo, {self.app.usuario_logado}!")
         
         # Se for admin, mostrar seção de gerenciamento de usuários e Kanban
-        if self.app.email_logado == "admin":
+        if self.app.eh_admin:
             self.usuarios_frame.pack(fill=tk.BOTH, expand=True, pady=(0, 20))
             self.kanban_frame.pack(fill=tk.BOTH, expand=True, pady=(0, 20))
             self.kanban_label_titulo.pack(pady=(0, 5))
@@ -905,24 +960,37 @@ class PaginaInicialScreen:
     
     def esconder(self):
         """Esconde o frame da página inicial"""
+        # Descartar resultados de consultas que ainda estejam em andamento
+        self.geracao_kanban += 1
         self.main_frame.pack_forget()
     
     def atualizar_lista(self):
         """Atualiza a lista de usuários"""
+        # Buscar usuários do banco de dados em segundo plano
+        self.app.executor.submeter(
+            self.app.listar_usuarios_com_contagens,
+            ao_concluir=self.exibir_usuarios,
+            ao_falhar=lambda erro: messagebox.showerror("Erro", f"Erro ao carregar usuários: {erro}")
+        )
+    
+    def recarregar_lista(self):
+        """Descarta o cache de usuários e busca a lista novamente no banco"""
+        self.app.diretorio.invalidar()
+        self.atualizar_lista()
+    
+    def exibir_usuarios(self, usuarios):
+        """Preenche a lista de usuários"""
         # Limpar itens existentes
         for item in self.tree.get_children():
             self.tree.delete(item)
         
-        # Buscar usuários do banco de dados
-        usuarios = self.app.listar_usuarios()
-        
-        # Adicionar usuários à lista
+        # Adicionar usuários à lista (o email identifica a linha para atualizar as contagens)
         for usuario in usuarios:
-            self.tree.insert("", tk.END, values=usuario)
+            self.tree.insert("", tk.END, iid=usuario[2], values=usuario)
     
     def on_usuario_selected(self, event):
         """Evento disparado quando o admin seleciona um usuário na lista"""
-        if self.app.email_logado != "admin":
+        if not self.app.eh_admin:
             return
         
         selecionado = self.tree.selection()
@@ -1064,12 +1132,25 @@ class PaginaInicialScreen:
                 email_entry.focus()
                 return
             
-            if self.app.cadastrar_usuario(nome, email, senha):
-                messagebox.showinfo("Sucesso", "Usuário cadastrado com sucesso!")
-                cadastro_window.destroy()
-                self.atualizar_lista()
-            else:
-                messagebox.showerror("Erro", "Erro ao cadastrar usuário. Tente novamente.")
+            def concluir(sucesso):
+                if sucesso:
+                    messagebox.showinfo("Sucesso", "Usuário cadastrado com sucesso!")
+                    cadastro_window.destroy()
+                    self.atualizar_lista()
+                else:
+                    salvar_btn.config(state=tk.NORMAL)
+                    messagebox.showerror("Erro", "Erro ao cadastrar usuário. Tente novamente.")
+            
+            def falhar(erro):
+                salvar_btn.config(state=tk.NORMAL)
+                messagebox.showerror("Erro", f"Erro ao cadastrar usuário: {erro}")
+            
+            # O hash da senha é calculado fora da thread do Tk
+            salvar_btn.config(state=tk.DISABLED)
+            self.app.executor.submeter(
+                self.app.cadastrar_usuario, nome, email, senha,
+                ao_concluir=concluir, ao_falhar=falhar
+            )
         
         # Botões
         buttons_frame = ttk.Frame(center_frame)
@@ -1093,116 +1174,291 @@ class PaginaInicialScreen:
     
     def carregar_kanban(self):
         """Carrega as tarefas do usuário logado no Kanban"""
-        # Limpar todas as listboxes
-        for coluna in self.kanban_widgets:
-            self.kanban_widgets[coluna]["listbox"].delete(0, tk.END)
-        
         # Verificar se há usuário logado
         if not self.app.email_logado:
+            self.limpar_kanban()
             return
         
         # Buscar apenas as tarefas do usuário logado
-        tarefas = self.app.listar_tarefas(self.app.email_logado)
-        
-        # Organizar tarefas por coluna
-        self.colunas_kanban = {
-            "A Fazer": [],
-            "Em Progresso": [],
-            "Concluído": []
-        }
-        
-        for tarefa in tarefas:
-            tarefa_id, titulo, descricao, status, prioridade, data_criacao = tarefa[:6]
-            # Garantir que o status existe
-            if status not in self.colunas_kanban:
-                status = "A Fazer"
-            prioridade = prioridade if prioridade else 0
-            self.colunas_kanban[status].append((tarefa_id, titulo, descricao, prioridade, data_criacao))
-        
-        # Adicionar tarefas nas listboxes
-        for coluna, tarefas_lista in self.colunas_kanban.items():
-            for tarefa_id, titulo, descricao, prioridade, data_criacao in tarefas_lista:
-                # Formatar data
-                try:
-                    data_obj = datetime.strptime(data_criacao, '%Y-%m-%d %H:%M:%S')
-                    data_formatada = data_obj.strftime('%d/%m/%Y')
-                except:
-                    data_formatada = data_criacao
-                
-                display_text = f"[{tarefa_id}] {titulo}"
-                if prioridade == 1:
-                    display_text = f"🔴 {display_text}"
-                display_text += f"\n📅 {data_formatada}"
-                if descricao:
-                    display_text += f"\n  {descricao[:25]}..."
-                
-                self.kanban_widgets[coluna]["listbox"].insert(tk.END, display_text)
-                # Destacar tarefas prioritárias em vermelho
-                index = self.kanban_widgets[coluna]["listbox"].size() - 1
-                if prioridade == 1:
-                    self.kanban_widgets[coluna]["listbox"].itemconfig(index, {'bg': '#ffcccc', 'fg': '#cc0000'})
-                else:
-                    self.kanban_widgets[coluna]["listbox"].itemconfig(index, {'bg': '#f0f0f0'})
+        self.buscar_tarefas_kanban(self.app.email_logado)
     
     def carregar_kanban_admin(self):
         """Carrega as tarefas no Kanban para o admin (pode ver todos os usuários)"""
-        # Limpar todas as listboxes
-        for coluna in self.kanban_widgets:
-            self.kanban_widgets[coluna]["listbox"].delete(0, tk.END)
-        
         # Se não houver usuário selecionado, não mostrar tarefas
         if not self.usuario_kanban_selecionado:
+            self.limpar_kanban()
             self.kanban_label_titulo.config(text="Quadro Kanban - Selecione um usuário para visualizar")
             return
         
         # Buscar tarefas do usuário selecionado
-        tarefas = self.app.listar_tarefas(self.usuario_kanban_selecionado)
+        self.buscar_tarefas_kanban(self.usuario_kanban_selecionado)
+    
+    def recarregar_kanban(self):
+        """Recarrega o Kanban exibido (do usuário logado ou do selecionado pelo admin)"""
+        if self.app.eh_admin:
+            self.carregar_kanban_admin()
+        else:
+            self.carregar_kanban()
+    
+    def limpar_kanban(self):
+        """Limpa as colunas do Kanban e descarta consultas em andamento"""
+        self.geracao_kanban += 1
+        self.email_kanban = None
+        self.contagens_kanban = None
+        self.estado_kanban(None)
+        if self.modo_virtual:
+            self.configurar_modo_virtual(False)
+        self.aplicar_operacoes_kanban(self.modelo_kanban.limpar())
+    
+    def estado_kanban(self, texto):
+        """Mostra um estado (carregando, erro) no cabeçalho de cada coluna do Kanban"""
+        for coluna in self.kanban_widgets:
+            titulo = coluna
+            if self.contagens_kanban is not None:
+                titulo = f"{coluna} ({self.contagens_kanban.get(coluna, 0)})"
+            if texto:
+                titulo = f"{titulo} - {texto}"
+            self.kanban_widgets[coluna]["frame"].config(text=titulo)
+    
+    def exibir_contagens_kanban(self, contagens=None):
+        """Atualiza as quantidades nos cabeçalhos do Kanban e na linha do usuário na lista
+
+        Sem contagens, usa as colunas do modelo, que no quadro completo (ou na
+        busca) contêm exatamente as tarefas exibidas.
+        """
+        if contagens is None:
+            contagens = {coluna: len(self.modelo_kanban.ordem[coluna]) for coluna in COLUNAS_KANBAN}
+        self.contagens_kanban = contagens
+        self.estado_kanban(None)
+        
+        # Na busca as colunas mostram só as tarefas encontradas, não o total do usuário
+        if self.app.eh_admin and not self.termo_busca and self.tree.exists(self.email_kanban or ""):
+            for coluna in COLUNAS_KANBAN:
+                self.tree.set(self.email_kanban, coluna, contagens.get(coluna, 0))
+    
+    def buscar_tarefas_kanban(self, usuario_email):
+        """Busca as tarefas de um usuário em segundo plano e mostra o estado de carregamento"""
+        # Outro quadro: não manter as tarefas do usuário anterior enquanto carrega
+        if usuario_email != self.email_kanban:
+            self.limpar_kanban()
+            self.email_kanban = usuario_email
+        
+        self.geracao_kanban += 1
+        geracao = self.geracao_kanban
+        self.estado_kanban("carregando...")
+        if self.termo_busca:
+            # Só as tarefas encontradas, mais relevantes primeiro, sempre como quadro completo
+            self.app.executor.submeter(
+                self.app.buscar_tarefas, self.termo_busca, usuario_email, LIMITE_QUADRO_COMPLETO,
+                ao_concluir=lambda tarefas: self.exibir_quadro(({}, tarefas), geracao),
+                ao_falhar=lambda erro: self.erro_kanban(erro, geracao)
+            )
+            return
+        self.app.executor.submeter(
+            self.app.carregar_quadro, usuario_email, LIMITE_QUADRO_COMPLETO,
+            ao_concluir=lambda quadro: self.exibir_quadro(quadro, geracao),
+            ao_falhar=lambda erro: self.erro_kanban(erro, geracao)
+        )
+    
+    def agendar_busca(self):
+        """Aplica a busca quando a digitação parar por um instante"""
+        if self.busca_agendada is not None:
+            self.main_frame.after_cancel(self.busca_agendada)
+        self.busca_agendada = self.main_frame.after(ATRASO_BUSCA_MS, self.aplicar_busca)
+    
+    def aplicar_busca(self):
+        """Filtra o Kanban pelo texto digitado na busca"""
+        if self.busca_agendada is not None:
+            self.main_frame.after_cancel(self.busca_agendada)
+            self.busca_agendada = None
+        termo = self.busca_entry.get().strip() or None
+        if termo == self.termo_busca:
+            return
+        self.termo_busca = termo
+        self.recarregar_kanban()
+    
+    def limpar_busca(self):
+        """Remove o filtro de busca e volta a exibir o quadro completo"""
+        self.busca_entry.delete(0, tk.END)
+        self.aplicar_busca()
+    
+    def erro_kanban(self, erro, geracao):
+        """Mostra nas colunas que a consulta de tarefas falhou"""
+        # Ignorar respostas de consultas já substituídas por outra mais recente
+        if geracao != self.geracao_kanban:
+            return
+        self.estado_kanban("erro ao carregar")
+        messagebox.showerror("Erro", f"Erro ao carregar tarefas: {erro}")
+    
+    def exibir_quadro(self, quadro, geracao):
+        """Atualiza as colunas do Kanban com o quadro recebido"""
+        # Ignorar respostas de consultas já substituídas por outra mais recente
+        if geracao != self.geracao_kanban:
+            return
         
-        # Organizar tarefas por coluna
-        self.colunas_kanban = {
-            "A Fazer": [],
-            "Em Progresso": [],
-            "Concluído": []
-        }
+        contagens, tarefas = quadro
+        if tarefas is None:
+            # Quadro grande demais: exibir só a área visível de cada coluna
+            if not self.modo_virtual:
+                self.aplicar_operacoes_kanban(self.modelo_kanban.limpar())
+                self.configurar_modo_virtual(True)
+            for coluna in COLUNAS_KANBAN:
+                self.janelas_virtuais[coluna].definir_total(contagens.get(coluna, 0))
+                self.renderizar_coluna_virtual(coluna)
+            self.exibir_contagens_kanban(contagens)
+            return
         
+        if self.modo_virtual:
+            self.configurar_modo_virtual(False)
+        # Só as linhas que mudaram em relação ao que já está na tela são tocadas
+        self.aplicar_operacoes_kanban(self.modelo_kanban.substituir(tarefas))
+        self.exibir_contagens_kanban()
+    
+    def atualizar_tarefa_kanban(self, tarefa, nova=False):
+        """Reflete no Kanban uma tarefa criada (nova=True) ou alterada"""
+        if self.modo_virtual:
+            self.alterar_colunas_virtuais([tarefa], [] if nova else [tarefa[0]])
+            return
+        self.aplicar_operacoes_kanban(self.modelo_kanban.atualizar(tarefa))
+        self.exibir_contagens_kanban()
+    
+    def atualizar_tarefas_kanban(self, tarefas):
+        """Reflete no Kanban várias tarefas alteradas de uma só vez"""
+        if self.modo_virtual:
+            self.alterar_colunas_virtuais(tarefas, [tarefa[0] for tarefa in tarefas])
+            return
+        self.aplicar_operacoes_kanban(self.modelo_kanban.atualizar_varias(tarefas))
+        self.exibir_contagens_kanban()
+    
+    def remover_tarefa_kanban(self, tarefa_id):
+        """Retira do Kanban uma tarefa excluída"""
+        if self.modo_virtual:
+            self.alterar_colunas_virtuais([], [tarefa_id])
+            return
+        self.aplicar_operacoes_kanban(self.modelo_kanban.remover(tarefa_id))
+        self.exibir_contagens_kanban()
+    
+    def alterar_colunas_virtuais(self, tarefas, removidas):
+        """Tira das colunas virtuais as tarefas removidas e insere as alteradas, sem recarregar o quadro
+
+        Uma tarefa removida fora das páginas carregadas tem coluna e posição
+        desconhecidas; só nesse caso o quadro é recarregado do banco.
+        """
+        contagens = dict(self.contagens_kanban or {})
+        alteradas = set()
+        for tarefa_id in removidas:
+            coluna = next(
+                (coluna for coluna, janela in self.janelas_virtuais.items() if janela.remover(tarefa_id)), None
+            )
+            if coluna is None:
+                self.recarregar_kanban()
+                return
+            contagens[coluna] = contagens.get(coluna, 0) - 1
+            alteradas.add(coluna)
         for tarefa in tarefas:
-            tarefa_id, titulo, descricao, status, prioridade, data_criacao = tarefa[:6]
-            
-            # Garantir que o status existe
-            if status not in self.colunas_kanban:
-                status = "A Fazer"
-            prioridade = prioridade if prioridade else 0
-            self.colunas_kanban[status].append((tarefa_id, titulo, descricao, prioridade, data_criacao))
-        
-        # Adicionar tarefas nas listboxes
-        for coluna, tarefas_lista in self.colunas_kanban.items():
-            for tarefa_id, titulo, descricao, prioridade, data_criacao in tarefas_lista:
-                # Formatar data
-                try:
-                    data_obj = datetime.strptime(data_criacao, '%Y-%m-%d %H:%M:%S')
-                    data_formatada = data_obj.strftime('%d/%m/%Y')
-                except:
-                    data_formatada = data_criacao
-                
-                display_text = f"[{tarefa_id}] {titulo}"
-                if prioridade == 1:
-                    display_text = f"🔴 {display_text}"
-                display_text += f"\n📅 {data_formatada}"
-                if descricao:
-                    display_text += f"\n  {descricao[:25]}..."
-                
-                self.kanban_widgets[coluna]["listbox"].insert(tk.END, display_text)
-                # Destacar tarefas prioritárias em vermelho
-                index = self.kanban_widgets[coluna]["listbox"].size() - 1
-                if prioridade == 1:
-                    self.kanban_widgets[coluna]["listbox"].itemconfig(index, {'bg': '#ffcccc', 'fg': '#cc0000'})
-                else:
-                    self.kanban_widgets[coluna]["listbox"].itemconfig(index, {'bg': '#f0f0f0'})
+            coluna = coluna_da_tarefa(tarefa)
+            self.janelas_virtuais[coluna].inserir(tarefa)
+            contagens[coluna] = contagens.get(coluna, 0) + 1
+            alteradas.add(coluna)
+        
+        for coluna in alteradas:
+            self.renderizar_coluna_virtual(coluna)
+        self.exibir_contagens_kanban(contagens)
+    
+    def configurar_modo_virtual(self, ativo):
+        """Liga as barras de rolagem às listboxes ou às janelas virtuais"""
+        self.modo_virtual = ativo
+        for coluna, widgets in self.kanban_widgets.items():
+            listbox = widgets["listbox"]
+            scrollbar = widgets["scrollbar"]
+            listbox.delete(0, tk.END)
+            if ativo:
+                listbox.config(yscrollcommand="")
+                scrollbar.config(command=lambda *args, c=coluna: self.rolar_coluna_virtual(c, *args))
+            else:
+                self.janelas_virtuais[coluna] = JanelaVirtual()
+                listbox.config(yscrollcommand=scrollbar.set)
+                scrollbar.config(command=listbox.yview)
+    
+    def linhas_visiveis(self, listbox):
+        """Calcula quantas linhas cabem na listbox"""
+        altura = listbox.winfo_height()
+        if altura <= 1:
+            return int(listbox.cget("height"))
+        return max(1, altura // self.altura_linha)
+    
+    def rolar_coluna_virtual(self, coluna, *args):
+        """Comando da scrollbar de uma coluna virtual"""
+        self.janelas_virtuais[coluna].rolar(*args)
+        self.renderizar_coluna_virtual(coluna)
+    
+    def rolar_roda_virtual(self, event, coluna):
+        """Rolagem com a roda do mouse em uma coluna virtual"""
+        if not self.modo_virtual:
+            return None
+        passos = -3 if (event.num == 4 or event.delta > 0) else 3
+        self.rolar_coluna_virtual(coluna, "scroll", passos, "units")
+        return "break"
+    
+    def redimensionar_coluna_virtual(self, coluna):
+        """Ajusta a janela virtual ao novo tamanho da listbox"""
+        if self.modo_virtual:
+            self.renderizar_coluna_virtual(coluna)
+    
+    def renderizar_coluna_virtual(self, coluna):
+        """Exibe as linhas visíveis de uma coluna virtual e pede as páginas que faltam"""
+        janela = self.janelas_virtuais[coluna]
+        listbox = self.kanban_widgets[coluna]["listbox"]
+        janela.definir_visiveis(self.linhas_visiveis(listbox))
+        
+        listbox.delete(0, tk.END)
+        for indice, tarefa in enumerate(janela.linhas()):
+            if tarefa is None:
+                listbox.insert(tk.END, "Carregando...")
+                listbox.itemconfig(indice, {'fg': 'gray'})
+            else:
+                display_text, cores = formatar_tarefa(tarefa)
+                listbox.insert(tk.END, display_text)
+                listbox.itemconfig(indice, cores)
+        self.kanban_widgets[coluna]["scrollbar"].set(*janela.fracoes())
+        
+        for pagina in janela.paginas_faltando():
+            self.buscar_pagina_virtual(coluna, pagina)
+    
+    def buscar_pagina_virtual(self, coluna, pagina):
+        """Carrega em segundo plano uma página de tarefas de uma coluna virtual"""
+        janela = self.janelas_virtuais[coluna]
+        versao, geracao = janela.versao, self.geracao_kanban
+        self.app.executor.submeter(
+            self.app.listar_tarefas_status,
+            self.email_kanban, coluna, janela.tamanho_pagina, pagina * janela.tamanho_pagina,
+            ao_concluir=lambda linhas: self.receber_pagina_virtual(coluna, pagina, linhas, versao, geracao),
+            ao_falhar=lambda erro: self.erro_kanban(erro, geracao)
+        )
+    
+    def receber_pagina_virtual(self, coluna, pagina, linhas, versao, geracao):
+        """Guarda uma página recebida e atualiza a coluna virtual"""
+        if geracao != self.geracao_kanban or not self.modo_virtual:
+            return
+        if self.janelas_virtuais[coluna].receber(pagina, linhas, versao):
+            self.renderizar_coluna_virtual(coluna)
+    
+    def aplicar_operacoes_kanban(self, operacoes):
+        """Aplica nas listboxes as operações geradas pelo modelo do Kanban"""
+        for operacao in operacoes:
+            listbox = self.kanban_widgets[operacao[1]]["listbox"]
+            indice = operacao[2]
+            if operacao[0] == INSERIR:
+                display_text, cores = formatar_tarefa(operacao[3])
+                listbox.insert(indice, display_text)
+                listbox.itemconfig(indice, cores)
+            else:
+                listbox.delete(indice)
     
     def nova_tarefa(self):
         """Abre janela para adicionar nova tarefa"""
         # Se for admin, verificar se há usuário selecionado
-        if self.app.email_logado == "admin" and not self.usuario_kanban_selecionado:
+        if self.app.eh_admin and not self.usuario_kanban_selecionado:
             messagebox.showwarning("Aviso", "Por favor, selecione um usuário na lista para criar uma tarefa!")
             return
         
@@ -1231,13 +1487,8 @@ class PaginaInicialScreen:
         
         # Título - mostrar para qual usuário será criada a tarefa (se admin)
         titulo_texto = "Nova Tarefa"
-        if self.app.email_logado == "admin" and self.usuario_kanban_selecionado:
-            usuarios = self.app.listar_usuarios()
-            nome_usuario = self.usuario_kanban_selecionado
-            for u in usuarios:
-                if u[2] == self.usuario_kanban_selecionado:
-                    nome_usuario = u[1]
-                    break
+        if self.app.eh_admin and self.usuario_kanban_selecionado:
+            nome_usuario = self.app.nome_usuario(self.usuario_kanban_selecionado)
             titulo_texto = f"Nova Tarefa - {nome_usuario}"
         
         ttk.Label(content_frame, text=titulo_texto, font=("Arial", 14, "bold")).pack(pady=(0, 15))
@@ -1290,7 +1541,7 @@ class PaginaInicialScreen:
             
             # Se for admin visualizando outro usuário, criar tarefa para o usuário selecionado
             usuario_destino = self.app.email_logado
-            if self.app.email_logado == "admin" and self.usuario_kanban_selecionado:
+            if self.app.eh_admin and self.usuario_kanban_selecionado:
                 usuario_destino = self.usuario_kanban_selecionado
             
             sucesso, resultado = self.app.adicionar_tarefa(
@@ -1298,17 +1549,15 @@ class PaginaInicialScreen:
                 titulo,
                 descricao,
                 "A Fazer",
-                prioridade
+                prioridade,
+                retornar_tarefa=True
             )
             
             if sucesso:
                 messagebox.showinfo("Sucesso", "Tarefa adicionada com sucesso!")
                 janela.destroy()
-                if self.app.email_logado == "admin":
-                    if self.usuario_kanban_selecionado:
-                        self.carregar_kanban_admin()
-                else:
-                    self.carregar_kanban()
+                if usuario_destino == self.email_kanban:
+                    self.atualizar_tarefa_kanban(resultado, nova=True)
             else:
                 messagebox.showerror("Erro", f"Erro ao adicionar tarefa: {resultado}")
         
@@ -1324,34 +1573,39 @@ class PaginaInicialScreen:
         
         titulo_entry.bind("<Return>", lambda e: descricao_text.focus())
     
+    def tarefa_exibida(self, coluna, indice):
+        """Retorna o registro da tarefa exibida numa linha da coluna (None se ainda carregando)"""
+        if self.modo_virtual:
+            return self.janelas_virtuais[coluna].linha(indice)
+        return self.modelo_kanban.tarefa_em(coluna, indice)
+    
+    def tarefas_selecionadas(self, coluna):
+        """Retorna os registros das tarefas selecionadas em uma coluna"""
+        listbox = self.kanban_widgets[coluna]["listbox"]
+        tarefas = []
+        for indice in listbox.curselection():
+            tarefa = self.tarefa_exibida(coluna, indice)
+            if tarefa is not None:
+                tarefas.append(tarefa)
+        return tarefas
+    
     def mover_tarefa(self, origem, destino):
-        """Move uma tarefa entre colunas"""
-        listbox_origem = self.kanban_widgets[origem]["listbox"]
-        selecionado = listbox_origem.curselection()
+        """Move as tarefas selecionadas entre colunas"""
+        tarefa_ids = [tarefa.id for tarefa in self.tarefas_selecionadas(origem)]
         
-        if not selecionado:
+        if not tarefa_ids:
             messagebox.showwarning("Aviso", "Por favor, selecione uma tarefa para mover!")
             return
         
-        # Obter o texto da tarefa selecionada
-        texto = listbox_origem.get(selecionado[0])
-        # Extrair tarefa_id do texto [id] titulo ou 🔴 [id] titulo
-        try:
-            texto_id = texto.replace('🔴', '').strip()
-            tarefa_id = int(texto_id.split(']')[0].replace('[', '').strip())
-        except:
-            messagebox.showerror("Erro", "Erro ao identificar a tarefa!")
-            return
-        
-        # Atualizar status no banco de dados (com validação de propriedade)
-        sucesso, mensagem = self.app.atualizar_status_tarefa(tarefa_id, destino, self.app.email_logado)
+        # Atualizar status no banco de dados em uma única operação
+        # (com validação de propriedade de todo o conjunto)
+        sucesso, resultado = self.app.atualizar_status_tarefas(
+            tarefa_ids, destino, self.app.email_logado
+        )
         if sucesso:
-            if self.app.email_logado == "admin":
-                self.carregar_kanban_admin()
-            else:
-                self.carregar_kanban()
+            self.atualizar_tarefas_kanban(resultado)
         else:
-            messagebox.showerror("Erro", mensagem)
+            messagebox.showerror("Erro", resultado)
     
     def mostrar_menu_contexto(self, event, coluna):
         """Mostra o menu de contexto no clique direito"""
@@ -1362,27 +1616,22 @@ class PaginaInicialScreen:
         if index < 0:
             return
         
-        listbox.selection_clear(0, tk.END)
-        listbox.selection_set(index)
+        # Manter a seleção múltipla se o clique foi sobre uma tarefa já selecionada
+        if index not in listbox.curselection():
+            listbox.selection_clear(0, tk.END)
+            listbox.selection_set(index)
         listbox.activate(index)
         
-        # Obter o texto da tarefa selecionada
-        texto = listbox.get(index)
-        # Extrair tarefa_id do texto [id] titulo ou 🔴 [id] titulo
-        try:
-            texto_id = texto.replace('🔴', '').strip()
-            tarefa_id = int(texto_id.split(']')[0].replace('[', '').strip())
-        except:
+        # A prioridade já está no registro carregado: nenhuma consulta ao banco
+        tarefa = self.tarefa_exibida(coluna, index)
+        if tarefa is None:
             return
         
-        # Verificar prioridade atual da tarefa
-        prioridade_atual = self.app.obter_prioridade_tarefa(tarefa_id)
-        
         # Criar menu de contexto
         menu = tk.Menu(self.app.root, tearoff=0)
         
         # Adicionar opção de priorizar ou despriorizar
-        if prioridade_atual == 1:
+        if tarefa.prioridade == 1:
             menu.add_command(label="Despriorizar", command=lambda: self.alterar_prioridade_tarefa(coluna, 0))
         else:
             menu.add_command(label="Priorizar", command=lambda: self.alterar_prioridade_tarefa(coluna, 1))
@@ -1394,71 +1643,44 @@ class PaginaInicialScreen:
             menu.grab_release()
     
     def alterar_prioridade_tarefa(self, coluna, nova_prioridade):
-        """Altera a prioridade de uma tarefa"""
-        listbox = self.kanban_widgets[coluna]["listbox"]
-        selecionado = listbox.curselection()
+        """Altera a prioridade das tarefas selecionadas"""
+        tarefa_ids = [tarefa.id for tarefa in self.tarefas_selecionadas(coluna)]
         
-        if not selecionado:
-            return
-        
-        # Obter o texto da tarefa selecionada
-        texto = listbox.get(selecionado[0])
-        # Extrair tarefa_id do texto [id] titulo ou 🔴 [id] titulo
-        try:
-            texto_id = texto.replace('🔴', '').strip()
-            tarefa_id = int(texto_id.split(']')[0].replace('[', '').strip())
-        except:
-            messagebox.showerror("Erro", "Erro ao identificar a tarefa!")
+        if not tarefa_ids:
             return
         
-        # Atualizar prioridade no banco de dados
-        sucesso = self.app.atualizar_prioridade_tarefa(tarefa_id, nova_prioridade)
+        # Atualizar prioridade no banco de dados em uma única operação
+        sucesso, resultado = self.app.atualizar_prioridade_tarefas(
+            tarefa_ids, nova_prioridade, self.app.email_logado
+        )
         if sucesso:
-            # Recarregar o Kanban para atualizar a exibição
-            if self.app.email_logado == "admin":
-                self.carregar_kanban_admin()
-            else:
-                self.carregar_kanban()
+            # Reposicionar apenas as tarefas alteradas
+            self.atualizar_tarefas_kanban(resultado)
         else:
-            messagebox.showerror("Erro", "Erro ao alterar prioridade da tarefa!")
+            messagebox.showerror("Erro", resultado)
     
     def excluir_tarefa_kanban(self, coluna):
         """Exclui uma tarefa selecionada"""
-        listbox = self.kanban_widgets[coluna]["listbox"]
-        selecionado = listbox.curselection()
+        selecionadas = self.tarefas_selecionadas(coluna)
         
-        if not selecionado:
+        if not selecionadas:
             messagebox.showwarning("Aviso", "Por favor, selecione uma tarefa para excluir!")
             return
         
-        # Obter o texto da tarefa selecionada
-        texto = listbox.get(selecionado[0])
-        # Extrair tarefa_id do texto [id] titulo ou 🔴 [id] titulo
-        try:
-            texto_id = texto.replace('🔴', '').strip()
-            tarefa_id = int(texto_id.split(']')[0].replace('[', '').strip())
-            titulo = texto_id.split(']')[1].strip().split('\n')[0].strip()
-            if titulo.startswith('[Usuário:'):
-                titulo = texto_id.split(']')[1].split('[Usuário:')[0].strip()
-        except:
-            messagebox.showerror("Erro", "Erro ao identificar a tarefa!")
-            return
+        tarefa = selecionadas[0]
         
         # Confirmar exclusão
         resposta = messagebox.askyesno(
             "Confirmar Exclusão",
-            f"Deseja realmente excluir a tarefa \"{titulo}\"?"
+            f"Deseja realmente excluir a tarefa \"{tarefa.titulo}\"?"
         )
         
         if resposta:
             # Excluir tarefa (com validação de propriedade)
-            sucesso, mensagem = self.app.excluir_tarefa(tarefa_id, self.app.email_logado)
+            sucesso, mensagem = self.app.excluir_tarefa(tarefa.id, self.app.email_logado)
             if sucesso:
                 messagebox.showinfo("Sucesso", mensagem)
-                if self.app.email_logado == "admin":
-                    self.carregar_kanban_admin()
-                else:
-                    self.carregar_kanban()
+                self.remover_tarefa_kanban(tarefa.id)
             else:
                 messagebox.showerror("Erro", mensagem)
     
@@ -1470,7 +1692,12 @@ class PaginaInicialScreen:
 def main():
     root = tk.Tk()
     app = App(root)
-    root.mainloop()
+    try:
+        root.mainloop()
+    finally:
+        app.fechar()
+        if app.monitor_ui is not None:
+            app.monitor_ui.parar()
 
 
 if __name__ == "__main__":
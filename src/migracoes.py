@@ -0,0 +1,332 @@
+"""
+Migrações versionadas do esquema do banco (sem dependência de tkinter)
+
+A versão aplicada fica em PRAGMA user_version. Cada migração roda uma única
+vez, em ordem; um banco já atualizado é aberto com uma só leitura de PRAGMA.
+"""
+import logging
+from collections import namedtuple
+from datetime import datetime
+
+from .banco import aplicar_modo_journal
+from .senhas import gerar_hash
+
+logger = logging.getLogger(__name__)
+
+Migracao = namedtuple("Migracao", "versao descricao aplicar")
+
+# Linhas atualizadas por transação nos preenchimentos longos
+TAMANHO_BLOCO_PADRAO = 10000
+
+
+class ContextoMigracao:
+    """Dados e serviços disponíveis para as funções de migração"""
+
+    def __init__(self, progresso=None, gerar_hash=gerar_hash, tamanho_bloco=TAMANHO_BLOCO_PADRAO):
+        self.progresso = progresso
+        self.gerar_hash = gerar_hash
+        self.tamanho_bloco = tamanho_bloco
+
+    def informar(self, descricao, feitos, total):
+        """Repassa o andamento de uma migração longa"""
+        if self.progresso is not None:
+            self.progresso(descricao, feitos, total)
+        else:
+            logger.info("%s: %d/%d", descricao, feitos, total)
+
+
+def versao_atual(conn):
+    """Retorna a versão do esquema gravada no banco"""
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+def preencher_em_blocos(conn, contexto, descricao, atribuicao, condicao):
+    """Executa UPDATE tarefas SET atribuicao WHERE condicao em blocos de ids.
+
+    Cada bloco é uma transação própria, então a escrita não bloqueia o banco
+    por muito tempo e uma interrupção não perde o que já foi feito: como a
+    condição exclui as linhas já preenchidas, a migração continua de onde
+    parou na próxima abertura.
+    """
+    total = conn.execute(f'SELECT COUNT(*) FROM tarefas WHERE {condicao}').fetchone()[0]
+    if total == 0:
+        return
+    feitos = 0
+    ultimo_id = 0
+    while True:
+        limite = conn.execute(f'''
+            SELECT MAX(id) FROM (
+                SELECT id FROM tarefas WHERE id > ? ORDER BY id LIMIT ?
+            )
+        ''', (ultimo_id, contexto.tamanho_bloco)).fetchone()[0]
+        if limite is None:
+            break
+        cursor = conn.execute(
+            f'UPDATE tarefas SET {atribuicao} WHERE id > ? AND id <= ? AND {condicao}',
+            (ultimo_id, limite)
+        )
+        conn.commit()
+        feitos += cursor.rowcount
+        ultimo_id = limite
+        contexto.informar(descricao, feitos, total)
+
+
+def _criar_tabelas(conn, contexto):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS usuarios (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nome TEXT NOT NULL,
+            email TEXT UNIQUE NOT NULL,
+            senha TEXT NOT NULL
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS tarefas (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            usuario_email TEXT NOT NULL,
+            titulo TEXT NOT NULL,
+            descricao TEXT,
+            status TEXT NOT NULL,
+            prioridade INTEGER DEFAULT 0,
+            data_criacao TEXT NOT NULL,
+            FOREIGN KEY (usuario_email) REFERENCES usuarios(email)
+        )
+    ''')
+
+    # Bancos anteriores ao controle de versão podem não ter estas colunas
+    colunas_existentes = [col[1] for col in conn.execute("PRAGMA table_info(tarefas)")]
+    if 'prioridade' not in colunas_existentes:
+        conn.execute('ALTER TABLE tarefas ADD COLUMN prioridade INTEGER DEFAULT 0')
+    if 'data_criacao' not in colunas_existentes:
+        data_default = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        conn.execute(f'ALTER TABLE tarefas ADD COLUMN data_criacao TEXT DEFAULT "{data_default}"')
+        conn.commit()
+        preencher_em_blocos(
+            conn, contexto, "Preenchendo data_criacao",
+            f"data_criacao = '{data_default}'", "data_criacao IS NULL OR data_criacao = ''"
+        )
+
+
+def _adicionar_criado_em(conn, contexto):
+    colunas_existentes = [col[1] for col in conn.execute("PRAGMA table_info(tarefas)")]
+    if 'criado_em' not in colunas_existentes:
+        # Data de criação como inteiro, para o quadro não interpretar texto a cada exibição
+        conn.execute('ALTER TABLE tarefas ADD COLUMN criado_em INTEGER')
+        conn.commit()
+    preencher_em_blocos(
+        conn, contexto, "Preenchendo criado_em",
+        "criado_em = CAST(strftime('%s', data_criacao, 'utc') AS INTEGER)",
+        "criado_em IS NULL AND data_criacao IS NOT NULL"
+    )
+
+
+def _criar_indices(conn, contexto):
+    # Índices das consultas do quadro: a coluna id (rowid) já faz parte de
+    # todo índice, então ORDER BY prioridade DESC, id DESC sai do índice sem
+    # ordenação extra; verificações de propriedade usam a chave primária
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_tarefas_usuario_prioridade
+        ON tarefas (usuario_email, prioridade, id)
+    ''')
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_tarefas_usuario_status
+        ON tarefas (usuario_email, status, prioridade, id)
+    ''')
+    # Ordem global das tarefas (listagens e exportações do admin)
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_tarefas_prioridade
+        ON tarefas (prioridade, id)
+    ''')
+
+
+def _criar_admin(conn, contexto):
+    existe = conn.execute('SELECT 1 FROM usuarios WHERE email = ?', ('admin',)).fetchone()
+    if existe is None:
+        conn.execute('''
+            INSERT INTO usuarios (nome, email, senha)
+            VALUES (?, ?, ?)
+        ''', ('Administrador', 'admin', contexto.gerar_hash('admin')))
+
+
+def _criar_busca_textual(conn, contexto):
+    # Índice FTS5 com conteúdo externo: guarda só os termos, o texto continua em
+    # tarefas. Os gatilhos mantêm o índice em dia; mudanças de status e
+    # prioridade não tocam o índice, pois o gatilho de UPDATE só olha o texto
+    conn.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS tarefas_busca USING fts5(
+            titulo, descricao,
+            content='tarefas', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS tarefas_busca_inserir AFTER INSERT ON tarefas BEGIN
+            INSERT INTO tarefas_busca (rowid, titulo, descricao)
+            VALUES (new.id, new.titulo, new.descricao);
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS tarefas_busca_excluir AFTER DELETE ON tarefas BEGIN
+            INSERT INTO tarefas_busca (tarefas_busca, rowid, titulo, descricao)
+            VALUES ('delete', old.id, old.titulo, old.descricao);
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS tarefas_busca_atualizar AFTER UPDATE OF titulo, descricao ON tarefas BEGIN
+            INSERT INTO tarefas_busca (tarefas_busca, rowid, titulo, descricao)
+            VALUES ('delete', old.id, old.titulo, old.descricao);
+            INSERT INTO tarefas_busca (rowid, titulo, descricao)
+            VALUES (new.id, new.titulo, new.descricao);
+        END
+    ''')
+    # Indexar as tarefas já existentes
+    contexto.informar("Indexando tarefas para busca", 0, 1)
+    conn.execute("INSERT INTO tarefas_busca (tarefas_busca) VALUES ('rebuild')")
+    contexto.informar("Indexando tarefas para busca", 1, 1)
+
+
+def _criar_contagens(conn, contexto):
+    # Quantidade de tarefas por usuário e status, mantida pelos gatilhos: os
+    # painéis leem poucas linhas em vez de contar as tarefas a cada exibição
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS contagem_tarefas (
+            usuario_email TEXT NOT NULL,
+            status TEXT NOT NULL,
+            quantidade INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (usuario_email, status)
+        ) WITHOUT ROWID
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS contagem_tarefas_inserir AFTER INSERT ON tarefas BEGIN
+            INSERT INTO contagem_tarefas (usuario_email, status, quantidade)
+            VALUES (new.usuario_email, new.status, 1)
+            ON CONFLICT (usuario_email, status) DO UPDATE SET quantidade = quantidade + 1;
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS contagem_tarefas_excluir AFTER DELETE ON tarefas BEGIN
+            UPDATE contagem_tarefas SET quantidade = quantidade - 1
+            WHERE usuario_email = old.usuario_email AND status = old.status;
+        END
+    ''')
+    # Mudanças de prioridade, título ou descrição não alteram as contagens
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS contagem_tarefas_atualizar
+        AFTER UPDATE OF usuario_email, status ON tarefas
+        WHEN old.usuario_email IS NOT new.usuario_email OR old.status IS NOT new.status
+        BEGIN
+            UPDATE contagem_tarefas SET quantidade = quantidade - 1
+            WHERE usuario_email = old.usuario_email AND status = old.status;
+            INSERT INTO contagem_tarefas (usuario_email, status, quantidade)
+            VALUES (new.usuario_email, new.status, 1)
+            ON CONFLICT (usuario_email, status) DO UPDATE SET quantidade = quantidade + 1;
+        END
+    ''')
+    conn.execute('DELETE FROM contagem_tarefas')
+    conn.execute('''
+        INSERT INTO contagem_tarefas (usuario_email, status, quantidade)
+        SELECT usuario_email, status, COUNT(*) FROM tarefas
+        GROUP BY usuario_email, status
+    ''')
+
+
+def _criar_indices_consulta(conn, contexto):
+    # Consultas do admin entre usuários: status e prioridade por igualdade e a
+    # data de criação por faixa, nessa ordem, para que a faixa use o índice
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_tarefas_status_prioridade_criado
+        ON tarefas (status, prioridade, criado_em)
+    ''')
+    # Status sem faixa de datas: percorre o índice já na ordem do quadro
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_tarefas_status_prioridade
+        ON tarefas (status, prioridade, id)
+    ''')
+    # Filtros só por período
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_tarefas_criado_em
+        ON tarefas (criado_em)
+    ''')
+
+
+def _gatilho_busca_em_lote(conn, contexto):
+    # Sinal das inserções em lote: a linha só existe dentro da transação do
+    # lote (inserida e apagada antes do commit), que indexa cada bloco de uma
+    # vez; fora dela o gatilho indexa cada tarefa inserida, como antes
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS insercao_em_lote (
+            ativa INTEGER PRIMARY KEY
+        )
+    ''')
+    conn.execute('DROP TRIGGER IF EXISTS tarefas_busca_inserir')
+    conn.execute('''
+        CREATE TRIGGER tarefas_busca_inserir AFTER INSERT ON tarefas
+        WHEN NOT EXISTS (SELECT 1 FROM insercao_em_lote)
+        BEGIN
+            INSERT INTO tarefas_busca (rowid, titulo, descricao)
+            VALUES (new.id, new.titulo, new.descricao);
+        END
+    ''')
+
+
+def _gatilho_contagem_em_lote(conn, contexto):
+    # Mesmo sinal da busca: o lote soma as contagens uma vez por dono e status
+    conn.execute('DROP TRIGGER IF EXISTS contagem_tarefas_inserir')
+    conn.execute('''
+        CREATE TRIGGER contagem_tarefas_inserir AFTER INSERT ON tarefas
+        WHEN NOT EXISTS (SELECT 1 FROM insercao_em_lote)
+        BEGIN
+            INSERT INTO contagem_tarefas (usuario_email, status, quantidade)
+            VALUES (new.usuario_email, new.status, 1)
+            ON CONFLICT (usuario_email, status) DO UPDATE SET quantidade = quantidade + 1;
+        END
+    ''')
+
+
+# Nunca alterar uma migração já publicada: acrescentar uma nova no final
+MIGRACOES = (
+    Migracao(1, "Tabelas de usuários e tarefas", _criar_tabelas),
+    Migracao(2, "Data de criação como inteiro (criado_em)", _adicionar_criado_em),
+    Migracao(3, "Índices das consultas do quadro", _criar_indices),
+    Migracao(4, "Usuário administrador padrão", _criar_admin),
+    Migracao(5, "Busca textual em títulos e descrições", _criar_busca_textual),
+    Migracao(6, "Contagens de tarefas por usuário e status", _criar_contagens),
+    Migracao(7, "Índices das consultas filtradas do admin", _criar_indices_consulta),
+    Migracao(8, "Busca indexada por bloco nas inserções em lote", _gatilho_busca_em_lote),
+    Migracao(9, "Contagens somadas por bloco nas inserções em lote", _gatilho_contagem_em_lote),
+)
+
+VERSAO_ESQUEMA = MIGRACOES[-1].versao
+
+
+def migrar(conn, contexto=None, migracoes=MIGRACOES, perfil=None):
+    """Aplica as migrações pendentes e retorna a lista de versões aplicadas"""
+    versao = versao_atual(conn)
+    pendentes = [m for m in migracoes if m.versao > versao]
+    if not pendentes:
+        return []
+
+    contexto = contexto or ContextoMigracao()
+    if perfil is not None:
+        # WAL fica gravado no arquivo: só precisa ser aplicado ao criar ou migrar o banco
+        aplicar_modo_journal(conn, perfil)
+
+    aplicadas = []
+    for migracao in pendentes:
+        logger.info("Aplicando migração %d: %s", migracao.versao, migracao.descricao)
+        try:
+            # DDL e a nova versão na mesma transação (os preenchimentos em
+            # blocos fazem seus próprios commits e podem ser retomados)
+            if not conn.in_transaction:
+                conn.execute('BEGIN')
+            migracao.aplicar(conn, contexto)
+            if not conn.in_transaction:
+                conn.execute('BEGIN')
+            # PRAGMA não aceita parâmetros; a versão é sempre um inteiro
+            conn.execute(f'PRAGMA user_version = {int(migracao.versao)}')
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        aplicadas.append(migracao.versao)
+    return aplicadas
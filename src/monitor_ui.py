@@ -0,0 +1,284 @@
+"""
+Detecção de travamentos do laço de eventos do Tk e medição dos handlers da interface
+"""
+import functools
+import logging
+import os
+import sys
+import threading
+import time
+import tkinter
+import traceback
+import types
+from collections import deque, namedtuple
+
+from .instrumentacao import Instrumentacao
+
+logger = logging.getLogger(__name__)
+
+# Variável de ambiente com o limite, em milissegundos, que liga o monitor no App
+VARIAVEL_LIMITE_UI = "TASKS_UI_LIMITE_MS"
+
+# Limites superiores (em segundos) das faixas do histograma; 16 ms e 33 ms
+# correspondem a um quadro a 60 e a 30 quadros por segundo
+LIMITES_UI = (0.001, 0.005, 0.01, 0.016, 0.033, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# Nome sob o qual o atraso dos batimentos entra nas métricas e nos travamentos
+ATRASO_LACO = "atraso_laco"
+
+# Métodos das telas medidos pelo nome (inclusive quando chamados por outros métodos).
+# Eles rodam dentro dos handlers já medidos pelo CallWrapperMedido e por isso
+# têm métricas à parte, com outro prefixo, para não serem somados duas vezes
+METODOS_UI = (
+    "carregar_kanban", "carregar_kanban_admin", "recarregar_kanban", "atualizar_lista",
+    "recarregar_lista", "exibir_usuarios", "exibir_quadro", "aplicar_operacoes_kanban",
+    "renderizar_coluna_virtual", "aplicar_busca", "mover_tarefa", "alterar_prioridade_tarefa",
+    "excluir_tarefa_kanban",
+)
+
+# Travamento registrado: handler (ou ATRASO_LACO), duração e pilha da thread do Tk
+# colhida durante o travamento (None se ele acabou antes da amostra)
+Travamento = namedtuple("Travamento", "handler duracao_ms pilha")
+
+
+def pilha_da_thread(thread_id):
+    """Retorna a pilha atual de uma thread como texto (None se ela não existir)"""
+    quadro = sys._current_frames().get(thread_id)
+    if quadro is None:
+        return None
+    return "".join(traceback.format_stack(quadro))
+
+
+def alvo_callback(funcao):
+    """Retorna a função agendada por Misc.after (que a envolve em callit) ou a própria funcao"""
+    codigo = getattr(funcao, "__code__", None)
+    if codigo is not None and codigo.co_name == "callit" and "func" in codigo.co_freevars:
+        return funcao.__closure__[codigo.co_freevars.index("func")].cell_contents
+    return funcao
+
+
+def nome_callback(funcao):
+    """Nome legível de um callback do Tk: Classe.metodo, ou Classe.<lambda>:metodo chamado"""
+    funcao = alvo_callback(funcao)
+    if isinstance(funcao, types.MethodType):
+        return f"{type(funcao.__self__).__name__}.{funcao.__name__}"
+    nome = getattr(funcao, "__qualname__", None) or type(funcao).__name__
+    if getattr(funcao, "__name__", None) == "<lambda>":
+        # A lambda de um botão só repassa argumentos; o método chamado identifica o handler
+        chamados = funcao.__code__.co_names
+        classe = nome.split(".")[0]
+        return f"{classe}.<lambda>:{chamados[-1]}" if chamados else nome
+    return nome
+
+
+class CallWrapperMedido(tkinter.CallWrapper):
+    """CallWrapper do tkinter que mede cada callback (comandos, eventos e after)"""
+
+    # Monitor ativo, lido ao registrar cada callback
+    monitor = None
+
+    def __init__(self, func, subst, widget):
+        super().__init__(func, subst, widget)
+        monitor = CallWrapperMedido.monitor
+        self.monitor = monitor
+        self.nome = None if monitor is None or monitor.interno(func) else nome_callback(func)
+
+    def __call__(self, *args):
+        monitor = self.monitor
+        if self.nome is None or not monitor.ativo:
+            return super().__call__(*args)
+        inicio = monitor.relogio()
+        try:
+            return super().__call__(*args)
+        finally:
+            monitor.registrar_handler(self.nome, monitor.relogio() - inicio)
+
+
+class MonitorUI:
+    """Mede o atraso do laço de eventos do Tk e a duração de cada handler.
+
+    Um batimento agendado com root.after a cada intervalo_ms mede quanto o
+    laço se atrasou para executá-lo. Enquanto ativo, todo callback registrado
+    no Tk (botões, eventos, after) passa por CallWrapperMedido e tem a duração
+    somada ao histograma. Uma thread vigia percebe quando o batimento passa
+    de limite_ms do horário esperado e colhe a pilha da thread do Tk naquele
+    instante; o handler que passar do limite é registrado no log com essa
+    pilha. iniciar() deve ser chamado na thread do Tk, antes de criar os
+    widgets: callbacks registrados antes dele não são medidos.
+    """
+
+    def __init__(self, root, limite_ms=100.0, intervalo_ms=50, maximo=50, vigia=True,
+                 relogio=time.perf_counter):
+        self.root = root
+        self.limite_ms = limite_ms
+        self.intervalo_ms = intervalo_ms
+        self.vigia = vigia
+        self.relogio = relogio
+        self.instrumentacao = Instrumentacao(
+            LIMITES_UI, relogio, prefixo="tarefas_ui",
+            descricao="Duração dos handlers do Tk e atraso do laço de eventos"
+        )
+        self.metodos = Instrumentacao(
+            LIMITES_UI, relogio, prefixo="tarefas_ui_metodos",
+            descricao="Duração dos métodos das telas, contida na dos handlers que os chamam"
+        )
+        self.ativo = False
+        self._travamentos = deque(maxlen=maximo)
+        self._trava = threading.Lock()
+        # Horário esperado do próximo batimento (None com o monitor parado)
+        self._esperado = None
+        self._agendado = None
+        # Pilha colhida pela vigia e o batimento atrasado a que ela pertence
+        self._amostra = None
+        self._amostrado = None
+        # Algum handler já explicou o atraso do próximo batimento
+        self._handler_lento = False
+        self._thread_tk = None
+        self._thread_vigia = None
+        self._parar = threading.Event()
+        self._callwrapper_original = None
+
+    @classmethod
+    def do_ambiente(cls, root):
+        """Cria o monitor a partir de TASKS_UI_LIMITE_MS (None se a variável não existir)"""
+        valor = os.environ.get(VARIAVEL_LIMITE_UI)
+        if not valor:
+            return None
+        try:
+            return cls(root, float(valor))
+        except ValueError:
+            raise ValueError(f"{VARIAVEL_LIMITE_UI} deve ser um número de milissegundos: {valor!r}")
+
+    def iniciar(self):
+        """Passa a medir os callbacks do Tk e inicia os batimentos e a vigia"""
+        if self.ativo:
+            return
+        if CallWrapperMedido.monitor is not None:
+            raise RuntimeError("Já existe um monitor da interface ativo")
+        self.ativo = True
+        self._thread_tk = threading.get_ident()
+        CallWrapperMedido.monitor = self
+        self._callwrapper_original = tkinter.CallWrapper
+        tkinter.CallWrapper = CallWrapperMedido
+        self._agendar_batimento()
+        if self.vigia:
+            self._parar.clear()
+            self._thread_vigia = threading.Thread(target=self._vigiar, name="monitor-ui", daemon=True)
+            self._thread_vigia.start()
+
+    def parar(self):
+        """Para os batimentos e a vigia e devolve ao tkinter o CallWrapper original"""
+        if not self.ativo:
+            return
+        self.ativo = False
+        self._parar.set()
+        if self._thread_vigia is not None:
+            self._thread_vigia.join()
+            self._thread_vigia = None
+        if self._agendado is not None:
+            try:
+                self.root.after_cancel(self._agendado)
+            except tkinter.TclError:
+                # A janela já foi destruída
+                pass
+            self._agendado = None
+        self._esperado = None
+        tkinter.CallWrapper = self._callwrapper_original
+        CallWrapperMedido.monitor = None
+
+    def interno(self, funcao):
+        """Indica um callback do próprio monitor (o batimento não é medido como handler)"""
+        return getattr(alvo_callback(funcao), "__self__", None) is self
+
+    def _agendar_batimento(self):
+        self._esperado = self.relogio() + self.intervalo_ms / 1000
+        self._agendado = self.root.after(self.intervalo_ms, self._batimento)
+
+    def _batimento(self):
+        if not self.ativo:
+            return
+        atraso = max(0.0, self.relogio() - self._esperado)
+        self.instrumentacao.registrar(ATRASO_LACO, atraso)
+        pilha = self._tomar_amostra()
+        # Um travamento fora dos handlers medidos (ex.: redesenho) só aparece aqui
+        if atraso * 1000 >= self.limite_ms and not self._handler_lento:
+            self._registrar_travamento(ATRASO_LACO, atraso, pilha)
+        self._handler_lento = False
+        self._agendar_batimento()
+
+    def _vigiar(self):
+        espera = min(self.intervalo_ms, self.limite_ms) / 1000
+        while not self._parar.wait(espera):
+            esperado = self._esperado
+            if esperado is None or esperado == self._amostrado:
+                continue
+            if (self.relogio() - esperado) * 1000 >= self.limite_ms:
+                pilha = pilha_da_thread(self._thread_tk)
+                with self._trava:
+                    self._amostra = pilha
+                    self._amostrado = esperado
+
+    def _tomar_amostra(self):
+        with self._trava:
+            pilha, self._amostra = self._amostra, None
+        return pilha
+
+    def _registrar_travamento(self, nome, duracao, pilha):
+        travamento = Travamento(nome, duracao * 1000, pilha)
+        with self._trava:
+            self._travamentos.append(travamento)
+        if pilha:
+            logger.warning("Interface travada por %.0f ms em %s; pilha da thread do Tk:\n%s",
+                           travamento.duracao_ms, nome, pilha.rstrip())
+        else:
+            logger.warning("Interface travada por %.0f ms em %s (sem amostra da pilha)",
+                           travamento.duracao_ms, nome)
+
+    def registrar_handler(self, nome, duracao):
+        """Soma a duração de um handler e registra o travamento se passou do limite"""
+        self.instrumentacao.registrar(nome, duracao)
+        if duracao * 1000 >= self.limite_ms:
+            self._handler_lento = True
+            self._registrar_travamento(nome, duracao, self._tomar_amostra())
+
+    def medir(self, nome, funcao):
+        """Retorna funcao envolvida como um handler, para callbacks que não passam pelo Tk"""
+        relogio = self.relogio
+
+        @functools.wraps(funcao)
+        def medida(*args, **kwargs):
+            inicio = relogio()
+            try:
+                return funcao(*args, **kwargs)
+            finally:
+                self.registrar_handler(nome, relogio() - inicio)
+
+        return medida
+
+    def instrumentar(self, objeto, metodos=METODOS_UI):
+        """Mede também os métodos de uma tela pelo nome, à parte dos handlers e sem registrar travamentos"""
+        self.metodos.instrumentar(objeto, metodos)
+
+    def travamentos(self):
+        """Retorna os travamentos guardados, do mais antigo para o mais recente"""
+        with self._trava:
+            return list(self._travamentos)
+
+    def limpar(self):
+        """Zera as métricas e descarta os travamentos guardados"""
+        self.instrumentacao.limpar()
+        self.metodos.limpar()
+        with self._trava:
+            self._travamentos.clear()
+
+    def resumo(self):
+        """Retorna as métricas por handler (e o atraso do laço em ATRASO_LACO)"""
+        return self.instrumentacao.resumo()
+
+    def resumo_metodos(self):
+        """Retorna as métricas dos métodos das telas medidos por instrumentar"""
+        return self.metodos.resumo()
+
+    def exportar_prometheus(self):
+        """Retorna as métricas da interface (handlers e métodos das telas) no formato de texto do Prometheus"""
+        return self.instrumentacao.exportar_prometheus() + self.metodos.exportar_prometheus()
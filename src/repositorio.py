@@ -0,0 +1,804 @@
+"""
+Camada de persistência de usuários e tarefas (sem dependência de tkinter)
+"""
+import base64
+import json
+import sqlite3
+from collections import Counter
+from collections.abc import Mapping
+from datetime import datetime
+
+from .banco import PoolConexoes, transacao
+from .consultas import STATUS_TAREFAS, FiltroTarefas, compilar_contagem, compilar_pagina, expressao_busca
+from .limitador import LimitadorLogin
+from .migracoes import ContextoMigracao, migrar
+from .senhas import MotorSenhas
+from .sessao import GerenciadorSessoes
+
+# Colunas de uma tarefa na ordem usada pelo quadro Kanban
+COLUNAS_TAREFA = "id, titulo, descricao, status, prioridade, data_criacao, criado_em"
+
+# Inserção de uma tarefa; criado_em (segundos desde a época, UTC) é derivado
+# de data_criacao (horário local) uma única vez, na gravação
+INSERIR_TAREFA = '''
+    INSERT INTO tarefas (usuario_email, titulo, descricao, status, prioridade, data_criacao, criado_em)
+    VALUES (?1, ?2, ?3, ?4, ?5, ?6, CAST(strftime('%s', ?6, 'utc') AS INTEGER))
+'''
+
+# Inserção de um bloco do lote (lista JSON de linhas de CAMPOS_LOTE) numa só
+# instrução: ela é atômica por si, sem o SAVEPOINT e o journal de instrução
+# que o executemany abriria a cada linha enquanto houver gatilhos na tabela
+INSERIR_BLOCO = '''
+    INSERT INTO tarefas (usuario_email, titulo, descricao, status, prioridade, data_criacao, criado_em)
+    SELECT json_extract(value, '$[0]'), json_extract(value, '$[1]'), json_extract(value, '$[2]'),
+           json_extract(value, '$[3]'), json_extract(value, '$[4]'), json_extract(value, '$[5]'),
+           CAST(strftime('%s', json_extract(value, '$[5]'), 'utc') AS INTEGER)
+    FROM json_each(?) ORDER BY key
+'''
+
+# Campos aceitos por tarefa na inserção em lote, na ordem das tuplas
+CAMPOS_LOTE = ("usuario_email", "titulo", "descricao", "status", "prioridade", "data_criacao")
+
+# Sinal que suspende os gatilhos de inserção (busca e contagens) dentro da
+# transação do lote, que faz o mesmo trabalho de uma vez: o índice de busca
+# por bloco e as contagens somadas por dono e status. A linha é apagada antes
+# do commit, então as outras conexões nunca a veem
+MARCAR_LOTE = 'INSERT INTO insercao_em_lote (ativa) VALUES (1)'
+DESMARCAR_LOTE = 'DELETE FROM insercao_em_lote'
+
+# Indexação para a busca das tarefas inseridas num bloco do lote
+INDEXAR_BUSCA_LOTE = '''
+    INSERT INTO tarefas_busca (rowid, titulo, descricao)
+    SELECT id, titulo, descricao FROM tarefas WHERE id IN (SELECT value FROM json_each(?))
+'''
+
+# Soma de uma quantidade de tarefas às contagens de um dono e status
+SOMAR_CONTAGEM = '''
+    INSERT INTO contagem_tarefas (usuario_email, status, quantidade) VALUES (?, ?, ?)
+    ON CONFLICT (usuario_email, status) DO UPDATE SET quantidade = quantidade + excluded.quantidade
+'''
+
+# Peso do título em relação à descrição na ordenação da busca (bm25)
+PESO_TITULO_BUSCA = 10.0
+
+
+def codificar_continuacao(prioridade, tarefa_id):
+    """Gera o token opaco de continuação da paginação de tarefas"""
+    dados = json.dumps([prioridade or 0, tarefa_id]).encode()
+    return base64.urlsafe_b64encode(dados).decode().rstrip("=")
+
+
+def decodificar_continuacao(continuacao):
+    """Recupera (prioridade, id) de um token de continuação"""
+    try:
+        preenchimento = "=" * (-len(continuacao) % 4)
+        prioridade, tarefa_id = json.loads(base64.urlsafe_b64decode(continuacao + preenchimento))
+        return int(prioridade), int(tarefa_id)
+    except (ValueError, TypeError):
+        raise ValueError("Token de continuação inválido")
+
+
+def validar_tarefa_lote(item, data_padrao):
+    """Normaliza uma tarefa da inserção em lote, retornando (linha, erro)"""
+    if isinstance(item, Mapping):
+        desconhecidos = set(item) - set(CAMPOS_LOTE)
+        if desconhecidos:
+            return None, f"Campos desconhecidos: {', '.join(sorted(desconhecidos))}"
+        valores = [item.get(campo) for campo in CAMPOS_LOTE]
+    elif isinstance(item, (tuple, list)):
+        # Só tuplas e listas: uma string também é iterável, mas viraria um campo por caractere
+        valores = list(item)
+        if not 2 <= len(valores) <= len(CAMPOS_LOTE):
+            return None, "A tarefa deve ter de 2 a 6 campos"
+        valores += [None] * (len(CAMPOS_LOTE) - len(valores))
+    else:
+        return None, "Tarefa deve ser um dict, tupla ou lista"
+    
+    usuario_email, titulo, descricao, status, prioridade, data_criacao = valores
+    if not isinstance(usuario_email, str) or not usuario_email.strip():
+        return None, "Email do usuário é obrigatório"
+    if not isinstance(titulo, str) or not titulo.strip():
+        return None, "Título é obrigatório"
+    if descricao is not None and not isinstance(descricao, str):
+        return None, "Descrição deve ser texto"
+    status = status or "A Fazer"
+    if status not in STATUS_TAREFAS:
+        return None, f"Status inválido: {status}"
+    prioridade = prioridade or 0
+    if prioridade not in (0, 1):
+        return None, f"Prioridade inválida: {prioridade}"
+    
+    return (usuario_email, titulo.strip(), descricao or "", status, int(prioridade),
+            data_criacao or data_padrao), None
+
+
+class Repositorio:
+    """Acesso ao banco de dados SQLite de usuários e tarefas"""
+    
+    def __init__(self, db_file="users.db", perfil=None, motor_senhas=None, sessoes=None, limitador=None,
+                 instrumentacao=None, **opcoes_pool):
+        self.db_file = db_file
+        self.pool = PoolConexoes(db_file, perfil, **opcoes_pool)
+        # Hash de senhas em processos separados; as chamadas bloqueiam a thread atual
+        self.senhas = motor_senhas or MotorSenhas()
+        self.sessoes = sessoes or GerenciadorSessoes()
+        # Tentativas de login recusadas não chegam ao banco nem ao hash
+        self.limitador = limitador or LimitadorLogin()
+        # Medição opcional de tempo, linhas e erros de cada método de dados
+        self.instrumentacao = instrumentacao
+        if instrumentacao is not None:
+            instrumentacao.instrumentar(self)
+    
+    def init_database(self, progresso=None):
+        """Cria ou atualiza o esquema do banco aplicando as migrações pendentes
+
+        progresso(descricao, feitos, total) é chamado durante migrações longas.
+        Retorna as versões aplicadas (vazio se o banco já estava atualizado).
+        """
+        contexto = ContextoMigracao(progresso, self.senhas.gerar_hash)
+        with self.conexao() as conn:
+            return migrar(conn, contexto, perfil=self.pool.perfil)
+    
+    def conexao(self):
+        """Empresta uma conexão do pool (usar com 'with')"""
+        return self.pool.conexao()
+    
+    def get_connection(self):
+        """Retorna uma conexão avulsa com o banco de dados (fora do pool)"""
+        return sqlite3.connect(self.db_file)
+    
+    def fechar(self):
+        """Fecha as conexões abertas com o banco de dados e os processos de hash"""
+        self.pool.fechar()
+        self.senhas.encerrar()
+    
+    def _verificar_credenciais(self, email, senha, origem=None):
+        """Verifica email e senha, retornando (id, nome, email) ou None
+
+        Levanta LimiteTentativasError, sem consultar o banco, quando a conta
+        ou a origem excederam o limite de tentativas. Um email inexistente
+        também passa pelo KDF, contra um hash fictício. Senhas guardadas em
+        texto puro ou com custo desatualizado são refeitas com os parâmetros
+        atuais após um login bem-sucedido.
+        """
+        self.limitador.permitir(email, origem)
+        
+        with self.conexao() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                SELECT id, nome, email, senha FROM usuarios 
+                WHERE email = ?
+            ''', (email,))
+            usuario = cursor.fetchone()
+        
+        if usuario is None:
+            # Mesmo custo de KDF de uma senha errada: o tempo de resposta não revela se a conta existe
+            self.senhas.verificar_ficticio(senha)
+            self.limitador.registrar_falha(email)
+            return None
+        
+        usuario_id, nome, email, armazenado = usuario
+        valida, novo_hash = self.senhas.verificar(senha, armazenado)
+        if not valida:
+            self.limitador.registrar_falha(email)
+            return None
+        self.limitador.registrar_sucesso(email)
+        
+        if novo_hash:
+            with self.conexao() as conn:
+                # Só troca se a senha não foi alterada enquanto o hash era calculado
+                conn.execute(
+                    'UPDATE usuarios SET senha = ? WHERE email = ? AND senha = ?',
+                    (novo_hash, email, armazenado)
+                )
+                conn.commit()
+        return usuario_id, nome, email
+    
+    def verificar_usuario(self, email, senha, origem=None):
+        """Verifica se o email e senha correspondem a um usuário, retornando (nome, email) ou None"""
+        usuario = self._verificar_credenciais(email, senha, origem)
+        return usuario[1:] if usuario else None
+    
+    def autenticar(self, email, senha, origem=None):
+        """Verifica as credenciais e abre uma sessão, retornando a Sessao ou None
+
+        origem identifica o cliente (ex.: endereço IP) para o limite de
+        tentativas por origem; levanta LimiteTentativasError se excedido.
+        """
+        usuario = self._verificar_credenciais(email, senha, origem)
+        if usuario is None:
+            return None
+        return self.sessoes.criar(*usuario)
+    
+    def retomar_sessao(self, token):
+        """Retorna a sessão ainda válida de um token, sem consultar o banco nem recalcular o hash"""
+        return self.sessoes.obter(token)
+    
+    def encerrar_sessao(self, token):
+        """Encerra uma sessão (logout)"""
+        return self.sessoes.encerrar(token)
+    
+    def contadores_login(self):
+        """Retorna os contadores do limite de tentativas de login"""
+        return self.limitador.contadores()
+    
+    def usuario_existe(self, email):
+        """Verifica se um email já está cadastrado"""
+        with self.conexao() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('SELECT email FROM usuarios WHERE email = ?', (email,))
+            return cursor.fetchone() is not None
+    
+    def cadastrar_usuario(self, nome, email, senha, retornar_usuario=False):
+        """Cadastra um novo usuário no banco de dados (a senha é guardada como hash)
+
+        Com retornar_usuario, retorna a linha (id, nome, email) criada em vez
+        de True, ou None em vez de False.
+        """
+        senha_hash = self.senhas.gerar_hash(senha)
+        with self.conexao() as conn:
+            cursor = conn.cursor()
+            
+            try:
+                cursor.execute('''
+                    INSERT INTO usuarios (nome, email, senha)
+                    VALUES (?, ?, ?)
+                    RETURNING id, nome, email
+                ''', (nome, email, senha_hash))
+                usuario = cursor.fetchone()
+                
+                conn.commit()
+                return usuario if retornar_usuario else True
+            except sqlite3.IntegrityError:
+                conn.rollback()
+                return None if retornar_usuario else False
+    
+    def listar_usuarios(self):
+        """Lista todos os usuários cadastrados"""
+        with self.conexao() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('SELECT id, nome, email FROM usuarios ORDER BY nome, id')
+            return cursor.fetchall()
+    
+    def excluir_usuario(self, email):
+        """Exclui um usuário do banco de dados"""
+        # Não permitir excluir o próprio admin
+        if email == "admin":
+            return False, "Não é possível excluir o usuário administrador!"
+        
+        with self.conexao() as conn:
+            cursor = conn.cursor()
+            
+            try:
+                # Excluir tarefas do usuário primeiro
+                cursor.execute('DELETE FROM tarefas WHERE usuario_email = ?', (email,))
+                # Excluir o usuário
+                cursor.execute('DELETE FROM usuarios WHERE email = ?', (email,))
+                if cursor.rowcount > 0:
+                    conn.commit()
+                    self.sessoes.encerrar_do_usuario(email)
+                    return True, "Usuário excluído com sucesso!"
+                else:
+                    conn.rollback()
+                    return False, "Usuário não encontrado!"
+            except Exception as e:
+                conn.rollback()
+                return False, f"Erro ao excluir usuário: {str(e)}"
+    
+    def listar_tarefas(self, usuario_email=None):
+        """Lista todas as tarefas de um usuário (ou de todos se usuario_email for None)"""
+        with self.conexao() as conn:
+            cursor = conn.cursor()
+            
+            if usuario_email:
+                cursor.execute(f'''
+                    SELECT {COLUNAS_TAREFA} FROM tarefas 
+                    WHERE usuario_email = ? 
+                    ORDER BY prioridade DESC, id DESC
+                ''', (usuario_email,))
+            else:
+                # Se None, retorna todas as tarefas (para admin)
+                cursor.execute(f'''
+                    SELECT {COLUNAS_TAREFA}, usuario_email 
+                    FROM tarefas 
+                    ORDER BY prioridade DESC, id DESC
+                ''')
+            
+            return cursor.fetchall()
+    
+    def listar_tarefas_pagina(self, usuario_email=None, limite=100, continuacao=None):
+        """Lista uma página de tarefas na ordem do quadro (paginação por chave)
+
+        Retorna (tarefas, continuacao). A continuação é um token opaco que,
+        passado na próxima chamada, retoma logo após a última tarefa da página;
+        é None quando não há mais tarefas. Cada página custa o mesmo, qualquer
+        que seja a sua posição, porque a busca parte de (prioridade, id) no índice.
+        """
+        colunas = COLUNAS_TAREFA if usuario_email else f"{COLUNAS_TAREFA}, usuario_email"
+        filtro_usuario = "usuario_email = ? AND" if usuario_email else ""
+        parametros_usuario = [usuario_email] if usuario_email else []
+        
+        with self.conexao() as conn:
+            cursor = conn.cursor()
+            
+            # Buscar uma linha a mais para saber se existe próxima página
+            if continuacao is None:
+                where = "WHERE usuario_email = ?" if usuario_email else ""
+                cursor.execute(f'''
+                    SELECT {colunas} FROM tarefas
+                    {where}
+                    ORDER BY prioridade DESC, id DESC
+                    LIMIT ?
+                ''', parametros_usuario + [limite + 1])
+            else:
+                # Duas buscas por faixa no índice: o restante da prioridade atual e
+                # as prioridades menores (uma só comparação (prioridade, id) < (?, ?)
+                # faria o SQLite percorrer a prioridade atual desde o início)
+                prioridade, tarefa_id = decodificar_continuacao(continuacao)
+                cursor.execute(f'''
+                    SELECT * FROM (
+                        SELECT {colunas} FROM tarefas
+                        WHERE {filtro_usuario} prioridade = ? AND id < ?
+                        ORDER BY prioridade DESC, id DESC
+                        LIMIT ?
+                    )
+                    UNION ALL
+                    SELECT * FROM (
+                        SELECT {colunas} FROM tarefas
+                        WHERE {filtro_usuario} prioridade < ?
+                        ORDER BY prioridade DESC, id DESC
+                        LIMIT ?
+                    )
+                    ORDER BY prioridade DESC, id DESC
+                    LIMIT ?
+                ''', parametros_usuario + [prioridade, tarefa_id, limite + 1]
+                    + parametros_usuario + [prioridade, limite + 1, limite + 1])
+            tarefas = cursor.fetchall()
+        
+        if len(tarefas) <= limite:
+            return tarefas, None
+        tarefas = tarefas[:limite]
+        ultima = tarefas[-1]
+        return tarefas, codificar_continuacao(ultima[4], ultima[0])
+    
+    def iterar_tarefas(self, usuario_email=None, tamanho_lote=500):
+        """Percorre as tarefas na ordem do quadro com memória constante
+
+        Cada lote de tamanho_lote linhas é lido com um empréstimo próprio do
+        pool, continuando depois da última tarefa lida como em
+        consultar_tarefas; entre os lotes nenhuma conexão fica emprestada, de
+        modo que o gerador pode ficar suspenso ou ser consumido em outra thread.
+        """
+        filtro = FiltroTarefas(usuario_email=usuario_email or None)
+        colunas = COLUNAS_TAREFA if usuario_email else f"{COLUNAS_TAREFA}, usuario_email"
+        apos = None
+        
+        while True:
+            sql, parametros = compilar_pagina(filtro, colunas, tamanho_lote, apos)
+            with self.conexao() as conn:
+                lote = conn.execute(sql, parametros).fetchall()
+            
+            yield from lote
+            if len(lote) < tamanho_lote:
+                break
+            ultima = lote[-1]
+            apos = (ultima[4], ultima[0])
+    
+    def buscar_tarefas(self, texto, usuario_email=None, limite=100):
+        """Busca tarefas pelo título e descrição, das mais relevantes para as menos
+
+        Usa o índice de texto tarefas_busca, sem percorrer a tabela. Com
+        usuario_email, só as tarefas dele; com None, de todos os usuários
+        (para admin), incluindo a coluna usuario_email como em listar_tarefas.
+        O CROSS JOIN fixa o índice de texto como ponto de partida: as tarefas
+        do usuário são filtradas pela chave primária entre os resultados.
+        """
+        expressao = expressao_busca(texto)
+        if expressao is None:
+            return []
+        colunas = ", ".join(f"t.{coluna}" for coluna in COLUNAS_TAREFA.split(", "))
+        
+        with self.conexao() as conn:
+            cursor = conn.cursor()
+            
+            if usuario_email:
+                cursor.execute(f'''
+                    SELECT {colunas} FROM tarefas_busca
+                    CROSS JOIN tarefas t ON t.id = tarefas_busca.rowid
+                    WHERE tarefas_busca MATCH ? AND t.usuario_email = ?
+                    ORDER BY bm25(tarefas_busca, ?, 1.0)
+                    LIMIT ?
+                ''', (expressao, usuario_email, PESO_TITULO_BUSCA, limite))
+            else:
+                cursor.execute(f'''
+                    SELECT {colunas}, t.usuario_email FROM tarefas_busca
+                    JOIN tarefas t ON t.id = tarefas_busca.rowid
+                    WHERE tarefas_busca MATCH ?
+                    ORDER BY bm25(tarefas_busca, ?, 1.0)
+                    LIMIT ?
+                ''', (expressao, PESO_TITULO_BUSCA, limite))
+            
+            return cursor.fetchall()
+    
+    def consultar_tarefas(self, filtro=None, limite=100, continuacao=None, contar=True, **filtros):
+        """Consulta tarefas de todos os usuários com filtros combinados, paginada
+
+        Os filtros vêm de um FiltroTarefas ou dos argumentos nomeados
+        (usuario_email, status, prioridade, criado_de, criado_ate, texto).
+        Retorna (tarefas, continuacao, total): as linhas incluem usuario_email,
+        a continuação funciona como em listar_tarefas_pagina e total é o número
+        de tarefas do filtro (None com contar=False, ex.: nas páginas seguintes).
+        """
+        filtro = (filtro or FiltroTarefas())._replace(**filtros)
+        apos = decodificar_continuacao(continuacao) if continuacao is not None else None
+        sql, parametros = compilar_pagina(filtro, f"{COLUNAS_TAREFA}, usuario_email", limite + 1, apos)
+        
+        with self.conexao() as conn:
+            cursor = conn.cursor()
+            
+            # Buscar uma linha a mais para saber se existe próxima página
+            cursor.execute(sql, parametros)
+            tarefas = cursor.fetchall()
+            total = None
+            if contar:
+                cursor.execute(*compilar_contagem(filtro))
+                total = cursor.fetchone()[0]
+        
+        if len(tarefas) <= limite:
+            return tarefas, None, total
+        tarefas = tarefas[:limite]
+        ultima = tarefas[-1]
+        return tarefas, codificar_continuacao(ultima[4], ultima[0]), total
+    
+    def contar_tarefas_por_status(self, usuario_email):
+        """Conta as tarefas de um usuário em cada status (lidas de contagem_tarefas)"""
+        with self.conexao() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                SELECT status, quantidade FROM contagem_tarefas
+                WHERE usuario_email = ? AND quantidade > 0
+            ''', (usuario_email,))
+            return dict(cursor.fetchall())
+    
+    def contar_tarefas_por_usuario(self):
+        """Conta as tarefas de todos os usuários: {email: {status: quantidade}}"""
+        with self.conexao() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                SELECT usuario_email, status, quantidade FROM contagem_tarefas
+                WHERE quantidade > 0
+            ''')
+            contagens = {}
+            for usuario_email, status, quantidade in cursor:
+                contagens.setdefault(usuario_email, {})[status] = quantidade
+            return contagens
+    
+    def listar_tarefas_status(self, usuario_email, status, limite, deslocamento=0):
+        """Lista uma faixa das tarefas de um usuário em um status, na ordem do quadro"""
+        with self.conexao() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute(f'''
+                SELECT {COLUNAS_TAREFA} FROM tarefas
+                WHERE usuario_email = ? AND status = ?
+                ORDER BY prioridade DESC, id DESC
+                LIMIT ? OFFSET ?
+            ''', (usuario_email, status, limite, deslocamento))
+            return cursor.fetchall()
+    
+    def carregar_quadro(self, usuario_email, limite=None):
+        """Retorna as contagens por status e as tarefas do quadro
+
+        Se o total de tarefas passar de limite, as tarefas não são carregadas
+        (retorna None no lugar delas) para que o quadro use colunas virtuais.
+        """
+        with self.conexao():
+            contagens = self.contar_tarefas_por_status(usuario_email)
+            if limite is not None and sum(contagens.values()) > limite:
+                return contagens, None
+            return contagens, self.listar_tarefas(usuario_email)
+    
+    def adicionar_tarefa(self, usuario_email, titulo, descricao, status="A Fazer", prioridade=0,
+                         retornar_tarefa=False):
+        """Adiciona uma nova tarefa (retorna o id ou, com retornar_tarefa, a linha criada)"""
+        with self.conexao() as conn:
+            cursor = conn.cursor()
+            
+            try:
+                data_criacao = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                cursor.execute(f'''
+                    {INSERIR_TAREFA}
+                    RETURNING {COLUNAS_TAREFA}
+                ''', (usuario_email, titulo, descricao, status, prioridade, data_criacao))
+                tarefa = cursor.fetchone()
+                
+                conn.commit()
+                return True, tarefa if retornar_tarefa else tarefa[0]
+            except Exception as e:
+                conn.rollback()
+                return False, str(e)
+    
+    def adicionar_tarefas_em_lote(self, tarefas, tamanho_lote=1000):
+        """Insere muitas tarefas em uma única transação
+
+        Cada tarefa pode ser um dicionário com os campos de CAMPOS_LOTE ou uma
+        tupla nessa ordem (status, prioridade e data são opcionais). As linhas
+        são validadas e inseridas em blocos de tamanho_lote, uma instrução por
+        bloco; um bloco com erro no banco é refeito linha a linha, de modo que só as
+        linhas problemáticas falham. Os gatilhos de inserção ficam suspensos
+        na transação (MARCAR_LOTE): cada bloco é indexado para a busca numa
+        instrução e as contagens são somadas uma vez por dono e status. Num
+        empréstimo aninhado com uma transação já aberta, o lote vira um
+        SAVEPOINT dela e o commit fica com quem a abriu.
+
+        Retorna (ids, falhas): ids[i] é o id da i-ésima tarefa (None se ela
+        falhou) e falhas é uma lista de (índice, mensagem).
+        """
+        data_padrao = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        # Lista para que ids e falhas cubram todas as posições, mesmo se o lote falhar no meio
+        tarefas = list(tarefas)
+        ids = []
+        falhas = []
+        
+        with self.conexao() as conn:
+            cursor = conn.cursor()
+            contagens = Counter()
+            
+            def inserir_bloco(bloco):
+                # Com AUTOINCREMENT e a escrita exclusiva da transação, as linhas
+                # do bloco recebem ids consecutivos, na ordem, até last_insert_rowid()
+                try:
+                    cursor.execute(INSERIR_BLOCO, (json.dumps([linha for _, linha in bloco], default=str),))
+                    ultimo = cursor.execute('SELECT last_insert_rowid()').fetchone()[0]
+                    primeiro = ultimo - len(bloco) + 1
+                    for deslocamento, (indice, _) in enumerate(bloco):
+                        ids[indice] = primeiro + deslocamento
+                    inseridas = bloco
+                except sqlite3.IntegrityError:
+                    # A instrução com erro não deixa nenhuma linha do bloco;
+                    # refazer linha a linha para isolar as que falham
+                    inseridas = []
+                    for indice, linha in bloco:
+                        try:
+                            cursor.execute(INSERIR_TAREFA, linha)
+                            ids[indice] = cursor.lastrowid
+                            inseridas.append((indice, linha))
+                        except sqlite3.IntegrityError as e:
+                            falhas.append((indice, f"Erro ao inserir tarefa: {str(e)}"))
+                
+                # O que os gatilhos suspensos fariam por linha
+                if inseridas:
+                    cursor.execute(INDEXAR_BUSCA_LOTE, (json.dumps([ids[indice] for indice, _ in inseridas]),))
+                for _, linha in inseridas:
+                    contagens[linha[0], linha[3]] += 1
+            
+            try:
+                with transacao(conn, "lote"):
+                    cursor.execute(MARCAR_LOTE)
+                    bloco = []
+                    for indice, item in enumerate(tarefas):
+                        ids.append(None)
+                        linha, erro = validar_tarefa_lote(item, data_padrao)
+                        if erro:
+                            falhas.append((indice, erro))
+                            continue
+                        bloco.append((indice, linha))
+                        if len(bloco) >= tamanho_lote:
+                            inserir_bloco(bloco)
+                            bloco = []
+                    if bloco:
+                        inserir_bloco(bloco)
+                    cursor.executemany(SOMAR_CONTAGEM, [
+                        (usuario_email, status, quantidade)
+                        for (usuario_email, status), quantidade in contagens.items()
+                    ])
+                    cursor.execute(DESMARCAR_LOTE)
+            except Exception as e:
+                mensagem = f"Erro ao inserir tarefas: {str(e)}"
+                falhas = [(indice, mensagem) for indice in range(len(tarefas))]
+                ids = [None] * len(tarefas)
+        
+        falhas.sort()
+        return ids, falhas
+    
+    def obter_prioridade_tarefa(self, tarefa_id):
+        """Obtém a prioridade atual de uma tarefa"""
+        with self.conexao() as conn:
+            cursor = conn.cursor()
+            
+            try:
+                cursor.execute('SELECT prioridade FROM tarefas WHERE id = ?', (tarefa_id,))
+                resultado = cursor.fetchone()
+                if resultado:
+                    return resultado[0] if resultado[0] else 0
+                return 0
+            except Exception as e:
+                return 0
+    
+    def _filtro_propriedade(self, usuario_email):
+        """Retorna a condição SQL e os parâmetros que restringem a escrita ao dono da tarefa"""
+        # Admin (ou chamada sem usuário) pode modificar qualquer tarefa
+        if usuario_email and usuario_email != "admin":
+            return "AND usuario_email = ?", (usuario_email,)
+        return "", ()
+    
+    def _tarefa_existe(self, cursor, tarefa_id):
+        """Diferencia, após uma exclusão sem efeito, tarefa inexistente de tarefa alheia"""
+        # Executada só no caminho de falha, na mesma transação da escrita
+        cursor.execute('SELECT 1 FROM tarefas WHERE id = ?', (tarefa_id,))
+        return cursor.fetchone() is not None
+    
+    def _gravar_campo(self, cursor, campo, valor, tarefa_id, usuario_email):
+        """Aplica campo = valor a uma tarefa, verificando a propriedade na mesma instrução
+
+        Retorna (permitida, linha) ou None se a tarefa não existir. A tarefa de
+        outro usuário é regravada com o valor atual e volta com permitida
+        falso, o que separa "não encontrada" de "sem permissão" sem uma
+        segunda consulta; quem chama desfaz a transação nesse caso.
+        """
+        if usuario_email and usuario_email != "admin":
+            atribuicao = f"{campo} = CASE WHEN usuario_email = ?1 THEN ?2 ELSE {campo} END"
+            permitida = "usuario_email = ?1"
+        else:
+            # Admin (ou chamada sem usuário) pode modificar qualquer tarefa
+            atribuicao = f"{campo} = ?2"
+            permitida = "1"
+        cursor.execute(f'''
+            UPDATE tarefas SET {atribuicao} WHERE id = ?3
+            RETURNING {permitida}, {COLUNAS_TAREFA}
+        ''', (usuario_email, valor, tarefa_id))
+        gravada = cursor.fetchone()
+        if gravada is None:
+            return None
+        return bool(gravada[0]), tuple(gravada[1:])
+    
+    def definir_prioridade_tarefa(self, tarefa_id, prioridade, usuario_email=None, *, retornar_tarefa=False):
+        """Atualiza a prioridade de uma tarefa (apenas se pertencer ao usuário ou for admin)
+
+        A propriedade é verificada pela própria instrução UPDATE. Retorna
+        (sucesso, mensagem); com retornar_tarefa, o segundo valor em caso de
+        sucesso é a linha alterada.
+        """
+        with self.conexao() as conn:
+            cursor = conn.cursor()
+            
+            try:
+                gravada = self._gravar_campo(cursor, "prioridade", prioridade, tarefa_id, usuario_email)
+                if gravada is None:
+                    conn.rollback()
+                    return False, "Tarefa não encontrada!"
+                permitida, tarefa = gravada
+                if not permitida:
+                    conn.rollback()
+                    return False, "Você não tem permissão para modificar esta tarefa!"
+                conn.commit()
+                return True, tarefa if retornar_tarefa else "Prioridade atualizada com sucesso!"
+            except sqlite3.Error as e:
+                conn.rollback()
+                return False, f"Erro ao atualizar prioridade: {str(e)}"
+    
+    def atualizar_prioridade_tarefa(self, tarefa_id, prioridade, usuario_email=None, *, retornar_tarefa=False):
+        """Atualiza a prioridade de uma tarefa, retornando True ou False
+
+        Com retornar_tarefa, retorna a linha alterada ou None. Para saber por
+        que a alteração falhou, use definir_prioridade_tarefa.
+        """
+        sucesso, resultado = self.definir_prioridade_tarefa(tarefa_id, prioridade, usuario_email,
+                                                            retornar_tarefa=retornar_tarefa)
+        if retornar_tarefa:
+            return resultado if sucesso else None
+        return sucesso
+    
+    def verificar_propriedade_tarefa(self, tarefa_id, usuario_email):
+        """Verifica se uma tarefa pertence a um usuário"""
+        with self.conexao() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('SELECT usuario_email FROM tarefas WHERE id = ?', (tarefa_id,))
+            resultado = cursor.fetchone()
+        
+        if resultado and resultado[0] == usuario_email:
+            return True
+        return False
+    
+    def atualizar_status_tarefa(self, tarefa_id, novo_status, usuario_email=None, *, retornar_tarefa=False):
+        """Atualiza o status de uma tarefa (apenas se pertencer ao usuário ou for admin)
+
+        A propriedade é verificada pela própria instrução UPDATE. Com
+        retornar_tarefa, o segundo valor retornado em caso de sucesso é a
+        linha atualizada em vez da mensagem.
+        """
+        with self.conexao() as conn:
+            cursor = conn.cursor()
+            
+            try:
+                gravada = self._gravar_campo(cursor, "status", novo_status, tarefa_id, usuario_email)
+                if gravada is None:
+                    conn.rollback()
+                    return False, "Tarefa não encontrada!"
+                permitida, tarefa = gravada
+                if not permitida:
+                    conn.rollback()
+                    return False, "Você não tem permissão para modificar esta tarefa!"
+                conn.commit()
+                return True, tarefa if retornar_tarefa else "Tarefa atualizada com sucesso!"
+            except Exception as e:
+                conn.rollback()
+                return False, f"Erro ao atualizar tarefa: {str(e)}"
+    
+    def _atualizar_tarefas(self, campo, valor, tarefa_ids, usuario_email):
+        """Aplica campo = valor a um conjunto de tarefas numa única instrução e transação"""
+        ids = sorted({int(tarefa_id) for tarefa_id in tarefa_ids})
+        if not ids:
+            return True, []
+        
+        with self.conexao() as conn:
+            cursor = conn.cursor()
+            
+            try:
+                # Usuários normais só alteram o conjunto se todas as tarefas forem suas
+                filtro, parametros = self._filtro_propriedade(usuario_email)
+                cursor.execute(f'''
+                    UPDATE tarefas SET {campo} = ?
+                    WHERE id IN (SELECT value FROM json_each(?)) {filtro}
+                    RETURNING {COLUNAS_TAREFA}
+                ''', (valor, json.dumps(ids)) + parametros)
+                tarefas = cursor.fetchall()
+                if len(tarefas) == len(ids):
+                    conn.commit()
+                    return True, tarefas
+                
+                cursor.execute(
+                    'SELECT COUNT(*) FROM tarefas WHERE id IN (SELECT value FROM json_each(?))',
+                    (json.dumps(ids),)
+                )
+                existentes = cursor.fetchone()[0]
+                conn.rollback()
+                if existentes < len(ids):
+                    return False, "Uma ou mais tarefas não foram encontradas!"
+                return False, "Você não tem permissão para modificar uma ou mais destas tarefas!"
+            except Exception as e:
+                conn.rollback()
+                return False, f"Erro ao atualizar tarefas: {str(e)}"
+    
+    def atualizar_status_tarefas(self, tarefa_ids, novo_status, usuario_email=None):
+        """Atualiza o status de várias tarefas de uma vez (todas ou nenhuma)
+
+        Retorna (True, linhas atualizadas) ou (False, mensagem). Para usuários
+        que não são admin, a operação só é feita se todas as tarefas forem suas.
+        """
+        return self._atualizar_tarefas("status", novo_status, tarefa_ids, usuario_email)
+    
+    def atualizar_prioridade_tarefas(self, tarefa_ids, prioridade, usuario_email=None):
+        """Atualiza a prioridade de várias tarefas de uma vez (todas ou nenhuma)"""
+        return self._atualizar_tarefas("prioridade", prioridade, tarefa_ids, usuario_email)
+    
+    def excluir_tarefa(self, tarefa_id, usuario_email=None):
+        """Exclui uma tarefa (apenas se pertencer ao usuário ou for admin)"""
+        filtro, parametros = self._filtro_propriedade(usuario_email)
+        with self.conexao() as conn:
+            cursor = conn.cursor()
+            
+            try:
+                # A propriedade é verificada pela própria instrução DELETE
+                cursor.execute(
+                    f'DELETE FROM tarefas WHERE id = ? {filtro}',
+                    (tarefa_id,) + parametros
+                )
+                if cursor.rowcount > 0:
+                    conn.commit()
+                    return True, "Tarefa excluída com sucesso!"
+                
+                existe = filtro and self._tarefa_existe(cursor, tarefa_id)
+                conn.rollback()
+                if existe:
+                    return False, "Você não tem permissão para excluir esta tarefa!"
+                return False, "Tarefa não encontrada!"
+            except Exception as e:
+                conn.rollback()
+                return False, f"Erro ao excluir tarefa: {str(e)}"
@@ -0,0 +1,222 @@
+"""
+Hash de senhas com KDF configurável executado em processos separados
+(sem dependência de tkinter)
+"""
+import base64
+import binascii
+import hashlib
+import hmac
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Parâmetros de custo de cada algoritmo. O hash armazenado guarda os
+# parâmetros com que foi gerado, então aumentar o custo aqui não invalida
+# senhas antigas: elas são refeitas no próximo login bem-sucedido.
+PARAMETROS_PADRAO = {
+    "scrypt": {"n": 2 ** 14, "r": 8, "p": 1},
+    "pbkdf2_sha256": {"iteracoes": 600_000},
+}
+
+ALGORITMO_PADRAO = "scrypt"
+
+TAMANHO_SAL = 16
+TAMANHO_CHAVE = 32
+
+
+def _b64(dados):
+    return base64.b64encode(dados).decode("ascii").rstrip("=")
+
+
+def _de_b64(texto):
+    return base64.b64decode(texto + "=" * (-len(texto) % 4))
+
+
+def _derivar(senha, sal, algoritmo, parametros):
+    """Aplica o KDF e retorna a chave derivada"""
+    senha = senha.encode("utf-8")
+    if algoritmo == "scrypt":
+        n, r, p = parametros["n"], parametros["r"], parametros["p"]
+        # Memória necessária: 128 * n * r bytes, mais uma folga
+        return hashlib.scrypt(senha, salt=sal, n=n, r=r, p=p,
+                              maxmem=256 * n * r + 1024 * 1024, dklen=TAMANHO_CHAVE)
+    if algoritmo == "pbkdf2_sha256":
+        return hashlib.pbkdf2_hmac("sha256", senha, sal, parametros["iteracoes"],
+                                   dklen=TAMANHO_CHAVE)
+    raise ValueError(f"Algoritmo de hash desconhecido: {algoritmo!r}")
+
+
+def _formatar_parametros(algoritmo, parametros):
+    if algoritmo == "scrypt":
+        return f"n={parametros['n']},r={parametros['r']},p={parametros['p']}"
+    return f"i={parametros['iteracoes']}"
+
+
+def ler_hash(armazenado):
+    """Retorna (algoritmo, parametros, sal, chave) de um hash armazenado ou None se for texto puro
+
+    Um valor que começa com o nome de um algoritmo mas não tem o formato de
+    um hash (ex.: uma senha antiga em texto puro com '$') também é texto puro.
+    """
+    partes = armazenado.split("$")
+    if len(partes) != 4 or partes[0] not in PARAMETROS_PADRAO:
+        return None
+    algoritmo, texto_parametros, sal, chave = partes
+    try:
+        valores = dict(item.split("=", 1) for item in texto_parametros.split(","))
+        if algoritmo == "scrypt":
+            parametros = {"n": int(valores["n"]), "r": int(valores["r"]), "p": int(valores["p"])}
+            # n precisa ser potência de 2
+            valido = (parametros["n"] > 1 and parametros["n"] & (parametros["n"] - 1) == 0
+                      and parametros["r"] > 0 and parametros["p"] > 0)
+        else:
+            parametros = {"iteracoes": int(valores["i"])}
+            valido = parametros["iteracoes"] > 0
+        if not valido:
+            return None
+        return algoritmo, parametros, _de_b64(sal), _de_b64(chave)
+    except (ValueError, KeyError, binascii.Error):
+        return None
+
+
+def gerar_hash(senha, algoritmo=ALGORITMO_PADRAO, parametros=None):
+    """Gera o hash armazenável de uma senha ('algoritmo$parametros$sal$chave')"""
+    parametros = parametros or PARAMETROS_PADRAO[algoritmo]
+    sal = os.urandom(TAMANHO_SAL)
+    chave = _derivar(senha, sal, algoritmo, parametros)
+    return "$".join((algoritmo, _formatar_parametros(algoritmo, parametros), _b64(sal), _b64(chave)))
+
+
+def hash_ficticio(algoritmo=ALGORITMO_PADRAO, parametros=None):
+    """Hash fixo (sal e chave zerados) com os parâmetros informados
+
+    Verificar uma senha contra ele custa o mesmo que contra um hash real;
+    serve para que o login de um email inexistente demore o mesmo que o de
+    uma senha errada.
+    """
+    parametros = parametros or PARAMETROS_PADRAO[algoritmo]
+    return "$".join((algoritmo, _formatar_parametros(algoritmo, parametros),
+                     _b64(bytes(TAMANHO_SAL)), _b64(bytes(TAMANHO_CHAVE))))
+
+
+def verificar_hash(senha, armazenado):
+    """Verifica uma senha contra o valor armazenado (aceita senhas antigas em texto puro)"""
+    lido = ler_hash(armazenado)
+    if lido is None:
+        # Cadastros anteriores ao hash guardavam a senha em texto puro
+        return hmac.compare_digest(senha.encode("utf-8"), armazenado.encode("utf-8"))
+    algoritmo, parametros, sal, chave = lido
+    return hmac.compare_digest(_derivar(senha, sal, algoritmo, parametros), chave)
+
+
+def precisa_rehash(armazenado, algoritmo=ALGORITMO_PADRAO, parametros=None):
+    """Indica se o valor armazenado usa texto puro, outro algoritmo ou outro custo"""
+    lido = ler_hash(armazenado)
+    if lido is None:
+        return True
+    return (lido[0], lido[1]) != (algoritmo, parametros or PARAMETROS_PADRAO[algoritmo])
+
+
+def verificar_e_atualizar(senha, armazenado, algoritmo=ALGORITMO_PADRAO, parametros=None):
+    """Verifica a senha e, se o hash estiver desatualizado, gera o novo.
+
+    Retorna (valida, novo_hash), com novo_hash None quando não há o que trocar.
+    Executado inteiro no processo de trabalho para não pagar o KDF duas vezes
+    na thread que chamou.
+    """
+    if not verificar_hash(senha, armazenado):
+        return False, None
+    if precisa_rehash(armazenado, algoritmo, parametros):
+        return True, gerar_hash(senha, algoritmo, parametros)
+    return True, None
+
+
+def calibrar(alvo_ms=100, algoritmo=ALGORITMO_PADRAO, repeticoes=3):
+    """Retorna os parâmetros do algoritmo cujo custo mais se aproxima de alvo_ms por hash"""
+    def medir(parametros):
+        melhor = float("inf")
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            _derivar("calibracao", b"\0" * TAMANHO_SAL, algoritmo, parametros)
+            melhor = min(melhor, time.perf_counter() - inicio)
+        return melhor * 1000
+
+    if algoritmo == "scrypt":
+        # n precisa ser potência de 2: dobrar até passar do alvo
+        parametros = {"n": 2 ** 10, "r": 8, "p": 1}
+        tempo = medir(parametros)
+        while tempo < alvo_ms and parametros["n"] < 2 ** 20:
+            anterior, tempo_anterior = dict(parametros), tempo
+            parametros["n"] *= 2
+            tempo = medir(parametros)
+            if tempo > alvo_ms and alvo_ms - tempo_anterior < tempo - alvo_ms:
+                return anterior, tempo_anterior
+        return parametros, tempo
+
+    if algoritmo == "pbkdf2_sha256":
+        # O custo do PBKDF2 é linear no número de iterações
+        base = {"iteracoes": 50_000}
+        tempo_base = medir(base)
+        iteracoes = max(1000, int(base["iteracoes"] * alvo_ms / max(tempo_base, 0.001)))
+        iteracoes = round(iteracoes, -3)
+        parametros = {"iteracoes": iteracoes}
+        return parametros, medir(parametros)
+
+    raise ValueError(f"Algoritmo de hash desconhecido: {algoritmo!r}")
+
+
+class MotorSenhas:
+    """Executa o KDF num pool de processos.
+
+    Com um custo adequado cada hash leva de 50 a 200 ms de CPU; rodar em
+    processos separados evita disputar o GIL com a thread do Tk e com as
+    threads do banco. As chamadas bloqueiam quem as faz, então devem partir
+    de uma thread de trabalho (ex.: via ExecutorBanco), nunca da thread do Tk.
+    Com processos=0 o hash é calculado na própria thread (útil em testes).
+    """
+
+    def __init__(self, algoritmo=ALGORITMO_PADRAO, parametros=None, processos=1):
+        if algoritmo not in PARAMETROS_PADRAO:
+            raise ValueError(f"Algoritmo de hash desconhecido: {algoritmo!r}")
+        self.algoritmo = algoritmo
+        self.parametros = parametros or PARAMETROS_PADRAO[algoritmo]
+        self.processos = processos
+        self._pool = None
+        self._trava = threading.Lock()
+
+    def _executar(self, funcao, *args):
+        """Executa funcao no pool de processos (criado sob demanda)"""
+        if not self.processos:
+            return funcao(*args)
+        with self._trava:
+            if self._pool is None:
+                # spawn: não herdar por fork o estado do Tk nem conexões abertas
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.processos,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            futuro = self._pool.submit(funcao, *args)
+        return futuro.result()
+
+    def gerar_hash(self, senha):
+        """Gera o hash de uma senha com os parâmetros atuais"""
+        return self._executar(gerar_hash, senha, self.algoritmo, self.parametros)
+
+    def verificar(self, senha, armazenado):
+        """Retorna (valida, novo_hash); novo_hash vem preenchido quando o custo armazenado está desatualizado"""
+        return self._executar(verificar_e_atualizar, senha, armazenado, self.algoritmo, self.parametros)
+
+    def verificar_ficticio(self, senha):
+        """Paga o custo de uma verificação com os parâmetros atuais e retorna sempre False"""
+        self._executar(verificar_e_atualizar, senha, hash_ficticio(self.algoritmo, self.parametros),
+                       self.algoritmo, self.parametros)
+        return False
+
+    def encerrar(self):
+        """Encerra os processos de trabalho"""
+        with self._trava:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown()
@@ -0,0 +1,123 @@
+"""
+Sessões autenticadas mantidas em memória (sem dependência de tkinter)
+"""
+import secrets
+import threading
+import time
+
+# Papéis de usuário; o administrador é identificado pelo email "admin"
+PAPEL_ADMIN = "admin"
+PAPEL_USUARIO = "usuario"
+
+# Validade padrão de uma sessão, em segundos
+DURACAO_PADRAO = 8 * 60 * 60
+
+# Intervalo mínimo, em segundos, entre as limpezas feitas ao criar sessões
+INTERVALO_LIMPEZA = 60
+
+
+def papel_do_usuario(email):
+    """Retorna o papel de um usuário a partir do email"""
+    return PAPEL_ADMIN if email == "admin" else PAPEL_USUARIO
+
+
+class Sessao:
+    """Usuário autenticado: id, nome, email, papel e token com validade"""
+
+    __slots__ = ("usuario_id", "nome", "email", "papel", "token", "expira_em")
+
+    def __init__(self, usuario_id, nome, email, papel, token, expira_em):
+        self.usuario_id = usuario_id
+        self.nome = nome
+        self.email = email
+        self.papel = papel
+        self.token = token
+        self.expira_em = expira_em
+
+    @property
+    def eh_admin(self):
+        """Indica se a sessão é do administrador"""
+        return self.papel == PAPEL_ADMIN
+
+    def expirada(self, agora=None):
+        """Indica se a validade da sessão já passou"""
+        return (time.time() if agora is None else agora) >= self.expira_em
+
+    def __repr__(self):
+        return f"Sessao(email={self.email!r}, papel={self.papel!r})"
+
+
+class GerenciadorSessoes:
+    """Guarda as sessões abertas indexadas pelo token.
+
+    Retomar uma sessão pelo token não consulta o banco nem recalcula o hash
+    da senha. Cada uso renova a validade (expiração deslizante). Pode ser
+    usado a partir de várias threads. Criar uma sessão remove as vencidas no
+    máximo uma vez a cada intervalo_limpeza segundos, o que mantém o mapa
+    limitado às sessões abertas dentro da validade.
+    """
+
+    def __init__(self, duracao=DURACAO_PADRAO, relogio=time.time, intervalo_limpeza=INTERVALO_LIMPEZA):
+        self.duracao = duracao
+        self.relogio = relogio
+        self.intervalo_limpeza = intervalo_limpeza
+        self._sessoes = {}
+        self._proxima_limpeza = relogio() + intervalo_limpeza
+        self._trava = threading.Lock()
+
+    def criar(self, usuario_id, nome, email):
+        """Abre uma sessão para um usuário já autenticado"""
+        agora = self.relogio()
+        sessao = Sessao(
+            usuario_id, nome, email, papel_do_usuario(email),
+            secrets.token_urlsafe(32), agora + self.duracao
+        )
+        with self._trava:
+            if agora >= self._proxima_limpeza:
+                self._remover_vencidas(agora)
+            self._sessoes[sessao.token] = sessao
+        return sessao
+
+    def obter(self, token):
+        """Retorna a sessão válida de um token (renovando a validade) ou None"""
+        agora = self.relogio()
+        with self._trava:
+            sessao = self._sessoes.get(token)
+            if sessao is None:
+                return None
+            if sessao.expirada(agora):
+                del self._sessoes[token]
+                return None
+            sessao.expira_em = agora + self.duracao
+            return sessao
+
+    def encerrar(self, token):
+        """Remove uma sessão; retorna False se ela não existia"""
+        with self._trava:
+            return self._sessoes.pop(token, None) is not None
+
+    def encerrar_do_usuario(self, email):
+        """Remove todas as sessões de um usuário (ex.: ao excluí-lo)"""
+        with self._trava:
+            tokens = [token for token, sessao in self._sessoes.items() if sessao.email == email]
+            for token in tokens:
+                del self._sessoes[token]
+        return len(tokens)
+
+    def limpar_expiradas(self):
+        """Remove as sessões vencidas e retorna quantas foram removidas"""
+        agora = self.relogio()
+        with self._trava:
+            return self._remover_vencidas(agora)
+
+    def _remover_vencidas(self, agora):
+        """Remove as sessões vencidas em agora; chamado com a trava adquirida"""
+        vencidas = [token for token, sessao in self._sessoes.items() if sessao.expirada(agora)]
+        for token in vencidas:
+            del self._sessoes[token]
+        self._proxima_limpeza = agora + self.intervalo_limpeza
+        return len(vencidas)
+
+    def __len__(self):
+        with self._trava:
+            return len(self._sessoes)
@@ -0,0 +1,32 @@
+"""
+Fixtures e objetos falsos compartilhados pelos testes
+"""
+import pytest
+import os
+import tempfile
+
+
+class RelogioFalso:
+    """Relógio controlado pelo teste: avança passo a cada leitura (zero por padrão)"""
+    
+    def __init__(self, agora=0.0, passo=0.0):
+        self.agora = agora
+        self.passo = passo
+    
+    def __call__(self):
+        self.agora += self.passo
+        return self.agora
+
+
+@pytest.fixture
+def temp_db():
+    """Cria um banco de dados temporário para os testes"""
+    fd, db_path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    
+    yield db_path
+    
+    # Limpar após o teste (incluindo os arquivos do modo WAL)
+    for caminho in (db_path, db_path + '-wal', db_path + '-shm'):
+        if os.path.exists(caminho):
+            os.unlink(caminho)
@@ -0,0 +1,50 @@
+"""
+Verificação dos planos de consulta usada pelos testes
+"""
+import re
+
+# Linha de plano que percorre uma tabela inteira, sem índice (ex.: "SCAN tarefas")
+# ou por um índice inteiro (ex.: "SCAN tarefas USING COVERING INDEX idx_tarefas_prioridade");
+# SQLite anterior à 3.36 escreve "SCAN TABLE tarefas"
+VARREDURA_COMPLETA = re.compile(r"^SCAN (?:TABLE )?(\w+)(?: USING (?:COVERING )?INDEX (\w+))?$")
+
+# Linha de plano que ordena ou agrupa as linhas numa B-tree temporária
+# (ex.: "USE TEMP B-TREE FOR ORDER BY", "USE TEMP B-TREE FOR GROUP BY")
+ORDENACAO_TEMPORARIA = re.compile(r"^USE TEMP B-TREE FOR (.+)$")
+
+
+def _varreduras(plano):
+    """Retorna (tabela, índice ou None) de cada varredura completa do plano"""
+    return [m.groups() for m in (VARREDURA_COMPLETA.match(linha.strip()) for linha in plano) if m]
+
+
+def varreduras_completas(plano):
+    """Retorna as tabelas percorridas por inteiro nas linhas de um EXPLAIN QUERY PLAN"""
+    return [tabela for tabela, _ in _varreduras(plano)]
+
+
+def ordenacoes_temporarias(plano):
+    """Retorna o uso (ORDER BY, GROUP BY, DISTINCT...) de cada B-tree temporária do plano"""
+    return [m.group(1) for m in (ORDENACAO_TEMPORARIA.match(linha.strip()) for linha in plano) if m]
+
+
+def assert_usa_indices(consultas, permitidas=(), ordenacoes=()):
+    """Falha se alguma consulta registrada percorrer uma tabela inteira ou ordenar fora do índice
+
+    consultas são ConsultaLenta (ex.: de um RegistroConsultasLentas com
+    limite_ms=0); permitidas são as tabelas ou índices que podem ser lidos por
+    inteiro; ordenacoes são trechos do SQL das consultas que podem usar uma
+    B-tree temporária.
+    """
+    problemas = []
+    for consulta in consultas:
+        encontrados = [
+            f"SCAN {tabela}" + (f" USING INDEX {indice}" if indice else "")
+            for tabela, indice in _varreduras(consulta.plano)
+            if tabela not in permitidas and indice not in permitidas
+        ]
+        if not any(trecho in consulta.sql for trecho in ordenacoes):
+            encontrados += [f"TEMP B-TREE FOR {uso}" for uso in ordenacoes_temporarias(consulta.plano)]
+        if encontrados:
+            problemas.append(f"{', '.join(encontrados)}: {consulta.sql} ({'; '.join(consulta.plano)})")
+    assert not problemas, "Consultas sem índice:\n" + "\n".join(problemas)
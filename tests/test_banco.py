@@ -0,0 +1,192 @@
+"""
+Testes unitários para o pool de conexões SQLite
+"""
+import pytest
+import sqlite3
+import os
+import threading
+import sys
+
+# Adicionar o diretório raiz ao path para importar os módulos de src
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from src.banco import (
+    PoolConexoes, PoolEsgotadoError, VARIAVEL_PERFIL, aplicar_modo_journal, obter_perfil, transacao
+)
+
+
+@pytest.fixture
+def pool(temp_db):
+    """Cria um pool de conexões sobre o banco temporário"""
+    pool = PoolConexoes(temp_db, tamanho_maximo=2, tempo_espera=0.2)
+    yield pool
+    pool.fechar()
+
+
+class TestPoolConexoes:
+    """Testes para a classe PoolConexoes"""
+    
+    def test_reutiliza_conexao(self, pool):
+        """Testa que conexões devolvidas são reaproveitadas"""
+        with pool.conexao() as conn1:
+            pass
+        with pool.conexao() as conn2:
+            pass
+        
+        assert conn1 is conn2
+        assert pool.estatisticas()["abertas"] == 1
+    
+    def test_reentrada_mesma_thread(self, pool):
+        """Testa que aquisições aninhadas usam a mesma conexão"""
+        with pool.conexao() as externa:
+            with pool.conexao() as interna:
+                assert interna is externa
+            assert pool.estatisticas()["livres"] == 0
+        
+        assert pool.estatisticas()["livres"] == 1
+    
+    def test_transacao_aninhada_usa_savepoint(self, pool):
+        """Testa que a transação de um empréstimo aninhado não confirma nem desfaz a externa"""
+        with pool.conexao() as conn:
+            conn.execute("CREATE TABLE itens (nome TEXT)")
+            conn.commit()
+            
+            with transacao(conn):
+                conn.execute("INSERT INTO itens VALUES ('externa')")
+                with pool.conexao() as interna:
+                    with transacao(interna):
+                        interna.execute("INSERT INTO itens VALUES ('confirmada')")
+                    with pytest.raises(RuntimeError):
+                        with transacao(interna):
+                            interna.execute("INSERT INTO itens VALUES ('desfeita')")
+                            raise RuntimeError("falha simulada")
+                    assert interna.in_transaction
+            
+            assert not conn.in_transaction
+            nomes = [linha[0] for linha in conn.execute("SELECT nome FROM itens ORDER BY rowid")]
+            assert nomes == ["externa", "confirmada"]
+    
+    def test_threads_recebem_conexoes_distintas(self, pool):
+        """Testa que cada thread é dona da sua conexão"""
+        conexoes = []
+        pronto = threading.Event()
+        liberar = threading.Event()
+        
+        def trabalhador():
+            with pool.conexao() as conn:
+                conexoes.append(conn)
+                pronto.set()
+                liberar.wait(1)
+        
+        thread = threading.Thread(target=trabalhador)
+        thread.start()
+        pronto.wait(1)
+        with pool.conexao() as conn:
+            conexoes.append(conn)
+        liberar.set()
+        thread.join()
+        
+        assert conexoes[0] is not conexoes[1]
+    
+    def test_limite_do_pool(self, temp_db):
+        """Testa que o pool não abre mais conexões que o máximo"""
+        pool = PoolConexoes(temp_db, tamanho_maximo=1, tempo_espera=0.1)
+        pronto = threading.Event()
+        liberar = threading.Event()
+        
+        def trabalhador():
+            with pool.conexao():
+                pronto.set()
+                liberar.wait(1)
+        
+        thread = threading.Thread(target=trabalhador)
+        thread.start()
+        pronto.wait(1)
+        try:
+            with pytest.raises(PoolEsgotadoError):
+                with pool.conexao():
+                    pass
+        finally:
+            liberar.set()
+            thread.join()
+        
+        # Depois de devolvida, a conexão volta a ficar disponível
+        with pool.conexao():
+            assert pool.estatisticas()["abertas"] == 1
+        pool.fechar()
+    
+    def test_transacao_pendente_descartada(self, pool):
+        """Testa que alterações sem commit não vazam para o próximo uso"""
+        with pool.conexao() as conn:
+            conn.execute('CREATE TABLE t (x INTEGER)')
+            conn.commit()
+            conn.execute('INSERT INTO t VALUES (1)')
+        
+        with pool.conexao() as conn:
+            assert conn.execute('SELECT COUNT(*) FROM t').fetchone()[0] == 0
+    
+    def test_verificacao_de_saude(self, temp_db):
+        """Testa que conexões quebradas são substituídas"""
+        pool = PoolConexoes(temp_db, intervalo_verificacao=0)
+        with pool.conexao() as conn:
+            pass
+        conn.close()
+        
+        with pool.conexao() as nova:
+            assert nova is not conn
+            assert nova.execute('SELECT 1').fetchone() == (1,)
+        pool.fechar()
+    
+    def test_fechar(self, pool):
+        """Testa o encerramento do pool"""
+        with pool.conexao() as conn:
+            pass
+        pool.fechar()
+        
+        assert pool.estatisticas()["abertas"] == 0
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute('SELECT 1')
+        with pytest.raises(sqlite3.ProgrammingError):
+            with pool.conexao():
+                pass
+
+
+class TestPerfis:
+    """Testes para os perfis de PRAGMA"""
+    
+    def test_perfil_padrao(self, monkeypatch):
+        """Testa que o perfil balanced é usado por padrão"""
+        monkeypatch.delenv(VARIAVEL_PERFIL, raising=False)
+        nome, perfil = obter_perfil()
+        assert nome == "balanced"
+        assert perfil["synchronous"] == "NORMAL"
+    
+    def test_perfil_por_variavel_de_ambiente(self, monkeypatch):
+        """Testa a escolha do perfil pela variável de ambiente"""
+        monkeypatch.setenv(VARIAVEL_PERFIL, "throughput")
+        assert obter_perfil()[0] == "throughput"
+        # Um nome explícito tem precedência sobre a variável
+        assert obter_perfil("durable")[0] == "durable"
+    
+    def test_perfil_desconhecido(self):
+        """Testa que um perfil inexistente é rejeitado"""
+        with pytest.raises(ValueError):
+            obter_perfil("turbo")
+    
+    @pytest.mark.parametrize("nome, synchronous", [
+        ("durable", 2),
+        ("balanced", 1),
+        ("throughput", 0),
+    ])
+    def test_pragmas_aplicados_em_cada_conexao(self, temp_db, nome, synchronous):
+        """Testa que cada conexão do pool recebe os PRAGMAs do perfil"""
+        pool = PoolConexoes(temp_db, nome)
+        with pool.conexao() as conn:
+            assert aplicar_modo_journal(conn, pool.perfil) == "wal"
+            assert conn.execute("PRAGMA synchronous").fetchone()[0] == synchronous
+            assert conn.execute("PRAGMA cache_size").fetchone()[0] == pool.perfil["cache_size"]
+            assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == pool.perfil["busy_timeout"]
+        pool.fechar()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
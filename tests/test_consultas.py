@@ -0,0 +1,96 @@
+"""
+Testes unitários para a montagem das consultas filtradas de tarefas
+"""
+import pytest
+import os
+import sys
+from datetime import date, datetime
+
+# Adicionar o diretório raiz ao path para importar os módulos de src
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from src.consultas import (
+    FiltroTarefas, compilar_contagem, compilar_filtro, compilar_pagina, expressao_busca,
+    para_epoca, semana_atual
+)
+
+
+class TestConsultas:
+    """Testes da tradução de filtros em SQL parametrizado"""
+    
+    def test_filtro_vazio(self):
+        """Testa que sem filtros a consulta percorre a tabela inteira na ordem do quadro"""
+        sql, parametros = compilar_pagina(FiltroTarefas(), "id, titulo", 10)
+        
+        assert "WHERE" not in sql
+        assert "SELECT tarefas.id, tarefas.titulo FROM tarefas" in sql
+        assert parametros == [10]
+    
+    def test_valores_nunca_entram_no_sql(self):
+        """Testa que todos os valores dos filtros viram parâmetros"""
+        filtro = FiltroTarefas(usuario_email="x'; DROP TABLE tarefas; --", status=("A Fazer", "Concluído"),
+                               prioridade=1, criado_de=100, criado_ate=200)
+        origem, condicoes, parametros = compilar_filtro(filtro)
+        
+        assert origem == "tarefas"
+        assert "DROP" not in " ".join(condicoes)
+        assert "status IN (?, ?)" in condicoes
+        assert parametros == ["x'; DROP TABLE tarefas; --", "A Fazer", "Concluído", 1, 100, 200]
+    
+    def test_texto_parte_do_indice_de_busca(self):
+        """Testa que o filtro de texto junta as tarefas a partir do índice FTS5"""
+        origem, condicoes, parametros = compilar_filtro(FiltroTarefas(texto="relat mens", status="A Fazer"))
+        
+        assert origem.startswith("tarefas_busca CROSS JOIN tarefas")
+        assert parametros == [expressao_busca("relat mens"), "A Fazer"]
+        # Texto sem palavras não encontra nada, em vez de deixar de filtrar
+        assert compilar_filtro(FiltroTarefas(texto=" * ")) == ("tarefas", ["0"], [])
+    
+    def test_continuacao(self):
+        """Testa que a página seguinte parte da última (prioridade, id) em duas faixas do índice"""
+        sql, parametros = compilar_pagina(FiltroTarefas(prioridade=0), "id", 5, apos=(0, 42))
+        
+        assert "(tarefas.prioridade, tarefas.id) <" not in sql
+        assert "tarefas.prioridade = ? AND tarefas.id < ?" in sql
+        assert "UNION ALL" in sql and "tarefas.prioridade < ?" in sql
+        assert parametros == [0, 0, 42, 5, 0, 0, 5, 5]
+    
+    def test_contagem_usa_contadores(self):
+        """Testa que filtros só por dono e status são contados na tabela de contagens"""
+        sql, parametros = compilar_contagem(FiltroTarefas(usuario_email="a@teste.com", status="A Fazer"))
+        assert "contagem_tarefas" in sql
+        assert parametros == ["a@teste.com", "A Fazer"]
+        
+        sql, _ = compilar_contagem(FiltroTarefas(status="A Fazer", prioridade=1))
+        assert sql.startswith("SELECT COUNT(*) FROM tarefas")
+        sql, _ = compilar_contagem(FiltroTarefas(usuario_email="a@teste.com", texto="!!!"))
+        assert sql.startswith("SELECT COUNT(*) FROM tarefas") and "0" in sql.split("WHERE")[1]
+    
+    def test_filtros_invalidos(self):
+        """Testa a validação de status e prioridade"""
+        with pytest.raises(ValueError):
+            compilar_filtro(FiltroTarefas(status="Arquivado"))
+        with pytest.raises(ValueError):
+            compilar_filtro(FiltroTarefas(status=()))
+        with pytest.raises(ValueError):
+            compilar_filtro(FiltroTarefas(prioridade=5))
+        with pytest.raises(ValueError):
+            para_epoca("2024-01-01")
+        with pytest.raises(ValueError):
+            para_epoca(True)
+    
+    def test_datas(self):
+        """Testa a conversão de datas e o intervalo da semana corrente"""
+        assert para_epoca(date(2024, 1, 2)) == int(datetime(2024, 1, 2).timestamp())
+        assert para_epoca(datetime(2024, 1, 2, 10, 0)) == int(datetime(2024, 1, 2, 10, 0).timestamp())
+        # Épocas fracionárias, como as de time.time(), perdem só os milissegundos
+        assert para_epoca(1704200400.75) == 1704200400
+        assert para_epoca(1704200400) == 1704200400
+        
+        # Quarta-feira, 3 de janeiro de 2024: semana de segunda (1) a segunda (8)
+        inicio, fim = semana_atual(datetime(2024, 1, 3, 15, 0).timestamp())
+        assert inicio == para_epoca(date(2024, 1, 1))
+        assert fim == para_epoca(date(2024, 1, 8))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
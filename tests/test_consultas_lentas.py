@@ -0,0 +1,206 @@
+"""
+Testes unitários para o registro de consultas lentas (executam sem display)
+"""
+import pytest
+import sqlite3
+import os
+import threading
+import sys
+
+# Adicionar o diretório raiz ao path para importar os módulos de src
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from src.banco import PoolConexoes
+from src.consultas_lentas import (
+    VARIAVEL_LIMITE_LENTA, ConsultaLenta, RegistroConsultasLentas, formato_parametros, plano_consulta
+)
+from src.repositorio import Repositorio
+from src.senhas import MotorSenhas
+from tests.planos import assert_usa_indices, ordenacoes_temporarias, varreduras_completas
+
+
+@pytest.fixture
+def pool_medido(temp_db):
+    """Cria um pool que registra todas as instruções (limite zero)"""
+    pool = PoolConexoes(temp_db, consultas_lentas=RegistroConsultasLentas(0, maximo=1000))
+    with pool.conexao() as conn:
+        conn.execute("CREATE TABLE itens (id INTEGER PRIMARY KEY, nome TEXT)")
+        conn.executemany("INSERT INTO itens (nome) VALUES (?)", [(f"item {i}",) for i in range(50)])
+        conn.commit()
+    pool.consultas_lentas.limpar()
+    yield pool
+    pool.fechar()
+
+
+class TestConsultasLentas:
+    """Testes da medição das instruções no pool de conexões"""
+    
+    def test_registra_sql_formato_e_plano(self, pool_medido):
+        """Testa que a consulta lenta guarda SQL, tipos dos parâmetros e plano, sem os valores"""
+        with pool_medido.conexao() as conn:
+            linhas = conn.execute("SELECT id FROM itens WHERE nome = ?", ("segredo",)).fetchall()
+        
+        assert linhas == []
+        consulta, = pool_medido.consultas_lentas.consultas()
+        assert consulta.sql == "SELECT id FROM itens WHERE nome = ?"
+        assert consulta.parametros == "(str)"
+        assert "segredo" not in repr(consulta)
+        assert varreduras_completas(consulta.plano) == ["itens"]
+    
+    def test_planos_sem_indice(self):
+        """Testa que varreduras por um índice inteiro e B-trees temporárias são detectadas"""
+        plano = (
+            "SCAN tarefas USING INDEX idx_tarefas_prioridade",
+            "SEARCH usuarios USING INDEX sqlite_autoindex_usuarios_1 (email=?)",
+            "SCAN itens USING COVERING INDEX idx_itens_nome",
+            "SCAN tarefas_busca VIRTUAL TABLE INDEX 0:M2",
+            "SCAN (subquery-1)",
+            "SCAN CONSTANT ROW",
+            "USE TEMP B-TREE FOR ORDER BY",
+        )
+        assert varreduras_completas(plano) == ["tarefas", "itens"]
+        # Formato das versões do SQLite anteriores à 3.36
+        antigo = ("SCAN TABLE tarefas", "SEARCH TABLE usuarios USING INDEX sqlite_autoindex_usuarios_1 (email=?)")
+        assert varreduras_completas(antigo) == ["tarefas"]
+        assert ordenacoes_temporarias(plano) == ["ORDER BY"]
+        
+        consulta = ConsultaLenta("SELECT * FROM tarefas ORDER BY titulo", "()", 1.0, plano[:1] + plano[-1:])
+        with pytest.raises(AssertionError, match="SCAN tarefas USING INDEX"):
+            assert_usa_indices([consulta], ordenacoes=("ORDER BY titulo",))
+        with pytest.raises(AssertionError, match="TEMP B-TREE FOR ORDER BY"):
+            assert_usa_indices([consulta], permitidas=("idx_tarefas_prioridade",))
+        assert_usa_indices([consulta], permitidas=("tarefas",), ordenacoes=("ORDER BY titulo",))
+    
+    def test_instrucao_termina_na_ultima_leitura(self, pool_medido):
+        """Testa que cada instrução é registrada uma vez, ao ser lida até o fim ou abandonada"""
+        with pool_medido.conexao() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT nome FROM itens ORDER BY id")
+            cursor.fetchmany(10)
+            assert pool_medido.consultas_lentas.consultas() == []
+            list(cursor)
+            assert len(pool_medido.consultas_lentas.consultas()) == 1
+            
+            # Lida só a primeira linha e descartada
+            conn.execute("SELECT COUNT(*) FROM itens").fetchone()
+            conn.execute("UPDATE itens SET nome = ? WHERE id = ?", ("novo", 1))
+            conn.commit()
+        
+        sqls = [c.sql.split()[0] for c in pool_medido.consultas_lentas.consultas()]
+        assert sqls == ["SELECT", "SELECT", "UPDATE"]
+    
+    def test_pendentes_concluidas_antes_de_devolver(self, pool_medido, monkeypatch):
+        """Testa que instruções lidas pela metade são concluídas na thread dona, antes de liberar a conexão"""
+        registro = pool_medido.consultas_lentas
+        threads = []
+        avaliar = registro.avaliar
+        
+        def avaliar_na_thread(*args):
+            threads.append(threading.get_ident())
+            avaliar(*args)
+        
+        monkeypatch.setattr(registro, "avaliar", avaliar_na_thread)
+        guardados = []
+        
+        def usar():
+            with pool_medido.conexao() as conn:
+                cursor = conn.execute("SELECT nome FROM itens WHERE id > ?", (0,))
+                cursor.fetchone()
+                guardados.append(cursor)
+                conn.execute("SELECT COUNT(*) FROM itens").fetchone()
+                assert registro.consultas() == []
+        
+        trabalhador = threading.Thread(target=usar)
+        trabalhador.start()
+        trabalhador.join()
+        
+        assert len(registro.consultas()) == 2
+        assert all(consulta.plano for consulta in registro.consultas())
+        assert set(threads) == {trabalhador.ident}
+        # Descartar o cursor depois não mede nem consulta o banco de novo
+        guardados.clear()
+        assert len(registro.consultas()) == 2 and len(threads) == 2
+    
+    def test_limite(self, temp_db):
+        """Testa que instruções abaixo do limite não são registradas e que o padrão não mede nada"""
+        registro = RegistroConsultasLentas(limite_ms=10000)
+        pool = PoolConexoes(temp_db, consultas_lentas=registro)
+        with pool.conexao() as conn:
+            conn.execute("SELECT 1").fetchall()
+        pool.fechar()
+        assert registro.consultas() == []
+        
+        pool = PoolConexoes(temp_db)
+        with pool.conexao() as conn:
+            assert type(conn) is sqlite3.Connection
+        pool.fechar()
+    
+    def test_limite_do_ambiente(self, monkeypatch):
+        """Testa a configuração pela variável de ambiente"""
+        monkeypatch.delenv(VARIAVEL_LIMITE_LENTA, raising=False)
+        assert RegistroConsultasLentas.do_ambiente() is None
+        monkeypatch.setenv(VARIAVEL_LIMITE_LENTA, "250")
+        assert RegistroConsultasLentas.do_ambiente().limite_ms == 250
+        monkeypatch.setenv(VARIAVEL_LIMITE_LENTA, "lento")
+        with pytest.raises(ValueError):
+            RegistroConsultasLentas.do_ambiente()
+    
+    def test_formato_e_plano(self):
+        """Testa a descrição dos parâmetros e o plano de instruções sem consulta"""
+        assert formato_parametros(("a", 1, None)) == "(str, int, NoneType)"
+        assert formato_parametros({"email": "a"}) == "{email: str}"
+        conn = sqlite3.connect(":memory:")
+        assert plano_consulta(conn, "PRAGMA user_version") == ()
+        conn.close()
+    
+    def test_consultas_do_repositorio_usam_indices(self, temp_db):
+        """Testa que as consultas da aplicação não percorrem tabelas inteiras num banco semeado"""
+        registro = RegistroConsultasLentas(0, maximo=10000)
+        repositorio = Repositorio(temp_db, motor_senhas=MotorSenhas(parametros={"n": 2 ** 8, "r": 8, "p": 1}, processos=0),
+                                  consultas_lentas=registro)
+        try:
+            repositorio.init_database()
+            repositorio.cadastrar_usuario("Dono", "dono@teste.com", "senha123")
+            ids, _ = repositorio.adicionar_tarefas_em_lote(
+                [(f"u{i % 7}@teste.com", f"Tarefa {i}", "Descrição", "A Fazer", i % 2) for i in range(300)]
+            )
+            registro.limpar()
+            
+            repositorio.verificar_usuario("dono@teste.com", "senha123")
+            repositorio.usuario_existe("dono@teste.com")
+            repositorio.listar_usuarios()
+            repositorio.contar_tarefas_por_usuario()
+            repositorio.listar_tarefas("u1@teste.com")
+            repositorio.listar_tarefas()
+            _, continuacao = repositorio.listar_tarefas_pagina("u1@teste.com", limite=10)
+            repositorio.listar_tarefas_pagina("u1@teste.com", limite=10, continuacao=continuacao)
+            _, continuacao = repositorio.listar_tarefas_pagina(limite=10)
+            repositorio.listar_tarefas_pagina(limite=10, continuacao=continuacao)
+            repositorio.listar_tarefas_status("u1@teste.com", "A Fazer", 10, 10)
+            repositorio.carregar_quadro("u1@teste.com", limite=5)
+            repositorio.buscar_tarefas("tarefa", "u1@teste.com")
+            repositorio.consultar_tarefas(status="A Fazer", prioridade=1, limite=10)
+            repositorio.consultar_tarefas(usuario_email="u2@teste.com", texto="tarefa", limite=10)
+            repositorio.obter_prioridade_tarefa(ids[0])
+            repositorio.atualizar_prioridade_tarefa(ids[0], 1, usuario_email="u0@teste.com")
+            repositorio.atualizar_status_tarefa(ids[1], "Concluído", "u1@teste.com")
+            repositorio.atualizar_status_tarefa(ids[1], "Concluído", "outro@teste.com")
+            repositorio.atualizar_status_tarefas(ids[:5], "Em Progresso")
+            repositorio.excluir_tarefa(ids[2], "u2@teste.com")
+            repositorio.excluir_usuario("dono@teste.com")
+            
+            consultas = registro.consultas()
+            assert len(consultas) > 20
+            # Listar todos os usuários e todas as contagens é, por definição, ler a tabela
+            # inteira; a listagem do admin percorre todas as tarefas na ordem do índice
+            # de prioridade. Ordenam fora do índice só a busca textual (as linhas vêm do
+            # FTS) e as duas faixas da continuação, limitadas ao tamanho da página.
+            assert_usa_indices(
+                consultas, permitidas=("usuarios", "contagem_tarefas", "idx_tarefas_prioridade"),
+                ordenacoes=("FROM usuarios ORDER BY", "MATCH ?", "UNION ALL")
+            )
+        finally:
+            repositorio.fechar()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
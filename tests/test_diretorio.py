@@ -0,0 +1,57 @@
+"""
+Testes unitários para o cache de usuários
+"""
+import pytest
+import os
+import sys
+
+# Adicionar o diretório raiz ao path para importar os módulos de src
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from src.diretorio import DiretorioUsuarios
+
+
+class TestDiretorioUsuarios:
+    """Testes para a classe DiretorioUsuarios"""
+    
+    def test_nao_carregado(self):
+        """Testa que o cache vazio pede a consulta ao banco"""
+        diretorio = DiretorioUsuarios()
+        
+        assert diretorio.listar() is None
+        assert diretorio.nome("a@teste.com", "a@teste.com") == "a@teste.com"
+        # Alterações antes da carga são ignoradas: a carga trará o estado do banco
+        diretorio.adicionar((1, "Ana", "a@teste.com"))
+        assert diretorio.listar() is None
+    
+    def test_consultas(self):
+        """Testa as consultas por email e id e a lista ordenada"""
+        diretorio = DiretorioUsuarios()
+        diretorio.carregar([(2, "Bruno", "b@teste.com"), (1, "Ana", "a@teste.com")])
+        
+        assert diretorio.listar() == [(1, "Ana", "a@teste.com"), (2, "Bruno", "b@teste.com")]
+        assert diretorio.por_email("b@teste.com") == (2, "Bruno", "b@teste.com")
+        assert diretorio.por_id(1) == (1, "Ana", "a@teste.com")
+        assert diretorio.nome("b@teste.com") == "Bruno"
+        assert diretorio.por_email("x@teste.com") is None
+    
+    def test_adicionar_e_remover(self):
+        """Testa que cadastros e exclusões mantêm a ordem por nome"""
+        diretorio = DiretorioUsuarios()
+        diretorio.carregar([(i, f"Usuário {i:05d}", f"u{i}@teste.com") for i in range(0, 50000, 2)])
+        
+        diretorio.adicionar((7, "Usuário 00007", "u7@teste.com"))
+        diretorio.remover("u4@teste.com")
+        
+        nomes = [u[1] for u in diretorio.listar()]
+        assert nomes == sorted(nomes)
+        assert nomes[:4] == ["Usuário 00000", "Usuário 00002", "Usuário 00006", "Usuário 00007"]
+        assert diretorio.por_email("u4@teste.com") is None
+        assert diretorio.por_id(7)[2] == "u7@teste.com"
+        assert len(diretorio) == 25000
+        
+        diretorio.invalidar()
+        assert diretorio.listar() is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,122 @@
+"""
+Testes unitários para o executor de operações do banco em segundo plano
+"""
+import pytest
+import os
+import tempfile
+import threading
+import time
+import sys
+
+# Adicionar o diretório raiz ao path para importar os módulos de src
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from src.executor import ExecutorBanco
+from src.repositorio import Repositorio
+
+
+class RaizFalsa:
+    """Substituto do tk.Tk que acumula os callbacks agendados com after"""
+    
+    def __init__(self):
+        self.agendados = []
+    
+    def after(self, ms, funcao):
+        self.agendados.append(funcao)
+    
+    def processar_eventos(self, condicao, limite=2.0):
+        """Executa os callbacks agendados até a condição ser satisfeita"""
+        prazo = time.monotonic() + limite
+        while not condicao() and time.monotonic() < prazo:
+            agendados, self.agendados = self.agendados, []
+            for funcao in agendados:
+                funcao()
+            time.sleep(0.005)
+        return condicao()
+
+
+@pytest.fixture
+def repositorio():
+    """Cria um repositório sobre um banco temporário"""
+    fd, db_path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    repositorio = Repositorio(db_path)
+    repositorio.init_database()
+    
+    yield repositorio
+    
+    repositorio.fechar()
+    for caminho in (db_path, db_path + '-wal', db_path + '-shm'):
+        if os.path.exists(caminho):
+            os.unlink(caminho)
+
+
+@pytest.fixture
+def raiz():
+    """Cria a raiz falsa do Tk"""
+    return RaizFalsa()
+
+
+class TestExecutorBanco:
+    """Testes para a classe ExecutorBanco"""
+    
+    def test_entrega_resultado_na_thread_principal(self, raiz, repositorio):
+        """Testa que o callback recebe o resultado na thread que processa os eventos"""
+        executor = ExecutorBanco(raiz, repositorio.pool)
+        recebidos = []
+        
+        executor.submeter(
+            repositorio.listar_usuarios,
+            ao_concluir=lambda r: recebidos.append((r, threading.current_thread()))
+        )
+        
+        assert raiz.processar_eventos(lambda: recebidos)
+        usuarios, thread = recebidos[0]
+        assert [u[2] for u in usuarios] == ["admin"]
+        assert thread is threading.main_thread()
+        assert executor.pendentes == 0
+        executor.encerrar()
+    
+    def test_entrega_erro(self, raiz):
+        """Testa que exceções chegam ao callback de falha"""
+        executor = ExecutorBanco(raiz)
+        erros = []
+        
+        def falhar():
+            raise ValueError("falhou")
+        
+        executor.submeter(falhar, ao_concluir=lambda r: None, ao_falhar=erros.append)
+        
+        assert raiz.processar_eventos(lambda: erros)
+        assert isinstance(erros[0], ValueError)
+        executor.encerrar()
+    
+    def test_thread_reutiliza_sua_conexao(self, raiz, repositorio):
+        """Testa que a thread de trabalho usa sempre a mesma conexão do pool"""
+        executor = ExecutorBanco(raiz, repositorio.pool)
+        resultados = []
+        
+        for i in range(20):
+            executor.submeter(
+                repositorio.adicionar_tarefa, "a@teste.com", f"Tarefa {i}", "",
+                ao_concluir=resultados.append
+            )
+        
+        assert raiz.processar_eventos(lambda: len(resultados) == 20)
+        assert all(sucesso for sucesso, _ in resultados)
+        assert repositorio.pool.estatisticas()["abertas"] == 1
+        
+        executor.encerrar()
+        # Ao encerrar, a conexão volta para o pool
+        assert repositorio.pool.estatisticas()["livres"] == 1
+    
+    def test_encerrar(self, raiz):
+        """Testa que não é possível submeter após encerrar"""
+        executor = ExecutorBanco(raiz, trabalhadores=2)
+        executor.encerrar()
+        
+        with pytest.raises(RuntimeError):
+            executor.submeter(lambda: None)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
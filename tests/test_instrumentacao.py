@@ -0,0 +1,125 @@
+"""
+Testes unitários para a medição das operações de dados (executam sem display)
+"""
+import pytest
+import gc
+import os
+import tempfile
+import sys
+import weakref
+
+# Adicionar o diretório raiz ao path para importar os módulos de src
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from src.instrumentacao import Instrumentacao, contar_linhas
+from src.repositorio import Repositorio
+from src.senhas import MotorSenhas
+from tests.conftest import RelogioFalso
+
+
+@pytest.fixture
+def repositorio_medido():
+    """Cria um repositório instrumentado com um banco temporário"""
+    fd, db_path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    instrumentacao = Instrumentacao()
+    repositorio = Repositorio(db_path, motor_senhas=MotorSenhas(parametros={"n": 2 ** 8, "r": 8, "p": 1}, processos=0),
+                              instrumentacao=instrumentacao)
+    repositorio.init_database()
+    
+    yield repositorio, instrumentacao
+    
+    repositorio.fechar()
+    for caminho in (db_path, db_path + '-wal', db_path + '-shm'):
+        if os.path.exists(caminho):
+            os.unlink(caminho)
+
+
+class TestInstrumentacao:
+    """Testes da coleta e exportação das métricas"""
+    
+    def test_histograma_e_contadores(self):
+        """Testa faixas, chamadas, linhas, erros e falhas de uma função medida"""
+        instrumentacao = Instrumentacao(limites=(0.01, 0.1), relogio=RelogioFalso(passo=0.05))
+        listar = instrumentacao.medir("listar", lambda: [1, 2, 3])
+        mudar = instrumentacao.medir("mudar", lambda: (False, "Tarefa não encontrada!"))
+        
+        def quebrar():
+            raise RuntimeError("falha")
+        quebrar = instrumentacao.medir("quebrar", quebrar)
+        
+        listar()
+        listar()
+        mudar()
+        with pytest.raises(RuntimeError):
+            quebrar()
+        
+        resumo = instrumentacao.resumo()
+        assert resumo["listar"]["chamadas"] == 2
+        assert resumo["listar"]["linhas"] == 6
+        assert resumo["listar"]["faixas"] == {0.01: 0, 0.1: 2, float("inf"): 0}
+        assert resumo["listar"]["media_ms"] == pytest.approx(50)
+        assert resumo["mudar"]["falhas"] == 1
+        assert resumo["quebrar"]["erros"] == 1
+    
+    def test_contar_linhas(self):
+        """Testa a contagem de linhas nos formatos de retorno do repositório"""
+        assert contar_linhas([(1,), (2,)]) == 2
+        assert contar_linhas((True, [(1,)])) == 1
+        assert contar_linhas(([(1,), (2,)], "token")) == 2
+        assert contar_linhas(({"A Fazer": 3}, None)) == 0
+        assert contar_linhas(None) == 0
+    
+    def test_repositorio_instrumentado(self, repositorio_medido):
+        """Testa que os métodos do repositório (e as chamadas internas) são medidos"""
+        repositorio, instrumentacao = repositorio_medido
+        repositorio.adicionar_tarefa("a@teste.com", "Tarefa", "")
+        repositorio.carregar_quadro("a@teste.com")
+        repositorio.excluir_tarefa(999)
+        
+        resumo = instrumentacao.resumo()
+        assert resumo["init_database"]["chamadas"] == 1
+        assert resumo["carregar_quadro"]["linhas"] == 1
+        assert resumo["listar_tarefas"]["chamadas"] == 1
+        assert resumo["excluir_tarefa"]["falhas"] == 1
+        
+        instrumentacao.remover(repositorio)
+        repositorio.listar_tarefas("a@teste.com")
+        assert instrumentacao.resumo()["listar_tarefas"]["chamadas"] == 1
+    
+    def test_nao_prende_objetos_instrumentados(self, tmp_path):
+        """Testa que um repositório instrumentado e descartado pode ser coletado"""
+        temp_db = str(tmp_path / "medido.db")
+        instrumentacao = Instrumentacao()
+        repositorio = Repositorio(temp_db, motor_senhas=MotorSenhas(processos=0), instrumentacao=instrumentacao)
+        repositorio.fechar()
+        referencia = weakref.ref(repositorio)
+        
+        del repositorio
+        gc.collect()
+        assert referencia() is None
+        
+        # Um objeto novo (mesmo que reaproveite o id do anterior) é instrumentado de novo
+        novo = Repositorio(temp_db, motor_senhas=MotorSenhas(processos=0), instrumentacao=instrumentacao)
+        assert "listar_tarefas" in vars(novo)
+        novo.fechar()
+    
+    def test_exportar_prometheus(self, tmp_path):
+        """Testa o texto de exposição do Prometheus e a gravação do arquivo"""
+        instrumentacao = Instrumentacao(limites=(0.01, 0.1), relogio=RelogioFalso(passo=0.005))
+        instrumentacao.medir("listar_tarefas", lambda: [1])()
+        
+        texto = instrumentacao.exportar_prometheus()
+        assert "# TYPE tarefas_db_duracao_segundos histogram" in texto
+        assert 'tarefas_db_duracao_segundos_bucket{metodo="listar_tarefas",le="0.01"} 1' in texto
+        assert 'tarefas_db_duracao_segundos_bucket{metodo="listar_tarefas",le="+Inf"} 1' in texto
+        assert 'tarefas_db_duracao_segundos_count{metodo="listar_tarefas"} 1' in texto
+        assert 'tarefas_db_linhas_total{metodo="listar_tarefas"} 1' in texto
+        
+        caminho = tmp_path / "metricas.prom"
+        instrumentacao.gravar_prometheus(str(caminho))
+        assert caminho.read_text(encoding="utf-8") == texto
+        assert os.listdir(tmp_path) == ["metricas.prom"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
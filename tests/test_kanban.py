@@ -0,0 +1,303 @@
+"""
+Testes unitários para o modelo em memória do quadro Kanban
+"""
+import pytest
+import os
+import random
+import sys
+
+# Adicionar o diretório raiz ao path para importar os módulos de src
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from src.kanban import COLUNAS_KANBAN, INSERIR, JanelaVirtual, ModeloKanban, Tarefa, formatar_tarefa
+
+
+def tarefa(tarefa_id, status="A Fazer", prioridade=0, titulo=None):
+    """Monta uma linha de tarefa como a retornada por listar_tarefas"""
+    return (tarefa_id, titulo or f"Tarefa {tarefa_id}", "Desc", status, prioridade, "2024-01-02 10:00:00",
+            1704189600)
+
+
+class ListasFalsas:
+    """Simula as listboxes aplicando as operações do modelo"""
+    
+    def __init__(self):
+        self.colunas = {coluna: [] for coluna in COLUNAS_KANBAN}
+    
+    def aplicar(self, operacoes):
+        for operacao in operacoes:
+            if operacao[0] == INSERIR:
+                self.colunas[operacao[1]].insert(operacao[2], operacao[3])
+            else:
+                del self.colunas[operacao[1]][operacao[2]]
+
+
+def esperado(tarefas):
+    """Calcula o conteúdo de cada coluna como o carregamento completo faria"""
+    colunas = {coluna: [] for coluna in COLUNAS_KANBAN}
+    for t in sorted(tarefas, key=lambda t: (-t[4], -t[0])):
+        colunas[t[3]].append(t)
+    return colunas
+
+
+class TestModeloKanban:
+    """Testes para a classe ModeloKanban"""
+    
+    def test_carga_inicial(self):
+        """Testa que a primeira carga insere todas as tarefas em ordem"""
+        tarefas = [tarefa(1), tarefa(2, prioridade=1), tarefa(3, "Concluído")]
+        modelo, listas = ModeloKanban(), ListasFalsas()
+        
+        listas.aplicar(modelo.substituir(tarefas))
+        
+        assert listas.colunas == esperado(tarefas)
+        assert modelo.posicao(2) == ("A Fazer", 0)
+    
+    def test_recarga_sem_mudancas(self):
+        """Testa que recarregar os mesmos dados não gera operações"""
+        tarefas = [tarefa(i) for i in range(1, 50)]
+        modelo = ModeloKanban()
+        modelo.substituir(tarefas)
+        
+        assert modelo.substituir(list(reversed(tarefas))) == []
+    
+    def test_mover_toca_duas_linhas(self):
+        """Testa que mover uma tarefa num quadro grande gera só duas operações"""
+        tarefas = [tarefa(i, random.choice(COLUNAS_KANBAN)) for i in range(1, 5001)]
+        modelo, listas = ModeloKanban(), ListasFalsas()
+        listas.aplicar(modelo.substituir(tarefas))
+        
+        movida = tarefa(2500, "Concluído" if tarefas[2499][3] != "Concluído" else "A Fazer")
+        operacoes = modelo.atualizar(movida)
+        listas.aplicar(operacoes)
+        
+        assert len(operacoes) == 2
+        tarefas[2499] = movida
+        assert listas.colunas == esperado(tarefas)
+    
+    def test_atualizar_varias(self):
+        """Testa que mover várias tarefas de uma vez mantém o quadro consistente"""
+        tarefas = [tarefa(i, "Em Progresso") for i in range(1, 301)]
+        modelo, listas = ModeloKanban(), ListasFalsas()
+        listas.aplicar(modelo.substituir(tarefas))
+        
+        movidas = [tarefa(i, "Concluído") for i in range(1, 301, 2)]
+        listas.aplicar(modelo.atualizar_varias(movidas))
+        
+        for movida in movidas:
+            tarefas[movida[0] - 1] = movida
+        assert listas.colunas == esperado(tarefas)
+    
+    def test_registros_alinhados_com_listbox(self):
+        """Testa que cada linha exibida é lida do modelo sem interpretar o texto"""
+        tarefas = [tarefa(1), tarefa(2, prioridade=1, titulo="Urgente"), tarefa(3, "Concluído")]
+        modelo = ModeloKanban()
+        modelo.substituir(tarefas)
+        
+        registro = modelo.tarefa_em("A Fazer", 0)
+        assert isinstance(registro, Tarefa)
+        assert (registro.id, registro.titulo, registro.prioridade) == (2, "Urgente", 1)
+        assert modelo.tarefa_em("A Fazer", 1).id == 1
+        assert modelo.tarefa_em("A Fazer", 2) is None
+        
+        modelo.atualizar(tarefa(1, prioridade=1))
+        assert [modelo.tarefa_em("A Fazer", i).id for i in range(2)] == [2, 1]
+        assert modelo.tarefa_em("A Fazer", 1).prioridade == 1
+    
+    def test_priorizar_reposiciona(self):
+        """Testa que priorizar leva a tarefa para o topo da coluna"""
+        tarefas = [tarefa(i) for i in range(1, 6)]
+        modelo, listas = ModeloKanban(), ListasFalsas()
+        listas.aplicar(modelo.substituir(tarefas))
+        
+        listas.aplicar(modelo.atualizar(tarefa(2, prioridade=1)))
+        
+        assert [t[0] for t in listas.colunas["A Fazer"]] == [2, 5, 4, 3, 1]
+    
+    def test_inserir_e_remover(self):
+        """Testa a criação e a exclusão de tarefas"""
+        modelo, listas = ModeloKanban(), ListasFalsas()
+        listas.aplicar(modelo.substituir([tarefa(1), tarefa(3)]))
+        
+        listas.aplicar(modelo.atualizar(tarefa(2)))
+        assert [t[0] for t in listas.colunas["A Fazer"]] == [3, 2, 1]
+        
+        listas.aplicar(modelo.remover(3))
+        assert [t[0] for t in listas.colunas["A Fazer"]] == [2, 1]
+        assert modelo.remover(99) == []
+        assert len(modelo) == 2
+    
+    def test_recarga_com_diferencas(self):
+        """Testa que a recarga com dados alterados converge para o estado do banco"""
+        aleatorio = random.Random(42)
+        tarefas = {i: tarefa(i, aleatorio.choice(COLUNAS_KANBAN)) for i in range(1, 300)}
+        modelo, listas = ModeloKanban(), ListasFalsas()
+        listas.aplicar(modelo.substituir(tarefas.values()))
+        
+        for i in aleatorio.sample(sorted(tarefas), 30):
+            del tarefas[i]
+        for i in aleatorio.sample(sorted(tarefas), 30):
+            tarefas[i] = tarefa(i, aleatorio.choice(COLUNAS_KANBAN), aleatorio.randint(0, 1), "Editada")
+        for i in range(300, 320):
+            tarefas[i] = tarefa(i)
+        
+        operacoes = modelo.substituir(tarefas.values())
+        listas.aplicar(operacoes)
+        
+        assert listas.colunas == esperado(tarefas.values())
+        assert len(operacoes) < len(tarefas)
+    
+    def test_formatar_tarefa(self):
+        """Testa o texto exibido de uma tarefa prioritária"""
+        texto, cores = formatar_tarefa(tarefa(7, prioridade=1))
+        
+        assert texto.startswith("🔴 [7] Tarefa 7")
+        assert "02/01/2024" in texto
+        assert cores["fg"] == "#cc0000"
+    
+    def test_formatar_tarefa_memorizada(self):
+        """Testa que a formatação é feita uma vez por versão da tarefa"""
+        linha = tarefa(8)
+        primeira = formatar_tarefa(linha)
+        
+        assert formatar_tarefa(Tarefa(*linha)) is primeira
+        alterada = formatar_tarefa(tarefa(8, titulo="Outro título"))
+        assert alterada is not primeira
+        assert "Outro título" in alterada[0]
+    
+    def test_formatar_tarefa_sem_criado_em(self):
+        """Testa a data de linhas antigas, sem a coluna criado_em"""
+        texto, _ = formatar_tarefa(tarefa(9)[:6])
+        assert "02/01/2024" in texto
+
+
+
+class TestJanelaVirtual:
+    """Testes para a classe JanelaVirtual"""
+    
+    def test_barra_de_rolagem_pelo_total(self):
+        """Testa que as frações da scrollbar usam o total de linhas da coluna"""
+        janela = JanelaVirtual(tamanho_pagina=100)
+        janela.definir_visiveis(20)
+        janela.definir_total(10000)
+        
+        assert janela.fracoes() == (0.0, 20 / 10000)
+        janela.rolar("moveto", "0.5")
+        assert janela.intervalo() == (5000, 5020)
+        assert janela.fracoes() == (0.5, 5020 / 10000)
+    
+    def test_limites_da_rolagem(self):
+        """Testa que a janela não passa do início nem do fim da coluna"""
+        janela = JanelaVirtual()
+        janela.definir_visiveis(10)
+        janela.definir_total(25)
+        
+        janela.rolar("scroll", "-5", "units")
+        assert janela.inicio == 0
+        janela.rolar("scroll", "2", "pages")
+        assert janela.intervalo() == (15, 25)
+        janela.rolar("moveto", "1.0")
+        assert janela.intervalo() == (15, 25)
+    
+    def test_carrega_apenas_paginas_proximas(self):
+        """Testa que só as páginas em torno da área visível são pedidas"""
+        janela = JanelaVirtual(tamanho_pagina=100, margem=50)
+        janela.definir_visiveis(20)
+        janela.definir_total(100000)
+        janela.rolar("moveto", "0.5")
+        
+        assert janela.paginas_faltando() == [499, 500]
+        # Páginas já pedidas não são pedidas de novo
+        assert janela.paginas_faltando() == []
+    
+    def test_linhas_visiveis(self):
+        """Testa a montagem das linhas visíveis a partir das páginas recebidas"""
+        janela = JanelaVirtual(tamanho_pagina=10, margem=0)
+        janela.definir_visiveis(5)
+        janela.definir_total(30)
+        janela.rolar("scroll", "8", "units")
+        
+        assert janela.linhas() == [None] * 5
+        assert janela.paginas_faltando() == [0, 1]
+        assert janela.receber(0, [tarefa(i) for i in range(10)], janela.versao)
+        
+        linhas = janela.linhas()
+        assert [t[0] for t in linhas[:2]] == [8, 9]
+        assert linhas[2:] == [None] * 3
+        assert janela.linha(1).id == 9
+        assert janela.linha(2) is None
+        assert janela.linha(5) is None
+    
+    def test_descarta_pagina_obsoleta(self):
+        """Testa que páginas pedidas antes de uma invalidação são ignoradas"""
+        janela = JanelaVirtual(tamanho_pagina=10)
+        janela.definir_total(30)
+        versao = janela.versao
+        janela.invalidar()
+        
+        assert janela.receber(0, [tarefa(1)], versao) is False
+        assert janela.linhas()[0] is None
+    
+    def test_cache_limitado(self):
+        """Testa que o número de páginas guardadas é limitado"""
+        janela = JanelaVirtual(tamanho_pagina=10, max_paginas=3)
+        janela.definir_total(1000)
+        for pagina in range(10):
+            janela.receber(pagina, [tarefa(pagina * 10 + i) for i in range(10)], janela.versao)
+        
+        assert len(janela._paginas) == 3
+    
+    def coluna_carregada(self):
+        """Coluna de 30 tarefas (ids 60, 58, ..., 2) com as páginas 0 e 2 carregadas"""
+        janela = JanelaVirtual(tamanho_pagina=10, margem=0)
+        janela.definir_visiveis(10)
+        janela.definir_total(30)
+        ids = list(range(60, 0, -2))
+        for pagina in (0, 2):
+            janela.receber(pagina, [tarefa(i) for i in ids[pagina * 10:pagina * 10 + 10]], janela.versao)
+        return janela
+    
+    def test_remover_desloca_linhas_carregadas(self):
+        """Testa que a remoção sobe as linhas seguintes sem descartar as páginas"""
+        janela = self.coluna_carregada()
+        versao = janela.versao
+        
+        assert janela.remover(54) is True
+        
+        assert janela.total == 29
+        assert janela.versao != versao
+        assert [t.id for t in janela.linhas()[:9]] == [60, 58, 56, 52, 50, 48, 46, 44, 42]
+        # A linha que subiu da página 1 nunca foi carregada
+        assert janela.linhas()[9] is None
+        assert janela.paginas_faltando() == [0]
+        janela.posicionar(20)
+        assert [t.id for t in janela.linhas()] == [20, 18, 16, 14, 12, 10, 8, 6, 4, 2]
+        # A primeira linha visível passou para a página 1, que só tem ela carregada
+        assert janela.paginas_faltando() == [1]
+        # Fora das páginas carregadas a posição é desconhecida
+        assert janela.remover(30) is False
+        assert janela.total == 29
+    
+    def test_inserir_na_ordem_do_quadro(self):
+        """Testa que a inserção desloca as linhas seguintes e só fixa a tarefa entre vizinhas carregadas"""
+        janela = self.coluna_carregada()
+        
+        janela.inserir(tarefa(43))
+        assert janela.total == 31
+        assert [t.id for t in janela.linhas()] == [60, 58, 56, 54, 52, 50, 48, 46, 44, 43]
+        assert janela.paginas_faltando() == []
+        
+        # Entre páginas não carregadas: as seguintes descem, a posição fica para o banco
+        janela.inserir(tarefa(31))
+        janela.posicionar(22)
+        assert [t.id for t in janela.linhas()[:9]] == [20, 18, 16, 14, 12, 10, 8, 6, 4]
+        assert janela.total == 32
+        
+        # Prioritária vai para o topo
+        janela.posicionar(0)
+        janela.inserir(tarefa(7, prioridade=1))
+        assert janela.linha(0).id == 7
+        assert janela.linha(1).id == 60
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
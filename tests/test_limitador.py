@@ -0,0 +1,96 @@
+"""
+Testes unitários para o limite de tentativas de login
+"""
+import pytest
+import os
+import sys
+
+# Adicionar o diretório raiz ao path para importar os módulos de src
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from src.limitador import LimiteTentativasError, LimitadorLogin
+from tests.conftest import RelogioFalso
+
+
+class TestLimitadorLogin:
+    """Testes para a classe LimitadorLogin"""
+    
+    def test_balde_da_conta(self):
+        """Testa que a conta esgota os tokens e os recupera com o tempo"""
+        relogio = RelogioFalso()
+        limitador = LimitadorLogin(capacidade_conta=3, taxa_conta=1.0, relogio=relogio)
+        
+        for _ in range(3):
+            limitador.permitir("a@teste.com")
+        with pytest.raises(LimiteTentativasError) as erro:
+            limitador.permitir("a@teste.com")
+        assert erro.value.motivo == "conta"
+        assert erro.value.espera == pytest.approx(1.0)
+        
+        # Outras contas não são afetadas
+        limitador.permitir("b@teste.com")
+        relogio.agora += 1
+        limitador.permitir("a@teste.com")
+    
+    def test_balde_da_origem(self):
+        """Testa que uma origem que varre várias contas é limitada"""
+        limitador = LimitadorLogin(capacidade_origem=5, taxa_origem=0.1, relogio=RelogioFalso())
+        
+        for i in range(5):
+            limitador.permitir(f"conta{i}@teste.com", "10.0.0.1")
+        with pytest.raises(LimiteTentativasError) as erro:
+            limitador.permitir("conta9@teste.com", "10.0.0.1")
+        assert erro.value.motivo == "origem"
+        limitador.permitir("conta9@teste.com", "10.0.0.2")
+    
+    def test_bloqueio_exponencial(self):
+        """Testa que falhas seguidas bloqueiam a conta por tempos crescentes"""
+        relogio = RelogioFalso()
+        limitador = LimitadorLogin(capacidade_conta=100, falhas_livres=2, espera_base=1.0,
+                                   espera_maxima=10.0, relogio=relogio)
+        
+        esperas = []
+        for _ in range(6):
+            limitador.permitir("a@teste.com")
+            limitador.registrar_falha("a@teste.com")
+            try:
+                limitador.permitir("a@teste.com")
+                esperas.append(0)
+            except LimiteTentativasError as erro:
+                esperas.append(erro.espera)
+                assert erro.motivo == "bloqueio"
+            relogio.agora += 100
+        
+        assert esperas == [0, 1.0, 2.0, 4.0, 8.0, 10.0]
+        
+        limitador.registrar_sucesso("a@teste.com")
+        limitador.registrar_falha("a@teste.com")
+        limitador.permitir("a@teste.com")
+    
+    def test_muitas_falhas_nao_estouram(self):
+        """Testa que milhares de falhas seguidas mantêm a conta bloqueada pela espera máxima"""
+        relogio = RelogioFalso()
+        limitador = LimitadorLogin(falhas_livres=2, espera_base=1.0, espera_maxima=900.0, relogio=relogio)
+        
+        for _ in range(5000):
+            limitador.registrar_falha("a@teste.com")
+        with pytest.raises(LimiteTentativasError) as erro:
+            limitador.permitir("a@teste.com")
+        assert erro.value.motivo == "bloqueio"
+        assert erro.value.espera == pytest.approx(900.0)
+    
+    def test_memoria_limitada(self):
+        """Testa que os baldes ociosos há mais tempo são descartados"""
+        limitador = LimitadorLogin(max_baldes=100, relogio=RelogioFalso())
+        
+        for i in range(1000):
+            limitador.permitir(f"conta{i}@teste.com", f"origem{i}")
+        
+        contadores = limitador.contadores()
+        assert contadores["baldes_conta"] == 100
+        assert contadores["baldes_origem"] == 100
+        assert contadores["baldes_descartados"] == 1800
+        assert contadores["tentativas"] == contadores["permitidas"] == 1000
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -4,7 +4,6 @@ Testes unitários para o sistema de login e gerenciamento de tarefas
 import pytest
 import sqlite3
 import os
-import tempfile
 import tkinter as tk
 from datetime import datetime
 import sys
@@ -12,20 +11,7 @@ import sys
 # Adicionar o diretório raiz ao path para importar o módulo login de src
 sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
 from src.login import App
-
-
-@pytest.fixture
-def temp_db():
-    """Cria um banco de dados temporário para os testes"""
-    # Criar arquivo temporário
-    fd, db_path = tempfile.mkstemp(suffix='.db')
-    os.close(fd)
-    
-    yield db_path
-    
-    # Limpar após o teste
-    if os.path.exists(db_path):
-        os.unlink(db_path)
+from src.monitor_ui import MonitorUI
 
 
 @pytest.fixture
@@ -47,6 +33,7 @@ def app_instance(temp_db, mock_root):
     app.db_file = temp_db
     app.init_database()
     yield app
+    app.fechar()
 
 
 class TestApp:
@@ -136,6 +123,33 @@ class TestApp:
         usuarios = app_instance.listar_usuarios()
         assert len(usuarios) >= 3  # Admin + 2 novos usuários
     
+    def test_listar_usuarios_com_contagens(self, app_instance):
+        """Testa a lista de usuários com as quantidades de tarefas por coluna"""
+        app_instance.cadastrar_usuario("Ana Silva", "ana@teste.com", "senha123")
+        app_instance.adicionar_tarefa("ana@teste.com", "Tarefa 1", "")
+        app_instance.adicionar_tarefa("ana@teste.com", "Tarefa 2", "", status="Concluído")
+        
+        linhas = {linha[2]: linha for linha in app_instance.listar_usuarios_com_contagens()}
+        assert linhas["ana@teste.com"][3:] == (1, 0, 1)
+        assert linhas["admin"][3:] == (0, 0, 0)
+    
+    def test_monitor_ui_mede_handlers(self, temp_db, mock_root):
+        """Testa que o monitor da interface mede os métodos da tela e o botão de atualizar"""
+        monitor = MonitorUI(mock_root, limite_ms=1000, vigia=False)
+        app = App(mock_root, monitor_ui=monitor)
+        try:
+            app.db_file = temp_db
+            app.init_database()
+            tela = app.pagina_inicial_frame
+            assert "carregar_kanban" in vars(tela)
+            
+            tela.carregar_kanban()
+            mock_root.update()
+            assert app.metricas_ui()["carregar_kanban"]["chamadas"] == 1
+        finally:
+            monitor.parar()
+            app.fechar()
+    
     def test_excluir_usuario(self, app_instance):
         """Testa a exclusão de usuário"""
         # Cadastrar usuário
@@ -351,6 +365,42 @@ class TestApp:
         tarefas = app_instance.listar_tarefas("tarefas@teste.com")
         assert len(tarefas) == 0
 
+    
+    def test_indices_tarefas(self, app_instance):
+        """Testa que as consultas do quadro usam índices e não ordenam em memória"""
+        conn = sqlite3.connect(app_instance.db_file)
+        cursor = conn.cursor()
+        
+        consultas = [
+            ('''SELECT id, titulo, descricao, status, prioridade, data_criacao FROM tarefas
+                WHERE usuario_email = ? ORDER BY prioridade DESC, id DESC''', ("a@teste.com",)),
+            ('''SELECT id FROM tarefas WHERE usuario_email = ? AND status = ?
+                ORDER BY prioridade DESC, id DESC''', ("a@teste.com", "A Fazer")),
+            ('DELETE FROM tarefas WHERE usuario_email = ?', ("a@teste.com",)),
+        ]
+        for sql, parametros in consultas:
+            cursor.execute("EXPLAIN QUERY PLAN " + sql, parametros)
+            plano = " ".join(linha[3] for linha in cursor.fetchall())
+            assert "USING" in plano and "INDEX" in plano
+            assert "TEMP B-TREE" not in plano
+        
+        conn.close()
+    
+    def test_init_database_idempotente(self, app_instance):
+        """Testa que inicializar o banco novamente não duplica índices nem o admin"""
+        conn = sqlite3.connect(app_instance.db_file)
+        cursor = conn.cursor()
+        consulta_indices = "SELECT name FROM sqlite_master WHERE type='index' AND name LIKE 'idx_%' ORDER BY name"
+        indices = cursor.execute(consulta_indices).fetchall()
+        assert ("idx_tarefas_usuario_prioridade",) in indices
+        
+        app_instance.init_database()
+        
+        assert cursor.execute(consulta_indices).fetchall() == indices
+        cursor.execute("SELECT COUNT(*) FROM usuarios WHERE email = 'admin'")
+        assert cursor.fetchone()[0] == 1
+        conn.close()
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
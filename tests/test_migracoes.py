@@ -0,0 +1,153 @@
+"""
+Testes unitários para as migrações versionadas do esquema (executam sem display)
+"""
+import pytest
+import sqlite3
+import os
+import tempfile
+import sys
+
+# Adicionar o diretório raiz ao path para importar os módulos de src
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from src.migracoes import (
+    MIGRACOES, VERSAO_ESQUEMA, ContextoMigracao, Migracao, migrar, versao_atual
+)
+from src.senhas import MotorSenhas
+from src.repositorio import Repositorio
+
+PARAMETROS_RAPIDOS = {"n": 2 ** 8, "r": 8, "p": 1}
+
+
+def hash_rapido(senha):
+    return MotorSenhas(parametros=PARAMETROS_RAPIDOS, processos=0).gerar_hash(senha)
+
+
+@pytest.fixture
+def conn():
+    """Cria uma conexão com um banco temporário vazio"""
+    fd, db_path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    conexao = sqlite3.connect(db_path)
+    
+    yield conexao
+    
+    conexao.close()
+    os.unlink(db_path)
+
+
+def criar_banco_legado(conn, quantidade):
+    """Cria o esquema anterior às colunas prioridade, data_criacao e criado_em"""
+    conn.execute('''
+        CREATE TABLE usuarios (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nome TEXT NOT NULL,
+            email TEXT UNIQUE NOT NULL,
+            senha TEXT NOT NULL
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE tarefas (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            usuario_email TEXT NOT NULL,
+            titulo TEXT NOT NULL,
+            descricao TEXT,
+            status TEXT NOT NULL
+        )
+    ''')
+    conn.executemany(
+        "INSERT INTO tarefas (usuario_email, titulo, status) VALUES ('a@teste.com', ?, 'A Fazer')",
+        [(f"Tarefa {i}",) for i in range(quantidade)]
+    )
+    conn.commit()
+
+
+class TestMigracoes:
+    """Testes do controle de versão do esquema"""
+    
+    def test_banco_novo_chega_na_ultima_versao(self, conn):
+        """Testa que um banco vazio recebe todas as migrações em ordem"""
+        aplicadas = migrar(conn, ContextoMigracao(gerar_hash=hash_rapido))
+        
+        assert aplicadas == [m.versao for m in MIGRACOES]
+        assert versao_atual(conn) == VERSAO_ESQUEMA
+        colunas = [col[1] for col in conn.execute("PRAGMA table_info(tarefas)")]
+        assert "criado_em" in colunas
+        assert conn.execute("SELECT COUNT(*) FROM usuarios WHERE email = 'admin'").fetchone()[0] == 1
+    
+    def test_banco_atualizado_le_apenas_user_version(self, conn):
+        """Testa que abrir um banco atualizado executa uma única instrução"""
+        migrar(conn, ContextoMigracao(gerar_hash=hash_rapido))
+        instrucoes = []
+        conn.set_trace_callback(instrucoes.append)
+        
+        assert migrar(conn) == []
+        assert instrucoes == ['PRAGMA user_version']
+    
+    def test_banco_legado_preenche_em_blocos(self, conn):
+        """Testa a migração de um banco antigo com progresso por bloco"""
+        criar_banco_legado(conn, 25)
+        progresso = []
+        contexto = ContextoMigracao(
+            lambda descricao, feitos, total: progresso.append((descricao, feitos, total)),
+            gerar_hash=hash_rapido, tamanho_bloco=10
+        )
+        
+        migrar(conn, contexto)
+        
+        assert conn.execute("SELECT COUNT(*) FROM tarefas WHERE criado_em IS NULL").fetchone()[0] == 0
+        criado_em = [p[1:] for p in progresso if p[0] == "Preenchendo criado_em"]
+        assert criado_em == [(10, 25), (20, 25), (25, 25)]
+        # Tarefas anteriores à busca textual também são indexadas
+        encontradas = conn.execute("SELECT COUNT(*) FROM tarefas_busca WHERE tarefas_busca MATCH 'tarefa'")
+        assert encontradas.fetchone()[0] == 25
+        contagens = conn.execute("SELECT usuario_email, status, quantidade FROM contagem_tarefas").fetchall()
+        assert contagens == [("a@teste.com", "A Fazer", 25)]
+    
+    def test_sinal_de_lote_suspende_gatilhos(self, conn):
+        """Testa que os gatilhos de busca e contagem ignoram as inserções feitas com o sinal de lote"""
+        migrar(conn, ContextoMigracao(gerar_hash=hash_rapido))
+        inserir = ("INSERT INTO tarefas (usuario_email, titulo, status, data_criacao) "
+                   "VALUES ('a@teste.com', ?, 'A Fazer', '2024-01-01 10:00:00')")
+        buscar = "SELECT COUNT(*) FROM tarefas_busca WHERE tarefas_busca MATCH ?"
+        
+        conn.execute("INSERT INTO insercao_em_lote (ativa) VALUES (1)")
+        conn.execute(inserir, ("Suspensa",))
+        conn.execute("DELETE FROM insercao_em_lote")
+        conn.execute(inserir, ("Indexada",))
+        conn.commit()
+        
+        assert conn.execute(buscar, ("suspensa",)).fetchone()[0] == 0
+        assert conn.execute(buscar, ("indexada",)).fetchone()[0] == 1
+        assert conn.execute("SELECT quantidade FROM contagem_tarefas").fetchall() == [(1,)]
+    
+    def test_falha_preserva_versao_anterior(self, conn):
+        """Testa que uma migração com erro não avança a versão e pode ser refeita"""
+        def quebrar(conn, contexto):
+            conn.execute("CREATE TABLE temporaria (x)")
+            raise RuntimeError("falha simulada")
+        
+        migracoes = MIGRACOES + (Migracao(VERSAO_ESQUEMA + 1, "Quebrada", quebrar),)
+        with pytest.raises(RuntimeError):
+            migrar(conn, ContextoMigracao(gerar_hash=hash_rapido), migracoes)
+        
+        assert versao_atual(conn) == VERSAO_ESQUEMA
+        tabelas = [t[0] for t in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")]
+        assert "temporaria" not in tabelas
+    
+    def test_repositorio_retorna_versoes(self):
+        """Testa que o repositório retorna as versões aplicadas ao inicializar o banco"""
+        fd, db_path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        repositorio = Repositorio(db_path, motor_senhas=MotorSenhas(parametros=PARAMETROS_RAPIDOS, processos=0))
+        try:
+            assert repositorio.init_database() == list(range(1, VERSAO_ESQUEMA + 1))
+            assert repositorio.init_database() == []
+        finally:
+            repositorio.fechar()
+            for caminho in (db_path, db_path + '-wal', db_path + '-shm'):
+                if os.path.exists(caminho):
+                    os.unlink(caminho)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,200 @@
+"""
+Testes unitários para o detector de travamentos da interface (executam sem display)
+"""
+import pytest
+import logging
+import os
+import time
+import tkinter
+import sys
+
+# Adicionar o diretório raiz ao path para importar os módulos de src
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from src.monitor_ui import (
+    ATRASO_LACO, VARIAVEL_LIMITE_UI, CallWrapperMedido, MonitorUI, nome_callback, pilha_da_thread
+)
+from tests.conftest import RelogioFalso
+
+
+class RaizFalsa:
+    """Substitui o root do Tk: guarda os callbacks agendados com after"""
+
+    def __init__(self):
+        self.agendados = {}
+        self.proximo_id = 0
+
+    def after(self, ms, funcao):
+        self.proximo_id += 1
+        self.agendados[self.proximo_id] = funcao
+        return self.proximo_id
+
+    def after_cancel(self, identificador):
+        self.agendados.pop(identificador, None)
+
+    def executar_agendados(self):
+        agendados, self.agendados = self.agendados, {}
+        for funcao in agendados.values():
+            funcao()
+
+
+class Tela:
+    """Tela com um handler e um botão em lambda, como as do login.py"""
+
+    def __init__(self, relogio, duracao):
+        self.relogio = relogio
+        self.duracao = duracao
+        self.comando = lambda: self.mover_tarefa("A Fazer", "Em Progresso")
+
+    def mover_tarefa(self, origem, destino):
+        self.relogio.agora += self.duracao
+
+
+@pytest.fixture
+def monitor_falso():
+    """Cria um monitor com relógio e root falsos, sem a thread vigia"""
+    relogio = RelogioFalso()
+    raiz = RaizFalsa()
+    monitor = MonitorUI(raiz, limite_ms=100, intervalo_ms=50, vigia=False, relogio=relogio)
+    monitor.iniciar()
+
+    yield monitor, raiz, relogio
+
+    monitor.parar()
+
+
+class TestMonitorUI:
+    """Testes dos batimentos, da medição dos handlers e da amostra de pilha"""
+
+    def test_batimento_mede_atraso_do_laco(self, monitor_falso):
+        """Testa que o batimento registra quanto o laço atrasou e acusa o travamento"""
+        monitor, raiz, relogio = monitor_falso
+        relogio.agora = 0.05
+        raiz.executar_agendados()
+        relogio.agora += 0.05 + 0.3
+        raiz.executar_agendados()
+
+        resumo = monitor.resumo()[ATRASO_LACO]
+        assert resumo["chamadas"] == 2
+        assert resumo["segundos"] == pytest.approx(0.3)
+        travamento, = monitor.travamentos()
+        assert travamento.handler == ATRASO_LACO
+        assert travamento.duracao_ms == pytest.approx(300)
+        assert travamento.pilha is None
+
+    def test_callwrapper_mede_handler(self, monitor_falso):
+        """Testa que os callbacks registrados no Tk passam a ser medidos pelo nome do método"""
+        monitor, raiz, relogio = monitor_falso
+        tela = Tela(relogio, 0.25)
+        assert tkinter.CallWrapper is CallWrapperMedido
+
+        tkinter.CallWrapper(tela.comando, None, None)()
+        tkinter.CallWrapper(Tela(relogio, 0.01).comando, None, None)()
+
+        resumo = monitor.resumo()["Tela.<lambda>:mover_tarefa"]
+        assert resumo["chamadas"] == 2
+        travamento, = monitor.travamentos()
+        assert travamento.handler == "Tela.<lambda>:mover_tarefa"
+        assert travamento.duracao_ms == pytest.approx(250)
+
+    def test_metodos_instrumentados_nao_somam_aos_handlers(self, monitor_falso):
+        """Testa que o método medido pelo nome fica em métricas à parte das do handler que o chama"""
+        monitor, raiz, relogio = monitor_falso
+        tela = Tela(relogio, 0.02)
+        monitor.instrumentar(tela, ("mover_tarefa",))
+
+        tkinter.CallWrapper(tela.comando, None, None)()
+
+        assert list(monitor.resumo()) == ["Tela.<lambda>:mover_tarefa"]
+        assert monitor.resumo_metodos()["mover_tarefa"]["chamadas"] == 1
+        texto = monitor.exportar_prometheus()
+        assert 'tarefas_ui_metodos_duracao_segundos_count{metodo="mover_tarefa"} 1' in texto
+        assert 'tarefas_ui_duracao_segundos_count{metodo="mover_tarefa"}' not in texto
+
+    def test_handler_lento_nao_duplica_no_batimento(self, monitor_falso):
+        """Testa que o atraso causado por um handler já registrado não vira outro travamento"""
+        monitor, raiz, relogio = monitor_falso
+        tkinter.CallWrapper(Tela(relogio, 0.5).comando, None, None)()
+        raiz.executar_agendados()
+
+        assert [t.handler for t in monitor.travamentos()] == ["Tela.<lambda>:mover_tarefa"]
+        assert monitor.resumo()[ATRASO_LACO]["chamadas"] == 1
+
+    def test_batimento_nao_e_medido_como_handler(self, monitor_falso):
+        """Testa que o callback do próprio monitor fica fora dos handlers"""
+        monitor, raiz, relogio = monitor_falso
+        wrapper = tkinter.CallWrapper(monitor._batimento, None, None)
+        assert wrapper.nome is None
+
+    def test_parar_restaura_callwrapper(self):
+        """Testa que parar devolve o CallWrapper original e cancela o batimento"""
+        original = tkinter.CallWrapper
+        raiz = RaizFalsa()
+        monitor = MonitorUI(raiz, vigia=False)
+        monitor.iniciar()
+        monitor.parar()
+
+        assert tkinter.CallWrapper is original
+        assert raiz.agendados == {}
+        assert CallWrapperMedido.monitor is None
+
+    def test_nome_callback(self):
+        """Testa os nomes de métodos, lambdas e funções agendadas com after"""
+        tela = Tela(RelogioFalso(), 0)
+
+        def envolver(func):
+            # Mesmo formato do callit de tkinter.Misc.after
+            def callit():
+                func()
+            return callit
+
+        assert nome_callback(tela.mover_tarefa) == "Tela.mover_tarefa"
+        assert nome_callback(tela.comando) == "Tela.<lambda>:mover_tarefa"
+        assert nome_callback(envolver(tela.mover_tarefa)) == "Tela.mover_tarefa"
+        assert nome_callback(len) == "len"
+
+    def test_vigia_colhe_pilha_do_handler(self, caplog):
+        """Testa que a vigia colhe a pilha da thread do Tk durante um handler lento"""
+        monitor = MonitorUI(RaizFalsa(), limite_ms=30, intervalo_ms=10)
+
+        def handler_lento():
+            time.sleep(0.3)
+
+        monitor.iniciar()
+        try:
+            with caplog.at_level(logging.WARNING, logger="src.monitor_ui"):
+                monitor.medir("handler_lento", handler_lento)()
+        finally:
+            monitor.parar()
+
+        travamento, = monitor.travamentos()
+        assert travamento.handler == "handler_lento"
+        assert travamento.duracao_ms >= 300
+        assert "in handler_lento" in travamento.pilha
+        assert "handler_lento" in caplog.text and "time.sleep" in caplog.text
+
+    def test_pilha_da_thread(self):
+        """Testa a pilha da própria thread e de uma thread inexistente"""
+        import threading
+        assert "test_pilha_da_thread" in pilha_da_thread(threading.get_ident())
+        assert pilha_da_thread(-1) is None
+
+    def test_exportar_prometheus(self, monitor_falso):
+        """Testa que as métricas da interface saem com prefixo próprio"""
+        monitor, raiz, relogio = monitor_falso
+        monitor.registrar_handler("Tela.mover_tarefa", 0.02)
+
+        texto = monitor.exportar_prometheus()
+        assert 'tarefas_ui_duracao_segundos_bucket{metodo="Tela.mover_tarefa",le="0.033"} 1' in texto
+        assert "tarefas_db" not in texto
+
+    def test_do_ambiente(self, monkeypatch):
+        """Testa a criação do monitor pela variável de ambiente"""
+        monkeypatch.delenv(VARIAVEL_LIMITE_UI, raising=False)
+        assert MonitorUI.do_ambiente(RaizFalsa()) is None
+
+        monkeypatch.setenv(VARIAVEL_LIMITE_UI, "250")
+        assert MonitorUI.do_ambiente(RaizFalsa()).limite_ms == 250
+
+        monkeypatch.setenv(VARIAVEL_LIMITE_UI, "rápido")
+        with pytest.raises(ValueError):
+            MonitorUI.do_ambiente(RaizFalsa())
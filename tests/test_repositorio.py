@@ -0,0 +1,679 @@
+"""
+Testes unitários para a camada de persistência (executam sem display)
+"""
+import pytest
+import sqlite3
+import os
+import subprocess
+import threading
+import sys
+from datetime import datetime
+
+# Adicionar o diretório raiz ao path para importar os módulos de src
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, RAIZ)
+from src.limitador import LimiteTentativasError, LimitadorLogin
+from src.consultas import FiltroTarefas, compilar_pagina
+from src.consultas_lentas import plano_consulta
+from src.repositorio import COLUNAS_TAREFA, Repositorio, decodificar_continuacao, expressao_busca
+from src import senhas
+from src.senhas import MotorSenhas, ler_hash
+from tests.planos import varreduras_completas
+
+# Custo baixo e sem processos extras para manter os testes rápidos
+PARAMETROS_RAPIDOS = {"n": 2 ** 8, "r": 8, "p": 1}
+
+
+@pytest.fixture
+def repositorio(temp_db):
+    """Cria um repositório com o banco temporário já inicializado"""
+    repositorio = Repositorio(temp_db, motor_senhas=MotorSenhas(parametros=PARAMETROS_RAPIDOS, processos=0))
+    repositorio.init_database()
+    yield repositorio
+    repositorio.fechar()
+
+
+class TestRepositorio:
+    """Testes para a classe Repositorio"""
+    
+    def test_importa_sem_tkinter(self):
+        """Testa que o módulo de persistência não carrega o tkinter"""
+        codigo = "import sys, src.repositorio; sys.exit('tkinter' in sys.modules)"
+        resultado = subprocess.run([sys.executable, "-c", codigo], cwd=RAIZ)
+        assert resultado.returncode == 0
+    
+    def test_init_database(self, repositorio, temp_db):
+        """Testa a criação das tabelas e do admin"""
+        conn = sqlite3.connect(temp_db)
+        cursor = conn.cursor()
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name IN ('usuarios', 'tarefas')")
+        assert len(cursor.fetchall()) == 2
+        cursor.execute("SELECT email FROM usuarios WHERE email = 'admin'")
+        assert cursor.fetchone() is not None
+        conn.close()
+    
+    def test_cadastrar_retorna_usuario(self, repositorio):
+        """Testa que o cadastro devolve a linha criada quando solicitado"""
+        usuario = repositorio.cadastrar_usuario("Gil", "gil@teste.com", "x", retornar_usuario=True)
+        
+        assert usuario[1:] == ("Gil", "gil@teste.com")
+        assert usuario in repositorio.listar_usuarios()
+        assert repositorio.cadastrar_usuario("Gil", "gil@teste.com", "x", retornar_usuario=True) is None
+    
+    def test_criado_em_preenchido(self, temp_db):
+        """Testa que criado_em é gravado na inserção e preenchido em bancos antigos"""
+        conn = sqlite3.connect(temp_db)
+        conn.execute('''
+            CREATE TABLE tarefas (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, usuario_email TEXT NOT NULL,
+                titulo TEXT NOT NULL, descricao TEXT, status TEXT NOT NULL,
+                prioridade INTEGER DEFAULT 0, data_criacao TEXT NOT NULL
+            )
+        ''')
+        conn.execute("INSERT INTO tarefas (usuario_email, titulo, status, data_criacao) "
+                     "VALUES ('h@teste.com', 'Antiga', 'A Fazer', '2024-01-02 10:00:00')")
+        conn.commit()
+        conn.close()
+        
+        repositorio = Repositorio(temp_db, motor_senhas=MotorSenhas(parametros=PARAMETROS_RAPIDOS, processos=0))
+        try:
+            repositorio.init_database()
+            _, nova = repositorio.adicionar_tarefa("h@teste.com", "Nova", "", retornar_tarefa=True)
+            antiga = repositorio.listar_tarefas("h@teste.com")[-1]
+        finally:
+            repositorio.fechar()
+        
+        esperado = int(datetime.strptime("2024-01-02 10:00:00", "%Y-%m-%d %H:%M:%S").timestamp())
+        assert antiga[6] == esperado
+        assert nova[6] == int(datetime.strptime(nova[5], "%Y-%m-%d %H:%M:%S").timestamp())
+    
+    def test_usuarios(self, repositorio):
+        """Testa cadastro, verificação e exclusão de usuários"""
+        assert repositorio.cadastrar_usuario("Ana", "ana@teste.com", "senha123") is True
+        assert repositorio.cadastrar_usuario("Ana", "ana@teste.com", "outra") is False
+        assert repositorio.usuario_existe("ana@teste.com") is True
+        
+        assert repositorio.verificar_usuario("ana@teste.com", "senha123")[:2] == ("Ana", "ana@teste.com")
+        assert repositorio.verificar_usuario("ana@teste.com", "errada") is None
+        
+        emails = [u[2] for u in repositorio.listar_usuarios()]
+        assert emails == ["admin", "ana@teste.com"]
+        
+        sucesso, _ = repositorio.excluir_usuario("ana@teste.com")
+        assert sucesso is True
+        assert repositorio.usuario_existe("ana@teste.com") is False
+    
+    def test_senhas_guardadas_como_hash(self, repositorio, temp_db):
+        """Testa que as senhas não são guardadas em texto puro"""
+        assert repositorio.cadastrar_usuario("Caio", "caio@teste.com", "segredo") is True
+        
+        conn = sqlite3.connect(temp_db)
+        armazenadas = dict(conn.execute('SELECT email, senha FROM usuarios').fetchall())
+        conn.close()
+        
+        assert "segredo" not in armazenadas["caio@teste.com"]
+        assert ler_hash(armazenadas["caio@teste.com"])[0] == "scrypt"
+        assert ler_hash(armazenadas["admin"]) is not None
+        assert repositorio.verificar_usuario("caio@teste.com", "segredo") == ("Caio", "caio@teste.com")
+        assert repositorio.verificar_usuario("caio@teste.com", "errada") is None
+    
+    def test_rehash_no_login(self, repositorio, temp_db):
+        """Testa que senhas em texto puro ou com custo antigo são refeitas no login"""
+        conn = sqlite3.connect(temp_db)
+        conn.execute("INSERT INTO usuarios (nome, email, senha) VALUES ('Antigo', 'antigo@teste.com', 'legado')")
+        conn.commit()
+        
+        assert repositorio.verificar_usuario("antigo@teste.com", "legado") == ("Antigo", "antigo@teste.com")
+        armazenada = conn.execute("SELECT senha FROM usuarios WHERE email = 'antigo@teste.com'").fetchone()[0]
+        assert ler_hash(armazenada)[1] == PARAMETROS_RAPIDOS
+        
+        # Aumentar o custo: o próximo login troca o hash pelo do novo parâmetro
+        novo_custo = {"n": 2 ** 9, "r": 8, "p": 1}
+        repositorio.senhas.parametros = novo_custo
+        assert repositorio.verificar_usuario("antigo@teste.com", "legado") is not None
+        armazenada = conn.execute("SELECT senha FROM usuarios WHERE email = 'antigo@teste.com'").fetchone()[0]
+        conn.close()
+        assert ler_hash(armazenada)[1] == novo_custo
+    
+    def test_texto_puro_parecido_com_hash(self, repositorio, temp_db):
+        """Testa que uma senha antiga com formato de hash malformado ainda permite o login"""
+        conn = sqlite3.connect(temp_db)
+        conn.execute("INSERT INTO usuarios (nome, email, senha) VALUES ('Cifrão', 'cifrao@teste.com', ?)",
+                     ("scrypt$abc$def$ghi",))
+        conn.commit()
+        
+        assert repositorio.verificar_usuario("cifrao@teste.com", "errada") is None
+        assert repositorio.verificar_usuario("cifrao@teste.com", "scrypt$abc$def$ghi") is not None
+        armazenada = conn.execute("SELECT senha FROM usuarios WHERE email = 'cifrao@teste.com'").fetchone()[0]
+        conn.close()
+        assert ler_hash(armazenada)[1] == PARAMETROS_RAPIDOS
+    
+    def test_email_inexistente_paga_o_kdf(self, repositorio, monkeypatch):
+        """Testa que o login de um email inexistente calcula o KDF com os parâmetros atuais"""
+        repositorio.cadastrar_usuario("Eva", "eva@teste.com", "segredo")
+        calculados = []
+        derivar = senhas._derivar
+        
+        def derivar_contando(senha, sal, algoritmo, parametros):
+            calculados.append(parametros)
+            return derivar(senha, sal, algoritmo, parametros)
+        
+        monkeypatch.setattr(senhas, "_derivar", derivar_contando)
+        assert repositorio.verificar_usuario("ninguem@teste.com", "segredo") is None
+        assert repositorio.verificar_usuario("eva@teste.com", "errada") is None
+        
+        assert calculados == [PARAMETROS_RAPIDOS, PARAMETROS_RAPIDOS]
+    
+    def test_sessao_autenticada(self, repositorio):
+        """Testa a abertura, retomada e encerramento de uma sessão"""
+        repositorio.cadastrar_usuario("Dora", "dora@teste.com", "segredo")
+        
+        assert repositorio.autenticar("dora@teste.com", "errada") is None
+        sessao = repositorio.autenticar("dora@teste.com", "segredo")
+        assert sessao.email == "dora@teste.com"
+        assert sessao.usuario_id > 0
+        assert sessao.eh_admin is False
+        assert repositorio.autenticar("admin", "admin").eh_admin is True
+        
+        # Retomar pelo token não recalcula o hash
+        repositorio.senhas.verificar = None
+        assert repositorio.retomar_sessao(sessao.token) is sessao
+        assert repositorio.retomar_sessao("token-invalido") is None
+        
+        assert repositorio.encerrar_sessao(sessao.token) is True
+        assert repositorio.retomar_sessao(sessao.token) is None
+    
+    def test_excluir_usuario_encerra_sessoes(self, repositorio):
+        """Testa que excluir um usuário invalida as sessões dele"""
+        repositorio.cadastrar_usuario("Edu", "edu@teste.com", "segredo")
+        sessao = repositorio.autenticar("edu@teste.com", "segredo")
+        
+        repositorio.excluir_usuario("edu@teste.com")
+        
+        assert repositorio.retomar_sessao(sessao.token) is None
+    
+    def test_login_limitado_antes_do_banco(self, repositorio):
+        """Testa que tentativas recusadas não consultam o banco nem calculam hash"""
+        repositorio.limitador = LimitadorLogin(capacidade_conta=2, taxa_conta=1e-6)
+        repositorio.cadastrar_usuario("Fabi", "fabi@teste.com", "segredo")
+        assert repositorio.verificar_usuario("fabi@teste.com", "errada") is None
+        assert repositorio.verificar_usuario("fabi@teste.com", "segredo") is not None
+        
+        instrucoes = []
+        repositorio.senhas.verificar = None
+        with repositorio.conexao() as conn:
+            conn.set_trace_callback(instrucoes.append)
+            try:
+                with pytest.raises(LimiteTentativasError):
+                    repositorio.autenticar("fabi@teste.com", "segredo")
+            finally:
+                conn.set_trace_callback(None)
+        
+        assert instrucoes == []
+        contadores = repositorio.contadores_login()
+        assert contadores["permitidas"] == 2
+        assert contadores["rejeitadas_conta"] == 1
+        assert contadores["falhas"] == 1
+    
+    def test_tarefas(self, repositorio):
+        """Testa o ciclo de vida de uma tarefa"""
+        repositorio.cadastrar_usuario("Bia", "bia@teste.com", "senha123")
+        sucesso, tarefa_id = repositorio.adicionar_tarefa("bia@teste.com", "Tarefa", "Desc")
+        assert sucesso is True
+        
+        assert repositorio.atualizar_prioridade_tarefa(tarefa_id, 1) is True
+        assert repositorio.obter_prioridade_tarefa(tarefa_id) == 1
+        
+        sucesso, _ = repositorio.atualizar_status_tarefa(tarefa_id, "Concluído", "bia@teste.com")
+        assert sucesso is True
+        sucesso, mensagem = repositorio.atualizar_status_tarefa(tarefa_id, "A Fazer", "outro@teste.com")
+        assert sucesso is False
+        assert "permissão" in mensagem.lower()
+        
+        tarefa = repositorio.listar_tarefas("bia@teste.com")[0]
+        assert tarefa[0] == tarefa_id
+        assert tarefa[3] == "Concluído"
+        
+        sucesso, _ = repositorio.excluir_tarefa(tarefa_id, "bia@teste.com")
+        assert sucesso is True
+        assert repositorio.listar_tarefas("bia@teste.com") == []
+    
+    def test_listar_tarefas_ordenacao(self, repositorio):
+        """Testa que as prioritárias vêm primeiro e, depois, as mais recentes"""
+        _, t1 = repositorio.adicionar_tarefa("c@teste.com", "T1", "", "A Fazer", 0)
+        _, t2 = repositorio.adicionar_tarefa("c@teste.com", "T2", "", "A Fazer", 1)
+        _, t3 = repositorio.adicionar_tarefa("c@teste.com", "T3", "", "A Fazer", 0)
+        
+        ids = [t[0] for t in repositorio.listar_tarefas("c@teste.com")]
+        assert ids == [t2, t3, t1]
+    
+    def test_mutacoes_retornam_tarefa(self, repositorio):
+        """Testa que as mutações devolvem a linha afetada quando solicitado"""
+        sucesso, criada = repositorio.adicionar_tarefa("d@teste.com", "Nova", "Desc", retornar_tarefa=True)
+        assert sucesso is True
+        assert criada[1:5] == ("Nova", "Desc", "A Fazer", 0)
+        
+        alterada = repositorio.atualizar_prioridade_tarefa(criada[0], 1, retornar_tarefa=True)
+        assert alterada[4] == 1
+        
+        sucesso, movida = repositorio.atualizar_status_tarefa(
+            criada[0], "Em Progresso", "d@teste.com", retornar_tarefa=True
+        )
+        assert sucesso is True
+        assert movida == (criada[0], "Nova", "Desc", "Em Progresso", 1, criada[5], criada[6])
+        
+        assert repositorio.atualizar_prioridade_tarefa(999, 1, retornar_tarefa=True) is None
+        assert repositorio.definir_prioridade_tarefa(999, 1, retornar_tarefa=True) == (False, "Tarefa não encontrada!")
+    
+    def test_propriedade_verificada_na_escrita(self, repositorio):
+        """Testa que as mutações distinguem tarefa inexistente de tarefa alheia"""
+        _, tarefa_id = repositorio.adicionar_tarefa("dono@teste.com", "Minha", "")
+        
+        sucesso, mensagem = repositorio.atualizar_status_tarefa(tarefa_id, "Concluído", "outro@teste.com")
+        assert sucesso is False and "permissão" in mensagem
+        sucesso, mensagem = repositorio.atualizar_status_tarefa(999, "Concluído", "outro@teste.com")
+        assert sucesso is False and "não encontrada" in mensagem
+        
+        sucesso, mensagem = repositorio.excluir_tarefa(tarefa_id, "outro@teste.com")
+        assert sucesso is False and "permissão" in mensagem
+        sucesso, mensagem = repositorio.excluir_tarefa(999, "outro@teste.com")
+        assert sucesso is False and "não encontrada" in mensagem
+        
+        sucesso, mensagem = repositorio.definir_prioridade_tarefa(tarefa_id, 1, "outro@teste.com")
+        assert sucesso is False and "permissão" in mensagem
+        sucesso, mensagem = repositorio.definir_prioridade_tarefa(999, 1, "outro@teste.com")
+        assert sucesso is False and "não encontrada" in mensagem
+        # Admin (sem filtro de dono) não recebe sucesso para uma tarefa inexistente
+        sucesso, mensagem = repositorio.definir_prioridade_tarefa(999, 1, "admin")
+        assert sucesso is False and "não encontrada" in mensagem
+        assert repositorio.atualizar_prioridade_tarefa(tarefa_id, 1, "outro@teste.com") is False
+        assert repositorio.listar_tarefas("dono@teste.com")[0][3:5] == ("A Fazer", 0)
+        assert repositorio.atualizar_prioridade_tarefa(tarefa_id, 1, "dono@teste.com") is True
+        assert repositorio.listar_tarefas("dono@teste.com")[0][3:5] == ("A Fazer", 1)
+    
+    @pytest.mark.parametrize("metodo,valor,usuario_email,esperado,status_prioridade", [
+        ("atualizar_status_tarefa", "Em Progresso", "dono@teste.com", True, ("Em Progresso", 0)),
+        ("atualizar_status_tarefa", "Em Progresso", "outro@teste.com", False, ("A Fazer", 0)),
+        ("definir_prioridade_tarefa", 1, "dono@teste.com", True, ("A Fazer", 1)),
+        ("definir_prioridade_tarefa", 1, "outro@teste.com", False, ("A Fazer", 0)),
+    ])
+    def test_mutacao_usa_uma_instrucao(self, repositorio, metodo, valor, usuario_email, esperado,
+                                       status_prioridade):
+        """Testa que uma mutação executa só a instrução de escrita, com sucesso ou sem permissão"""
+        _, tarefa_id = repositorio.adicionar_tarefa("dono@teste.com", "Minha", "")
+        instrucoes = []
+        with repositorio.conexao() as conn:
+            conn.set_trace_callback(instrucoes.append)
+            try:
+                sucesso, _ = getattr(repositorio, metodo)(tarefa_id, valor, usuario_email)
+            finally:
+                conn.set_trace_callback(None)
+        
+        # Os gatilhos da instrução aparecem no trace repetindo o texto dela
+        consultas = [i.split()[0] for i in dict.fromkeys(instrucoes)
+                     if i.split()[0] not in ("BEGIN", "COMMIT", "ROLLBACK")]
+        assert sucesso is esperado
+        assert consultas == ["UPDATE"]
+        assert repositorio.listar_tarefas("dono@teste.com")[0][3:5] == status_prioridade
+    
+    def test_contagens_mantidas_por_gatilhos(self, repositorio):
+        """Testa que a tabela de contagens acompanha inserções, mudanças e exclusões"""
+        ids, _ = repositorio.adicionar_tarefas_em_lote(
+            [("g@teste.com", f"T{i}", "") for i in range(5)] + [("h@teste.com", "Outra", "")]
+        )
+        repositorio.atualizar_status_tarefas(ids[:2], "Em Progresso", "g@teste.com")
+        repositorio.atualizar_prioridade_tarefa(ids[2], 1)
+        repositorio.excluir_tarefa(ids[3])
+        
+        assert repositorio.contar_tarefas_por_status("g@teste.com") == {"A Fazer": 2, "Em Progresso": 2}
+        repositorio.atualizar_status_tarefas(ids[:2], "A Fazer", "g@teste.com")
+        assert repositorio.contar_tarefas_por_status("g@teste.com") == {"A Fazer": 4}
+        assert repositorio.contar_tarefas_por_usuario() == {
+            "g@teste.com": {"A Fazer": 4}, "h@teste.com": {"A Fazer": 1}
+        }
+        
+        # As contagens coincidem com a contagem direta das tarefas
+        with repositorio.conexao() as conn:
+            reais = conn.execute(
+                "SELECT usuario_email, status, COUNT(*) FROM tarefas GROUP BY usuario_email, status"
+            ).fetchall()
+        assert {(e, s): n for e, s, n in reais} == {
+            (e, s): n for e, por_status in repositorio.contar_tarefas_por_usuario().items()
+            for s, n in por_status.items()
+        }
+    
+    def test_atualizar_varias_tarefas(self, repositorio):
+        """Testa a alteração de status e prioridade de várias tarefas de uma vez"""
+        ids, _ = repositorio.adicionar_tarefas_em_lote(
+            [("e@teste.com", f"T{i}", "", "Em Progresso") for i in range(200)]
+        )
+        
+        sucesso, tarefas = repositorio.atualizar_status_tarefas(ids, "Concluído", "e@teste.com")
+        assert sucesso is True
+        assert sorted(t[0] for t in tarefas) == ids
+        assert repositorio.contar_tarefas_por_status("e@teste.com")["Concluído"] == 200
+        
+        sucesso, tarefas = repositorio.atualizar_prioridade_tarefas(ids[:3], 1, "e@teste.com")
+        assert sucesso is True
+        assert [t[4] for t in tarefas] == [1, 1, 1]
+        
+        assert repositorio.atualizar_status_tarefas([], "A Fazer") == (True, [])
+    
+    def test_atualizar_varias_tarefas_tudo_ou_nada(self, repositorio):
+        """Testa que um conjunto com tarefa alheia ou inexistente não é alterado"""
+        _, minha = repositorio.adicionar_tarefa("f@teste.com", "Minha", "")
+        _, alheia = repositorio.adicionar_tarefa("g@teste.com", "Alheia", "")
+        
+        sucesso, mensagem = repositorio.atualizar_status_tarefas([minha, alheia], "Concluído", "f@teste.com")
+        assert sucesso is False
+        assert "permissão" in mensagem
+        
+        sucesso, mensagem = repositorio.atualizar_status_tarefas([minha, 999], "Concluído", "f@teste.com")
+        assert sucesso is False
+        assert "não foram encontradas" in mensagem
+        assert repositorio.contar_tarefas_por_status("f@teste.com") == {"A Fazer": 1}
+        
+        # Admin pode alterar tarefas de qualquer usuário
+        sucesso, tarefas = repositorio.atualizar_status_tarefas([minha, alheia], "Concluído", "admin")
+        assert sucesso is True
+        assert len(tarefas) == 2
+
+    
+    def test_consultas_por_status(self, repositorio):
+        """Testa as contagens e a paginação por status usadas pelas colunas virtuais"""
+        for i in range(25):
+            repositorio.adicionar_tarefa("e@teste.com", f"T{i}", "", "A Fazer" if i % 5 else "Concluído", 0)
+        
+        assert repositorio.contar_tarefas_por_status("e@teste.com") == {"A Fazer": 20, "Concluído": 5}
+        
+        todas = repositorio.listar_tarefas_status("e@teste.com", "A Fazer", 100)
+        pagina = repositorio.listar_tarefas_status("e@teste.com", "A Fazer", 5, 10)
+        assert pagina == todas[10:15]
+    
+    def test_carregar_quadro(self, repositorio):
+        """Testa que quadros acima do limite não carregam as tarefas"""
+        for i in range(3):
+            repositorio.adicionar_tarefa("f@teste.com", f"T{i}", "")
+        
+        contagens, tarefas = repositorio.carregar_quadro("f@teste.com", limite=10)
+        assert contagens == {"A Fazer": 3}
+        assert len(tarefas) == 3
+        
+        contagens, tarefas = repositorio.carregar_quadro("f@teste.com", limite=2)
+        assert contagens == {"A Fazer": 3}
+        assert tarefas is None
+
+    
+    def test_paginacao_por_chave(self, repositorio):
+        """Testa que as páginas percorrem todas as tarefas na ordem do quadro, sem repetição"""
+        for i in range(23):
+            repositorio.adicionar_tarefa("g@teste.com", f"T{i}", "", "A Fazer", i % 3 == 0)
+        repositorio.adicionar_tarefa("outro@teste.com", "Outra", "")
+        
+        paginas = []
+        continuacao = None
+        while True:
+            tarefas, continuacao = repositorio.listar_tarefas_pagina("g@teste.com", 5, continuacao)
+            paginas.append(tarefas)
+            if continuacao is None:
+                break
+        
+        assert [len(p) for p in paginas] == [5, 5, 5, 5, 3]
+        assert [t for p in paginas for t in p] == repositorio.listar_tarefas("g@teste.com")
+    
+    def test_paginacao_admin(self, repositorio):
+        """Testa a paginação sobre as tarefas de todos os usuários"""
+        for i in range(6):
+            repositorio.adicionar_tarefa(f"u{i}@teste.com", f"T{i}", "")
+        
+        primeira, continuacao = repositorio.listar_tarefas_pagina(limite=4)
+        segunda, fim = repositorio.listar_tarefas_pagina(limite=4, continuacao=continuacao)
+        
+        assert primeira + segunda == repositorio.listar_tarefas()
+        assert fim is None
+    
+    def test_continuacao_invalida(self, repositorio):
+        """Testa que tokens corrompidos são rejeitados"""
+        with pytest.raises(ValueError):
+            repositorio.listar_tarefas_pagina("g@teste.com", 5, "nao-e-um-token")
+    
+    def test_iterar_tarefas(self, repositorio):
+        """Testa a leitura em lotes das tarefas"""
+        for i in range(12):
+            repositorio.adicionar_tarefa("h@teste.com", f"T{i}", "")
+        
+        tarefas = repositorio.iterar_tarefas("h@teste.com", tamanho_lote=5)
+        
+        assert next(tarefas)[1] == "T11"
+        assert list(tarefas) == repositorio.listar_tarefas("h@teste.com")[1:]
+        assert len(list(repositorio.iterar_tarefas(tamanho_lote=4))) == 12
+    
+    def test_iterar_tarefas_nao_retem_conexao(self, repositorio):
+        """Testa que o gerador suspenso não mantém uma conexão do pool emprestada"""
+        for i in range(6):
+            repositorio.adicionar_tarefa("h@teste.com", f"T{i}", "")
+        
+        tarefas = repositorio.iterar_tarefas("h@teste.com", tamanho_lote=2)
+        lidas = [next(tarefas)]
+        estatisticas = repositorio.pool.estatisticas()
+        assert estatisticas["livres"] == estatisticas["abertas"]
+        
+        # O restante pode ser consumido por outra thread
+        thread = threading.Thread(target=lambda: lidas.extend(tarefas))
+        thread.start()
+        thread.join()
+        assert lidas == repositorio.listar_tarefas("h@teste.com")
+    
+    def test_buscar_tarefas(self, repositorio):
+        """Testa a busca textual por usuário e global, ordenada por relevância"""
+        _, id_titulo = repositorio.adicionar_tarefa("b@teste.com", "Relatório mensal", "Enviar ao gerente")
+        _, id_descricao = repositorio.adicionar_tarefa("b@teste.com", "Comprar pão", "Anexar relatorio")
+        repositorio.adicionar_tarefa("b@teste.com", "Outra", "Sem relação")
+        _, id_alheia = repositorio.adicionar_tarefa("c@teste.com", "Relatório anual", "")
+        
+        # Prefixo, sem acentos; o título pesa mais que a descrição
+        assert [t[0] for t in repositorio.buscar_tarefas("relat", "b@teste.com")] == [id_titulo, id_descricao]
+        globais = repositorio.buscar_tarefas("relatorio")
+        assert {t[0] for t in globais} == {id_titulo, id_descricao, id_alheia}
+        assert len(globais[0]) == 8
+        assert repositorio.buscar_tarefas("relatório mensal", "b@teste.com")[0][0] == id_titulo
+        assert repositorio.buscar_tarefas("", "b@teste.com") == []
+    
+    def test_busca_acompanha_alteracoes(self, repositorio):
+        """Testa que os gatilhos mantêm o índice de busca em dia"""
+        _, tarefa_id = repositorio.adicionar_tarefa("b@teste.com", "Planejar viagem", "")
+        with repositorio.conexao() as conn:
+            conn.execute("UPDATE tarefas SET titulo = 'Planejar mudança' WHERE id = ?", (tarefa_id,))
+            conn.commit()
+        
+        assert repositorio.buscar_tarefas("viagem", "b@teste.com") == []
+        assert repositorio.buscar_tarefas("mudanca", "b@teste.com")[0][0] == tarefa_id
+        
+        repositorio.excluir_tarefa(tarefa_id)
+        assert repositorio.buscar_tarefas("mudanca") == []
+    
+    def test_expressao_busca_ignora_operadores(self, repositorio):
+        """Testa que aspas e operadores digitados não quebram a consulta FTS5"""
+        assert expressao_busca('"AND (x* OR') == '"AND"* "x"* "OR"*'
+        assert expressao_busca(' - * ') is None
+        assert repositorio.buscar_tarefas('"NEAR(') == []
+    
+    def test_consultar_tarefas(self, repositorio):
+        """Testa a consulta filtrada entre usuários, com paginação e total"""
+        tarefas = [(f"u{i % 3}@teste.com", f"Tarefa {i}", "", "Em Progresso" if i % 2 else "A Fazer", i % 4 == 1,
+                    f"2024-01-{1 + i % 10:02d} 10:00:00") for i in range(30)]
+        tarefas.append(("u0@teste.com", "Relatório urgente", "", "Em Progresso", 1, "2024-01-03 09:00:00"))
+        repositorio.adicionar_tarefas_em_lote(tarefas)
+        
+        filtro = {"status": "Em Progresso", "prioridade": 1, "criado_de": datetime(2024, 1, 1),
+                  "criado_ate": datetime(2024, 1, 8)}
+        esperadas = [t for t in repositorio.listar_tarefas()
+                     if t[3] == "Em Progresso" and t[4] == 1 and "2024-01-01" <= t[5] < "2024-01-08"]
+        
+        pagina, continuacao, total = repositorio.consultar_tarefas(limite=2, **filtro)
+        assert total == len(esperadas) > 2
+        assert len(pagina[0]) == 8
+        resto = []
+        while continuacao is not None:
+            linhas, continuacao, sem_total = repositorio.consultar_tarefas(
+                limite=2, continuacao=continuacao, contar=False, **filtro
+            )
+            assert sem_total is None
+            resto.extend(linhas)
+        assert pagina + resto == esperadas
+        
+        # Texto combinado com dono; total vindo da tabela de contagens
+        linhas, _, total = repositorio.consultar_tarefas(texto="relat", usuario_email="u0@teste.com")
+        assert [t[1] for t in linhas] == ["Relatório urgente"] and total == 1
+        _, _, total = repositorio.consultar_tarefas(usuario_email="u1@teste.com", status="A Fazer")
+        assert total == repositorio.contar_tarefas_por_status("u1@teste.com")["A Fazer"]
+        
+        # Texto sem palavras não encontra nada, como em buscar_tarefas
+        assert repositorio.consultar_tarefas(texto="!!!") == ([], None, 0)
+        assert repositorio.consultar_tarefas(texto="!!!", usuario_email="u1@teste.com") == ([], None, 0)
+        assert repositorio.buscar_tarefas("!!!") == []
+    
+    def test_consultar_tarefas_pagina_profunda(self, repositorio):
+        """Testa que uma página profunda busca a prioridade atual pelo índice, sem repercorrê-la"""
+        repositorio.adicionar_tarefas_em_lote(
+            [(f"u{i % 3}@teste.com", f"T{i}", "", "A Fazer", i % 2) for i in range(300)]
+        )
+        filtro = FiltroTarefas(status="A Fazer")
+        continuacao = None
+        for _ in range(12):
+            _, continuacao, _ = repositorio.consultar_tarefas(filtro, limite=10, continuacao=continuacao,
+                                                             contar=False)
+        
+        sql, parametros = compilar_pagina(filtro, COLUNAS_TAREFA, 11, decodificar_continuacao(continuacao))
+        with repositorio.conexao() as conn:
+            plano = plano_consulta(conn, sql, parametros)
+        assert any("(status=? AND prioridade=? AND id<?)" in linha for linha in plano)
+        assert any("(status=? AND prioridade<?)" in linha for linha in plano)
+        assert varreduras_completas(plano) == []
+    
+    def test_adicionar_tarefas_em_lote(self, repositorio):
+        """Testa a inserção em lote com ids na ordem de entrada"""
+        tarefas = [("lote@teste.com", f"Tarefa {i}", "Desc", "A Fazer", i % 2) for i in range(25)]
+        tarefas.append({"usuario_email": "lote@teste.com", "titulo": "Dicionário", "status": "Concluído"})
+        
+        ids, falhas = repositorio.adicionar_tarefas_em_lote(tarefas, tamanho_lote=10)
+        
+        assert falhas == []
+        assert len(ids) == 26
+        assert ids == sorted(ids)
+        por_id = {t[0]: t for t in repositorio.listar_tarefas("lote@teste.com")}
+        assert por_id[ids[3]][1] == "Tarefa 3"
+        assert por_id[ids[-1]][3] == "Concluído"
+    
+    def test_lote_com_linhas_invalidas(self, repositorio):
+        """Testa que linhas inválidas são relatadas sem abortar o lote"""
+        tarefas = [
+            ("lote@teste.com", "Válida 1"),
+            ("lote@teste.com", "   "),
+            ("lote@teste.com", "Status ruim", "", "Pendente"),
+            {"usuario_email": "lote@teste.com", "titulo": "Campo extra", "cor": "azul"},
+            ("lote@teste.com", "Válida 2", "", "Em Progresso", 1),
+        ]
+        
+        ids, falhas = repositorio.adicionar_tarefas_em_lote(tarefas)
+        
+        assert [i for i, _ in falhas] == [1, 2, 3]
+        assert ids[1:4] == [None, None, None]
+        assert ids[0] is not None and ids[4] is not None
+        assert len(repositorio.listar_tarefas("lote@teste.com")) == 2
+    
+    def test_lote_com_item_que_nao_e_sequencia(self, repositorio):
+        """Testa que itens que não são dict, tupla ou lista falham sozinhos, sem perder as demais"""
+        tarefas = [("lote@teste.com", "Boa 1"), 5, "ab", b"ab", ("lote@teste.com", "Boa 2")]
+        
+        ids, falhas = repositorio.adicionar_tarefas_em_lote(tarefas)
+        
+        assert len(ids) == len(tarefas)
+        assert falhas == [(i, "Tarefa deve ser um dict, tupla ou lista") for i in (1, 2, 3)]
+        assert ids[1:4] == [None, None, None] and ids[0] is not None and ids[4] is not None
+        titulos = sorted(t[1] for t in repositorio.listar_tarefas("lote@teste.com"))
+        assert titulos == ["Boa 1", "Boa 2"]
+    
+    def test_lote_dentro_de_transacao(self, repositorio):
+        """Testa que o lote num empréstimo aninhado participa da transação de quem o chamou"""
+        with repositorio.conexao() as conn:
+            conn.execute("BEGIN")
+            conn.execute("INSERT INTO usuarios (nome, email, senha) VALUES ('Lote', 'lote@teste.com', 'x')")
+            ids, falhas = repositorio.adicionar_tarefas_em_lote([("lote@teste.com", "Aninhada")])
+            
+            assert falhas == [] and ids[0] is not None
+            assert conn.in_transaction
+            conn.rollback()
+        
+        assert repositorio.listar_tarefas("lote@teste.com") == []
+        assert repositorio.contar_tarefas_por_status("lote@teste.com") == {}
+        
+        with repositorio.conexao() as conn:
+            conn.execute("BEGIN")
+            repositorio.adicionar_tarefas_em_lote([("lote@teste.com", "Confirmada")])
+            conn.commit()
+        
+        assert [t[1] for t in repositorio.listar_tarefas("lote@teste.com")] == ["Confirmada"]
+    
+    def test_lote_com_erro_no_banco(self, repositorio, temp_db):
+        """Testa que um erro do banco em um bloco só descarta as linhas com problema"""
+        conn = sqlite3.connect(temp_db)
+        conn.execute('''
+            CREATE TRIGGER rejeitar_titulo BEFORE INSERT ON tarefas
+            WHEN NEW.titulo = 'Rejeitada'
+            BEGIN SELECT RAISE(ABORT, 'título rejeitado'); END
+        ''')
+        conn.commit()
+        conn.close()
+        
+        tarefas = [("lote@teste.com", titulo) for titulo in ("A", "Rejeitada", "B", "C")]
+        ids, falhas = repositorio.adicionar_tarefas_em_lote(tarefas, tamanho_lote=2)
+        
+        assert [i for i, _ in falhas] == [1]
+        assert "rejeitado" in falhas[0][1]
+        assert None not in (ids[0], ids[2], ids[3])
+        titulos = sorted(t[1] for t in repositorio.listar_tarefas("lote@teste.com"))
+        assert titulos == ["A", "B", "C"]
+    
+    def test_lote_grande_mantem_busca_e_contagens(self, repositorio, temp_db):
+        """Testa que o lote com gatilhos suspensos indexa e conta por bloco, sem mudar o esquema"""
+        conn = sqlite3.connect(temp_db)
+        conn.execute('''
+            CREATE TRIGGER rejeitar_titulo BEFORE INSERT ON tarefas
+            WHEN NEW.titulo = 'Rejeitada'
+            BEGIN SELECT RAISE(ABORT, 'título rejeitado'); END
+        ''')
+        conn.commit()
+        status = ("A Fazer", "Em Progresso", "Concluído")
+        tarefas = [(f"u{i % 3}@teste.com", f"Tarefa {i}", "Desc", status[i % 2]) for i in range(700)]
+        tarefas[10] = ("u1@teste.com", "Rejeitada")
+        tarefas.append(("u0@teste.com", "Orçamento anual"))
+        versao_esquema = conn.execute("PRAGMA schema_version").fetchone()[0]
+        
+        ids, falhas = repositorio.adicionar_tarefas_em_lote(tarefas, tamanho_lote=200)
+        
+        # Sem DDL: as instruções preparadas das conexões do pool continuam válidas
+        assert conn.execute("PRAGMA schema_version").fetchone()[0] == versao_esquema
+        assert conn.execute("SELECT COUNT(*) FROM insercao_em_lote").fetchone()[0] == 0
+        assert [i for i, _ in falhas] == [10]
+        assert len(ids) == len(tarefas)
+        esperadas = dict(((email, st), n) for email, st, n in conn.execute(
+            "SELECT usuario_email, status, COUNT(*) FROM tarefas GROUP BY 1, 2"
+        ))
+        contadas = dict(((email, st), n) for email, st, n in conn.execute(
+            "SELECT usuario_email, status, quantidade FROM contagem_tarefas WHERE quantidade > 0"
+        ))
+        assert contadas == esperadas
+        assert [t[0] for t in repositorio.buscar_tarefas("orcamento")] == [ids[-1]]
+        assert len(repositorio.buscar_tarefas("tarefa", limite=1000)) == 699
+        
+        # Fora do lote, inserções avulsas seguem indexadas e contadas pelos gatilhos
+        conn.close()
+        _, tarefa_id = repositorio.adicionar_tarefa("u2@teste.com", "Avulsa", "")
+        contagem = repositorio.contar_tarefas_por_status("u2@teste.com")["A Fazer"]
+        assert contagem == esperadas["u2@teste.com", "A Fazer"] + 1
+        assert [t[0] for t in repositorio.buscar_tarefas("avulsa")] == [tarefa_id]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
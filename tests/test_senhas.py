@@ -0,0 +1,101 @@
+"""
+Testes unitários para o hash de senhas
+"""
+import pytest
+import os
+import sys
+
+# Adicionar o diretório raiz ao path para importar os módulos de src
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from src.senhas import (MotorSenhas, calibrar, gerar_hash, hash_ficticio, ler_hash, precisa_rehash,
+                        verificar_e_atualizar, verificar_hash)
+
+RAPIDO = {"n": 2 ** 8, "r": 8, "p": 1}
+
+
+class TestHashSenhas:
+    """Testes para as funções de hash"""
+    
+    @pytest.mark.parametrize("algoritmo,parametros", [
+        ("scrypt", RAPIDO),
+        ("pbkdf2_sha256", {"iteracoes": 1000}),
+    ])
+    def test_gerar_e_verificar(self, algoritmo, parametros):
+        """Testa o formato e a verificação do hash de cada algoritmo"""
+        armazenado = gerar_hash("senha123", algoritmo, parametros)
+        
+        assert armazenado.startswith(algoritmo + "$")
+        assert ler_hash(armazenado)[:2] == (algoritmo, parametros)
+        assert verificar_hash("senha123", armazenado) is True
+        assert verificar_hash("senha124", armazenado) is False
+        # Sal aleatório: o mesmo texto gera hashes diferentes
+        assert gerar_hash("senha123", algoritmo, parametros) != armazenado
+    
+    def test_precisa_rehash(self):
+        """Testa a detecção de hashes desatualizados"""
+        armazenado = gerar_hash("x", "scrypt", RAPIDO)
+        
+        assert precisa_rehash(armazenado, "scrypt", RAPIDO) is False
+        assert precisa_rehash(armazenado, "scrypt", {"n": 2 ** 9, "r": 8, "p": 1}) is True
+        assert precisa_rehash(armazenado, "pbkdf2_sha256", {"iteracoes": 1000}) is True
+        assert precisa_rehash("texto puro", "scrypt", RAPIDO) is True
+    
+    def test_verificar_e_atualizar(self):
+        """Testa que senhas em texto puro são aceitas e convertidas em hash"""
+        assert verificar_e_atualizar("errada", "legado", "scrypt", RAPIDO) == (False, None)
+        
+        valida, novo_hash = verificar_e_atualizar("legado", "legado", "scrypt", RAPIDO)
+        assert valida is True
+        assert verificar_hash("legado", novo_hash)
+        assert verificar_e_atualizar("legado", novo_hash, "scrypt", RAPIDO) == (True, None)
+    
+    @pytest.mark.parametrize("armazenado", [
+        "scrypt$abc$def$ghi", "scrypt$n=x,r=8,p=1$AA$AA", "scrypt$n=3,r=8,p=1$AA$AA",
+        "pbkdf2_sha256$n=1$AA$AA", "scrypt$n=256,r=8,p=1$A$AA",
+    ])
+    def test_texto_puro_com_formato_de_hash(self, armazenado):
+        """Testa que valores malformados com prefixo de algoritmo são tratados como texto puro"""
+        assert ler_hash(armazenado) is None
+        assert verificar_hash(armazenado, armazenado) is True
+        assert verificar_hash("outra", armazenado) is False
+        assert precisa_rehash(armazenado, "scrypt", RAPIDO) is True
+    
+    def test_hash_ficticio(self):
+        """Testa que o hash fictício usa os parâmetros atuais e não aceita senhas"""
+        ficticio = hash_ficticio("scrypt", RAPIDO)
+        
+        assert ler_hash(ficticio)[:2] == ("scrypt", RAPIDO)
+        assert verificar_hash("", ficticio) is False
+        assert MotorSenhas(parametros=RAPIDO, processos=0).verificar_ficticio("senha") is False
+    
+    def test_calibrar(self):
+        """Testa que a calibração retorna parâmetros válidos perto do alvo"""
+        parametros, tempo = calibrar(5, "pbkdf2_sha256", repeticoes=1)
+        assert parametros["iteracoes"] >= 1000
+        assert tempo > 0
+        
+        parametros, _ = calibrar(5, "scrypt", repeticoes=1)
+        assert parametros["n"] & (parametros["n"] - 1) == 0
+
+
+class TestMotorSenhas:
+    """Testes para a classe MotorSenhas"""
+    
+    def test_hash_em_outro_processo(self):
+        """Testa o hash e a verificação feitos pelo pool de processos"""
+        motor = MotorSenhas(parametros=RAPIDO, processos=1)
+        try:
+            armazenado = motor.gerar_hash("senha123")
+            assert motor.verificar("senha123", armazenado) == (True, None)
+            assert motor.verificar("outra", armazenado) == (False, None)
+        finally:
+            motor.encerrar()
+    
+    def test_algoritmo_desconhecido(self):
+        """Testa que um algoritmo inválido é rejeitado"""
+        with pytest.raises(ValueError):
+            MotorSenhas("md5")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,77 @@
+"""
+Testes unitários para as sessões em memória
+"""
+import pytest
+import os
+import sys
+
+# Adicionar o diretório raiz ao path para importar os módulos de src
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from src.sessao import PAPEL_ADMIN, PAPEL_USUARIO, GerenciadorSessoes
+from tests.conftest import RelogioFalso
+
+
+class TestGerenciadorSessoes:
+    """Testes para a classe GerenciadorSessoes"""
+    
+    def test_criar_e_obter(self):
+        """Testa que a sessão guarda o papel e é encontrada pelo token"""
+        sessoes = GerenciadorSessoes()
+        
+        sessao = sessoes.criar(7, "Ana", "ana@teste.com")
+        admin = sessoes.criar(1, "Administrador", "admin")
+        
+        assert sessao.papel == PAPEL_USUARIO and not sessao.eh_admin
+        assert admin.papel == PAPEL_ADMIN and admin.eh_admin
+        assert sessao.token != admin.token
+        assert sessoes.obter(sessao.token) is sessao
+        assert sessoes.obter("desconhecido") is None
+    
+    def test_expiracao_deslizante(self):
+        """Testa que a sessão expira sem uso e é renovada a cada uso"""
+        relogio = RelogioFalso()
+        sessoes = GerenciadorSessoes(duracao=60, relogio=relogio)
+        sessao = sessoes.criar(7, "Ana", "ana@teste.com")
+        
+        relogio.agora += 50
+        assert sessoes.obter(sessao.token) is sessao
+        relogio.agora += 50
+        assert sessoes.obter(sessao.token) is sessao
+        relogio.agora += 61
+        assert sessoes.obter(sessao.token) is None
+        assert len(sessoes) == 0
+    
+    def test_encerrar(self):
+        """Testa o encerramento individual, por usuário e das expiradas"""
+        relogio = RelogioFalso()
+        sessoes = GerenciadorSessoes(duracao=60, relogio=relogio)
+        a1 = sessoes.criar(7, "Ana", "ana@teste.com")
+        sessoes.criar(7, "Ana", "ana@teste.com")
+        sessoes.criar(8, "Bia", "bia@teste.com")
+        
+        assert sessoes.encerrar(a1.token) is True
+        assert sessoes.encerrar(a1.token) is False
+        assert sessoes.encerrar_do_usuario("ana@teste.com") == 1
+        
+        relogio.agora += 61
+        assert sessoes.limpar_expiradas() == 1
+        assert len(sessoes) == 0
+    
+    def test_criar_remove_vencidas(self):
+        """Testa que sessões abandonadas são removidas ao criar novas, sem chamar limpar_expiradas"""
+        relogio = RelogioFalso()
+        sessoes = GerenciadorSessoes(duracao=60, relogio=relogio, intervalo_limpeza=10)
+        
+        # Um login por segundo, nenhum retomado: o mapa não passa das sessões válidas
+        maximo = 0
+        for _ in range(1000):
+            sessoes.criar(7, "Ana", "ana@teste.com")
+            maximo = max(maximo, len(sessoes))
+            relogio.agora += 1
+        
+        assert maximo <= 60 + 10
+        assert len(sessoes) <= 60 + 10
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])